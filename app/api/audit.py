@@ -0,0 +1,54 @@
+import logging
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.schemas.audit import AuditEntry, AuditPage
+from app.core.security import get_current_active_user
+from app.core.config import AUDIT_ADMINS, AUDIT_MAX_PAGE
+from app.db.session import get_db
+from app.db import crud
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/lgg_survival/audit")
+
+@router.get("/", response_model=AuditPage, summary="Read the prediction audit log")
+def read_audit_log(
+    username: Optional[str] = Query(None, description="Only records of this user (audit administrators only)"),
+    since: Optional[datetime] = Query(None, description="Only records created at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only records created before this time (UTC)"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=AUDIT_MAX_PAGE),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user)
+):
+    """
+    Read a page of prediction audit records, newest first.
+
+    Users listed in AUDIT_ADMINS read every user's records, optionally filtered by `username`;
+    other users read only their own. Records are written in bulk shortly after each request,
+    so the latest predictions may take up to AUDIT_FLUSH_INTERVAL seconds to appear.
+
+    Parameters:
+    - username (Optional[str]): Only records of this user.
+    - since (Optional[datetime]): Only records created at or after this time (UTC).
+    - until (Optional[datetime]): Only records created before this time (UTC).
+    - offset (int): Number of records to skip.
+    - limit (int): Maximum number of records to return.
+
+    Returns:
+    - AuditPage: The requested page.
+
+    Raises:
+    - HTTPException: 403 if a user who is not an audit administrator asks for another user's records.
+    """
+    if current_user.username not in AUDIT_ADMINS:
+        if username is not None and username != current_user.username:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado para ver el registro de otros usuarios")
+        username = current_user.username
+
+    entries = crud.get_audit_entries(db, username=username, since=since, until=until, skip=offset, limit=limit)
+    return AuditPage(offset=offset, limit=limit, entries=[AuditEntry.model_validate(entry) for entry in entries])
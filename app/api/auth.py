@@ -1,11 +1,12 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models import User
 from app.db.crud import get_user_by_username, create_user
-from app.core.utils import get_password_hash, verify_password
-from app.core.security import create_access_token
+from app.core.utils import get_password_hash_async, verify_password, password_executor
+from app.core.security import create_access_token, get_current_active_user, principal_cache, token_cache
 from app.schemas.auth import RegisterRequest, LoginRequest, UserResponse, Token
 from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES
 
@@ -13,6 +14,26 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _check_available(db: Session, user_data: RegisterRequest):
+    # Check if username already exists
+    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    if existing_user:
+        logger.error(f"Username already exists: {user_data.username}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered"
+        )
+
+    # Check if email already exists
+    if user_data.email:
+        existing_email = db.query(User).filter(User.email == user_data.email).first()
+        if existing_email:
+            logger.error(f"Email already exists: {user_data.email}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+
 @router.post(
     "/register",
     response_model=UserResponse,
@@ -24,7 +45,7 @@ router = APIRouter()
     ),
     status_code=status.HTTP_201_CREATED
 )
-def register_user(user_data: RegisterRequest, db: Session = Depends(get_db)):
+async def register_user(user_data: RegisterRequest, db: Session = Depends(get_db)):
     """
     Register a new user with username and password.
 
@@ -39,34 +60,20 @@ def register_user(user_data: RegisterRequest, db: Session = Depends(get_db)):
     - UserResponse: An object containing the username, full name, and email of the newly registered user.
 
     Raises:
-    - HTTPException: If the username or email is already registered.
+    - HTTPException: If the username or email is already registered; 503 with Retry-After if the
+      password executor queue is full.
     """
     logger.info(f"Registering user: {user_data.username}")
     try:
-        # Check if username already exists
-        existing_user = db.query(User).filter(User.username == user_data.username).first()
-        if existing_user:
-            logger.error(f"Username already exists: {user_data.username}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
-            )
+        await run_in_threadpool(_check_available, db, user_data)
 
-        # Check if email already exists
-        if user_data.email:
-            existing_email = db.query(User).filter(User.email == user_data.email).first()
-            if existing_email:
-                logger.error(f"Email already exists: {user_data.email}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-
-        # Create new user
-        user = create_user(
+        # Create new user; the hash is awaited so no threadpool thread waits on bcrypt
+        hashed_password = await get_password_hash_async(user_data.password)
+        user = await run_in_threadpool(
+            create_user,
             db,
             username=user_data.username,
-            password=get_password_hash(user_data.password),
+            password=hashed_password,
             full_name=user_data.full_name,
             email=user_data.email
         )
@@ -207,3 +214,28 @@ def health_check():
         - **status** (str): Always "healthy auth" if service is running
     """
     return {"status": "healthy auth"}
+
+
+@router.get(
+    "/stats",
+    summary="Authentication cache statistics",
+    description=(
+        "Returns size and hit, miss and invalidation counters of the authenticated-user and "
+        "verified-token caches, and queue depth and timings of the password hashing executor."
+    )
+)
+def auth_stats(current_user: User = Depends(get_current_active_user)):
+    """
+    Get authentication cache statistics.
+
+    **Returns:**
+    - **dict**: Cache statistics
+        - **principal_cache** (dict): Size, hit rate and eviction, expiration and invalidation counters
+        - **token_cache** (dict): Size, hit rate and expiration counters of verified tokens
+        - **password_executor** (dict): Queue depth, rejections and queue-wait and bcrypt timings
+    """
+    return {
+        "principal_cache": principal_cache.snapshot(),
+        "token_cache": token_cache.snapshot(),
+        "password_executor": password_executor.snapshot(),
+    }
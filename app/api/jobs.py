@@ -0,0 +1,193 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.schemas.jobs import JobStatus, JobResults
+from app.core.security import get_current_active_user
+from app.core.admission import admission
+from app.core.config import JOB_RESULTS_MAX_PAGE
+from app.core.batch import read_csv_header
+from app.core.features import feature_registry
+from app.core.registry import registry
+from app.core.formats import upload_format, check_upload, CSV, MATRIX_FORMATS, UNSUPPORTED_FORMAT
+from app.core import jobs
+from app.db.session import get_db
+from app.db import crud
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/lgg_survival/jobs")
+
+
+def _job_status(job) -> JobStatus:
+    progress = None
+    if job.status == "completed":
+        progress = 1.0
+    elif job.total_rows:
+        progress = min(job.processed_rows / job.total_rows, 1.0)
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        filename=job.filename,
+        total_rows=job.total_rows,
+        processed_rows=job.processed_rows,
+        progress=progress,
+        error=job.error,
+        model_version=job.model_version,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+@router.post(
+    "/",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a batch-scoring job",
+    description=(
+        "Stores a CSV, Excel, Parquet, Arrow IPC or .npy file and queues it for scoring in a background worker process. "
+        "Returns the job id immediately; poll the job for progress and fetch results page by page."
+    )
+)
+def submit_job(file: UploadFile = File(...), db: Session = Depends(get_db), current_user=Depends(admission.limit("jobs"))):
+    """
+    Submit a file for background batch scoring.
+
+    Parameters:
+    - file (UploadFile): The uploaded CSV, Excel, Parquet, Arrow IPC, .npy or JSON file.
+
+    Returns:
+    - JobStatus: The queued job, including its job_id.
+
+    Raises:
+    - HTTPException: If the file format is not supported or required columns are missing; 429
+      with Retry-After if the user's request rate is over the limit.
+    """
+    fmt = upload_format(file.content_type, file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_FORMAT)
+
+    if fmt in MATRIX_FORMATS:
+        try:
+            check_upload(file.file, fmt)
+        except (ValueError, EOFError) as e:
+            raise HTTPException(status_code=400, detail=f"Error al leer el archivo: {str(e)}")
+
+    if fmt == CSV:
+        try:
+            missing_cols = feature_registry.missing(read_csv_header(file.file))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Error al leer el archivo, verifique el formato")
+        if missing_cols:
+            raise HTTPException(status_code=400, detail=f"Faltan columnas: {missing_cols}")
+
+    job_id = jobs.new_job_id()
+    jobs.store_upload(job_id, file.file)
+    # The worker scores every row with this version, even if another one is swapped in meanwhile
+    handle = registry.current()
+    job = crud.create_job(
+        db, job_id, owner=current_user.username, filename=file.filename,
+        content_type=file.content_type or "application/octet-stream",
+        model_version=handle.version, model_path=handle.path,
+    )
+    jobs.submit_job(job_id)
+    logger.info(f"Job {job_id} queued for user {current_user.username}")
+    return _job_status(job)
+
+@router.get("/", response_model=List[JobStatus], summary="List your batch-scoring jobs")
+def list_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user)
+):
+    """
+    List the current user's jobs, newest first.
+
+    Parameters:
+    - skip (int): Number of jobs to skip.
+    - limit (int): Maximum number of jobs to return.
+
+    Returns:
+    - List[JobStatus]: The user's jobs.
+    """
+    return [_job_status(job) for job in crud.get_jobs_by_owner(db, current_user.username, skip=skip, limit=limit)]
+
+@router.get("/{job_id}", response_model=JobStatus, summary="Get batch-scoring job status")
+def get_job_status(job_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+    """
+    Get the status and progress of a job.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+
+    Returns:
+    - JobStatus: The job's status and progress.
+
+    Raises:
+    - HTTPException: If the job does not exist or belongs to another user.
+    """
+    return _job_status(crud.get_job(db, job_id, owner=current_user.username))
+
+@router.get("/{job_id}/results", response_model=JobResults, summary="Get a page of batch-scoring job results")
+def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=JOB_RESULTS_MAX_PAGE),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user)
+):
+    """
+    Get a page of results for the rows scored so far.
+
+    Results can be fetched while the job is still running; only rows already scored are returned.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+    - offset (int): Index of the first row to return.
+    - limit (int): Maximum number of rows to return.
+
+    Returns:
+    - JobResults: The requested page, with `null` for rows with missing or non-numeric features.
+      Its `limit` is the number of rows returned, which is less than requested at the end of
+      the rows scored so far.
+
+    Raises:
+    - HTTPException: If the job does not exist or belongs to another user.
+    """
+    job = crud.get_job(db, job_id, owner=current_user.username)
+    available = job.processed_rows
+    probs = jobs.read_results(job_id, offset, min(limit, max(available - offset, 0)))
+    predictions = [
+        {"row": i, "survival_probability": None if p != p else p}
+        for i, p in enumerate(probs.tolist(), start=offset)
+    ]
+    return JobResults(
+        job_id=job.id,
+        status=job.status,
+        offset=offset,
+        limit=len(predictions),
+        available_rows=available,
+        model_version=job.model_version,
+        predictions=predictions,
+    )
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a batch-scoring job")
+def delete_job(job_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+    """
+    Delete a finished job with its uploaded file and results.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+
+    Raises:
+    - HTTPException: 404 if the job does not exist or belongs to another user; 409 if it is
+      still queued or running.
+    """
+    job = crud.get_job(db, job_id, owner=current_user.username)
+    if job.status in ("queued", "running"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El trabajo aún está en curso")
+    jobs.delete_job(db, job_id)
+    logger.info(f"Job {job_id} deleted by user {current_user.username}")
@@ -1,12 +1,32 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
-from fastapi.responses import JSONResponse
+import time
+from pathlib import Path
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from typing import List
-import pandas as pd
 
-from app.schemas.survival import SurvivalInput, SurvivalOutput
+from app.schemas.survival import (
+    SurvivalInput, SurvivalOutput, ExplanationOutput, BatchExplanationOutput, SweepInput, SweepOutput,
+)
 from app.core.security import get_current_active_user
-from app.core.model import model_predict
+from app.core.batching import scheduler
+from app.core.batch import frame_to_matrix, score_batch, to_nullable, read_upload, read_csv_header, stream_csv_predictions, detach_upload
+from app.core.formats import upload_format, read_matrix, annotate_upload, MATRIX_FORMATS, ANNOTATED_TYPES, UNSUPPORTED_FORMAT
+from app.core.results import (
+    negotiate_result_type, accepts_gzip, encode_results, compress_body, result_response, gzip_chunks,
+    COLUMNS_JSON, RESULTS_CSV, RESULTS_NPY,
+)
+from app.core.executor import inference_executor
+from app.core.cache import prediction_cache, feature_key
+from app.core.explain import explanation_cache, tree_explainer, explain_row, explain_rows
+from app.core.sweep import run_sweep
+from app.core.metrics import batch_predict_rows
+from app.core.registry import registry
+from app.core.features import feature_registry
+from app.core.audit import audit_log
+from app.core.admission import admission
+from app.core.config import PREDICT_DEADLINE, BATCH_PREDICT_DEADLINE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,9 +34,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/lgg_survival")
 
+def _check_features(features: np.ndarray):
+    """
+    Reject a validated feature vector the model cannot score.
+
+    Validation already produced a float64 array, so no per-feature checks are needed here.
+    NaN and infinite values are rejected here rather than during validation, since validation
+    errors echo the input and NaN is not valid JSON.
+
+    Parameters:
+    - features (np.ndarray): The validated `features` of a request.
+
+    Raises:
+    - HTTPException: 400 if there are not 32 features or any is NaN or infinite.
+    """
+    if features.shape[0] != feature_registry.size:
+        raise HTTPException(status_code=400, detail="Se requieren 32 características para el modelo")
+    if not np.isfinite(features).all():
+        raise HTTPException(status_code=400, detail="Las características deben ser números finitos")
+
 @router.post(
     "/",
     response_model=SurvivalOutput,
+    response_class=ORJSONResponse,
     summary="Predict LGG survival probability",
     description=(
         "Predicts the survival probability for Lower Grade Glioma (LGG) cancer patients "
@@ -30,7 +70,8 @@ router = APIRouter(prefix="/lgg_survival")
             "content": {
                 "application/json": {
                     "example": {
-                        "survival_probability": 0.85
+                        "survival_probability": 0.85,
+                        "model_version": "lgg_model-3f2a9c1b7d4e"
                     }
                 }
             }
@@ -44,9 +85,9 @@ router = APIRouter(prefix="/lgg_survival")
                             "summary": "Incorrect number of features",
                             "value": {"detail": "Se requieren 32 características para el modelo"}
                         },
-                        "non_numeric_features": {
-                            "summary": "Non-numeric features",
-                            "value": {"detail": "Las características deben ser numéricas"}
+                        "non_finite_features": {
+                            "summary": "NaN or infinite features",
+                            "value": {"detail": "Las características deben ser números finitos"}
                         }
                     }
                 }
@@ -68,8 +109,8 @@ router = APIRouter(prefix="/lgg_survival")
                         "detail": [
                             {
                                 "loc": ["body", "features"],
-                                "msg": "ensure this value has at least 32 items",
-                                "type": "value_error.const"
+                                "msg": "Value error, Las características deben ser numéricas",
+                                "type": "value_error"
                             }
                         ]
                     }
@@ -78,7 +119,7 @@ router = APIRouter(prefix="/lgg_survival")
         }
     }
 )
-async def predict_survival(data: SurvivalInput, current_user=Depends(get_current_active_user)):
+async def predict_survival(data: SurvivalInput, current_user=Depends(admission.limit("predict"))):
     """
     Predict LGG survival probability from molecular features.
 
@@ -91,91 +132,434 @@ async def predict_survival(data: SurvivalInput, current_user=Depends(get_current
 
     **Parameters:**
     - **data** (SurvivalInput): Input data containing feature array
-        - **features** (List[float]): Array of 32 numerical values representing molecular features
+        - **features** (List[float] | Dict[str, float] | str): Array of 32 numerical values
+          representing molecular features in model order, an object of the 32 values keyed by
+          feature name, or the 32 values packed as little-endian float32 and base64-encoded
 
     **Returns:**
     - **SurvivalOutput**: Prediction result
         - **survival_probability** (float): Predicted survival probability (0.0 to 1.0)
+        - **model_version** (str): Version of the model that produced the prediction
 
     **Raises:**
-    - **400 Bad Request**: Invalid feature count or non-numeric values
+    - **400 Bad Request**: Invalid feature count, or NaN or infinite values
     - **401 Unauthorized**: Missing or invalid authentication token
-    - **422 Unprocessable Entity**: Invalid input format
+    - **422 Unprocessable Entity**: Invalid input format or non-numeric values
+    - **429 Too Many Requests**: The user's request rate limit was reached; see Retry-After
+    - **504 Gateway Timeout**: The prediction took longer than PREDICT_DEADLINE
     """
-    if len(data.features) != 32:
-        raise HTTPException(status_code=400, detail="Se requieren 32 características para el modelo")
+    started = time.perf_counter()
+    _check_features(data.features)
 
-    # Validate that the features are numeric
-    if not all(isinstance(feature, (int, float)) for feature in data.features):
-        raise HTTPException(status_code=400, detail="Las características deben ser numéricas")
+    # Pin the model version for the whole request, even if a new one is swapped in meanwhile
+    handle = registry.current()
+    key = feature_key(data.features, handle.version)
+    async with admission.deadline("predict", PREDICT_DEADLINE):
+        prob = await prediction_cache.get_or_compute(key, handle.version, lambda: scheduler.submit(data.features, handle))
+    audit_log.record(current_user.username, "predict", handle.version, key, started, probability=prob)
+    # Returned directly, skipping response model validation and jsonable_encoder
+    return ORJSONResponse({"survival_probability": prob, "model_version": handle.version})
 
-    prob = model_predict(data.features)
-    return SurvivalOutput(survival_probability=prob)
-
-@router.post("/batch_predict", response_class=JSONResponse)
-async def batch_predict(file: UploadFile = File(...), current_user=Depends(get_current_active_user)):
+@router.post(
+    "/batch_predict",
+    response_class=ORJSONResponse,
+    responses={
+        200: {
+            "description": "Survival probability per row, in the representation chosen by the Accept header",
+            "content": {COLUMNS_JSON: {}, RESULTS_CSV: {}, RESULTS_NPY: {}},
+        }
+    }
+)
+async def batch_predict(request: Request, file: UploadFile = File(...), annotate: bool = False,
+                        current_user=Depends(admission.limit("batch_predict"))):
     """
-    Predict survival probabilities for a batch of input data from a CSV or Excel file.
+    Predict survival probabilities for a batch of input data from a CSV, Excel, Parquet,
+    Arrow IPC, .npy or JSON file.
+
+    Parquet, Arrow and .npy files are loaded straight into a float matrix with no text parsing.
+    Parquet and Arrow columns are matched by name like CSV columns; a .npy file must hold a
+    float32 or float64 matrix with the 32 features in model order. Binary formats may be sent as
+    `application/octet-stream` with a `.parquet`, `.arrow`, `.feather` or `.npy` file name.
+    A JSON file holds an array of named-feature objects (`[{"B2M_expression": 0.4, ...}, ...]`)
+    or of 32-value arrays in model order; rows missing features are predicted as null.
+
+    The Accept header selects how the results are returned:
+    - `application/json` (default): `{"predictions": [{"row": i, "survival_probability": p}, ...],
+      "model_version": v}`
+    - `application/vnd.oncoai.columns+json`: `{"model_version": v, "survival_probability": [p, ...]}`,
+      one value per row in file order
+    - `text/csv`: a `row,survival_probability` header and one line per row, empty when missing
+    - `application/x-npy`: a float32 vector with one value per row, NaN when missing
+
+    With `annotate=true`, the uploaded file itself is returned in its own format with a
+    `survival_probability` column appended, so it needs no join with the input. Bodies of
+    GZIP_MIN_SIZE bytes or more are gzip-compressed for clients that accept it. The
+    `X-Model-Version` header names the model version in every representation.
 
     Parameters:
     - file (UploadFile): The uploaded file containing the input data.
+    - annotate (bool): Return the uploaded file with the probabilities appended.
 
     Returns:
-    - JSONResponse: A JSON response containing the survival probabilities for each row in the input data.
+    - Response: The survival probabilities for each row in the input data, in the negotiated
+      representation, or the annotated file.
 
     Raises:
-    - HTTPException: If the file format is not supported or if there is an error reading the file.
+    - HTTPException: If the file format is not supported or if there is an error reading the file;
+      429 with Retry-After if the user's request rate or batch rows in flight are over their limits;
+      504 if parsing and scoring take longer than BATCH_PREDICT_DEADLINE.
     """
-    if file.content_type not in [
-        "text/csv",
-        "application/vnd.ms-excel",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    ]:
-        return JSONResponse(status_code=400, content={"error": "Formato no soportado, usa CSV o Excel"})
+    started = time.perf_counter()
+    result_type = negotiate_result_type(request.headers.get("accept"))
+    compress = accepts_gzip(request.headers.get("accept-encoding"))
+    # Parsing and scoring share the deadline; unstarted executor calls are cancelled with it
+    async with admission.deadline("batch_predict", BATCH_PREDICT_DEADLINE) as cancel:
+        parsed = await _read_batch(file)
+        if isinstance(parsed, JSONResponse):
+            return parsed
+        matrix, valid = parsed
+
+        batch_predict_rows.observe(len(matrix), "batch_predict")
+        await admission.check_connected(request, "batch_predict")
+        handle = registry.current()
+        # Rows stay reserved until scoring stops in its thread, which it does between chunks
+        # once the deadline fires
+        probs = await admission.run_rows(
+            current_user.username, len(matrix), "batch_predict", inference_executor, score_batch, matrix, valid, handle, cancel,
+        )
+        # Digest of the parsed feature matrix, hashed off the event loop like the parsing itself
+        digest = await inference_executor.run(feature_key, matrix, handle.version)
+        audit_log.record(current_user.username, "batch_predict", handle.version, digest, started, rows=len(probs))
+
+        # Encoded and compressed on the executor too, so large results do not block the event loop
+        if not annotate:
+            body, compressed = await inference_executor.run(encode_results, probs, result_type, handle.version, compress)
+            return result_response(body, compressed, result_type, handle.version)
+
+        fmt = upload_format(file.content_type, file.filename)
+        media_type, extension = ANNOTATED_TYPES[fmt]
+        try:
+            body = await inference_executor.run(annotate_upload, file.file, fmt, probs)
+        except ValueError as e:
+            logger.exception("Error al anotar el archivo")
+            return JSONResponse(status_code=400, content={"error": f"Error al anotar el archivo: {str(e)}"})
+        body, compressed = await inference_executor.run(compress_body, body, compress)
+        stem = Path(file.filename or "").stem.encode("ascii", "ignore").decode().replace('"', "") or "batch"
+        return result_response(body, compressed, media_type, handle.version, f"{stem}_predictions{extension}")
+
+async def _read_batch(file: UploadFile) -> tuple[np.ndarray, np.ndarray] | JSONResponse:
+    """
+    Parse an uploaded batch file into a feature matrix on the inference executor.
+
+    Parameters:
+    - file (UploadFile): A CSV, Excel, Parquet, Arrow IPC, .npy or JSON file.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray] | JSONResponse: The (n_rows, 32) float matrix and its row
+      validity mask, or the error response to return if the file cannot be read.
+    """
+    fmt = upload_format(file.content_type, file.filename)
+    if fmt is None:
+        return JSONResponse(status_code=400, content={"error": UNSUPPORTED_FORMAT})
+
+    if fmt in MATRIX_FORMATS:
+        try:
+            return await inference_executor.run(read_matrix, file.file, fmt)
+        except HTTPException:
+            raise
+        except (ValueError, EOFError) as e:
+            logger.exception("Error al leer el archivo")
+            return JSONResponse(status_code=400, content={"error": f"Error al leer el archivo: {str(e)}"})
 
     try:
-        if file.content_type == "text/csv":
-            df = pd.read_csv(file.file)
-        else:
-            df = pd.read_excel(file.file)
+        df = await inference_executor.run(read_upload, file.file, file.content_type)
+    except HTTPException:
+        raise
     except FileNotFoundError:
         logger.exception("Archivo no encontrado")
         return JSONResponse(status_code=400, content={"error": "Archivo no encontrado"})
-    except pd.errors.ParserError:
-        logger.exception("Error al leer el archivo")
-        return JSONResponse(status_code=400, content={"error": "Error al leer el archivo, verifique el formato"})
     except Exception as e:
+        # pandas is already loaded here: read_upload imported it on the executor thread
+        import pandas as pd
+
+        if isinstance(e, pd.errors.ParserError):
+            logger.exception("Error al leer el archivo")
+            return JSONResponse(status_code=400, content={"error": "Error al leer el archivo, verifique el formato"})
         logger.exception(f"Error inesperado al leer el archivo: {str(e)}")
         return JSONResponse(status_code=500, content={"error": f"Error inesperado al leer el archivo: {str(e)}"})
 
-    required_cols = [
-        'B2M_expression', 'B2M_scna', 'C1QB_expression', 'C1QB_scna',
-        'C1QC_expression', 'C1QC_scna', 'CASP1_expression', 'CASP1_scna',
-        'CD2_expression', 'CD2_scna', 'CD3E_expression', 'CD3E_scna',
-        'CD4_expression', 'CD4_scna', 'CD74_expression', 'CD74_scna',
-        'FCER1G_expression', 'FCER1G_scna', 'FCGR3A_expression', 'FCGR3A_scna',
-        'IL10_expression', 'IL10_scna', 'LCK_expression', 'LCK_scna',
-        'LCP2_expression', 'LCP2_scna', 'LYN_expression', 'LYN_scna',
-        'PTPRC_expression', 'PTPRC_scna', 'SERPING1_expression', 'SERPING1_scna'
-    ]
-
-    missing_cols = [c for c in required_cols if c not in df.columns]
+    missing_cols = feature_registry.missing(df.columns)
     if missing_cols:
         return JSONResponse(status_code=400, content={"error": f"Faltan columnas: {missing_cols}"})
+    return await inference_executor.run(frame_to_matrix, df)
 
-    data = df[required_cols].values.tolist()
-    preds = []
-    for features in data:
-        try:
-            prob = model_predict(features)
-            preds.append(prob)
-        except Exception as e:
-            logger.exception(f"Error al predecir la probabilidad de supervivencia: {str(e)}")
-            preds.append(None)
+@router.post(
+    "/explain",
+    response_model=ExplanationOutput,
+    response_class=ORJSONResponse,
+    summary="Predict LGG survival probability with per-feature contributions",
+    responses={
+        501: {
+            "description": "The active model is not a supported tree ensemble",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "El modelo activo no admite explicaciones por característica"}
+                }
+            }
+        }
+    }
+)
+async def explain_survival(data: SurvivalInput, current_user=Depends(admission.limit("explain"))):
+    """
+    Predict LGG survival probability and how much each feature contributed to it.
+
+    Contributions are exact for the tree ensemble: every split on the row's path through each
+    tree moves the score from the parent node's value to the child's, and the difference is
+    credited to the split feature. The bias plus all contributions equals the model's raw
+    score, in log-odds for gradient boosting (`link` "logit") or probability for forests
+    (`link` "identity"). Positive contributions raise the survival probability.
+
+    Explanations are cached under the same key as predictions, so explaining the same features
+    again with the same model costs no tree walk.
+
+    **Parameters:**
+    - **data** (SurvivalInput): Input data, in any of the formats accepted by prediction
+
+    **Returns:**
+    - **ExplanationOutput**: Survival probability, model version, link, bias and the
+      contribution of each feature keyed by name
+
+    **Raises:**
+    - **400 Bad Request**: Invalid feature count, or NaN or infinite values
+    - **429 Too Many Requests**: The user's request rate limit was reached; see Retry-After
+    - **501 Not Implemented**: The active model is not a supported tree ensemble
+    - **504 Gateway Timeout**: The explanation took longer than PREDICT_DEADLINE
+    """
+    started = time.perf_counter()
+    _check_features(data.features)
 
-    results = [{"row": i, "survival_probability": p} for i, p in enumerate(preds)]
-    return {"predictions": results}
+    handle = registry.current()
+    engine = await tree_explainer(handle)
+    key = feature_key(data.features, handle.version)
+    async with admission.deadline("explain", PREDICT_DEADLINE):
+        prob, contributions = await explanation_cache.get_or_compute(
+            key, handle.version, lambda: inference_executor.run(explain_row, data.features, handle)
+        )
+    audit_log.record(current_user.username, "explain", handle.version, key, started, probability=prob)
+    return ORJSONResponse({
+        "survival_probability": prob,
+        "model_version": handle.version,
+        "link": engine.link,
+        "bias": engine.bias,
+        "contributions": dict(zip(feature_registry.names, contributions.tolist())),
+    })
+
+@router.post("/explain/batch", response_model=BatchExplanationOutput, response_class=ORJSONResponse)
+async def explain_batch(request: Request, file: UploadFile = File(...), current_user=Depends(admission.limit("explain_batch"))):
+    """
+    Predict survival probabilities with per-feature contributions for a batch file.
+
+    Accepts the same files as `batch_predict`. All rows are explained in one vectorized pass
+    over the trees; rows explained before, alone or in another batch, are taken from the
+    explanation cache. Contributions are returned column-aligned with `features`.
+
+    Parameters:
+    - file (UploadFile): The uploaded file containing the input data.
+
+    Returns:
+    - ORJSONResponse: Model version, link, bias, feature names, and the probability and
+      contributions of each row, null for rows with missing or non-numeric features.
+
+    Raises:
+    - HTTPException: If the file format is not supported or cannot be read; 429 with Retry-After
+      if the user's request rate or batch rows in flight are over their limits; 501 if the active
+      model is not a supported tree ensemble; 504 if the request takes longer than
+      BATCH_PREDICT_DEADLINE.
+    """
+    started = time.perf_counter()
+    async with admission.deadline("explain_batch", BATCH_PREDICT_DEADLINE) as cancel:
+        parsed = await _read_batch(file)
+        if isinstance(parsed, JSONResponse):
+            return parsed
+        matrix, valid = parsed
+
+        batch_predict_rows.observe(len(matrix), "explain_batch")
+        await admission.check_connected(request, "explain_batch")
+        handle = registry.current()
+        engine = await tree_explainer(handle)
+        probs, contributions = await admission.run_rows(
+            current_user.username, len(matrix), "explain_batch", inference_executor, explain_rows, matrix, valid, handle, cancel,
+        )
+        digest = await inference_executor.run(feature_key, matrix, handle.version)
+        audit_log.record(current_user.username, "explain_batch", handle.version, digest, started, rows=len(matrix))
+
+        return ORJSONResponse({
+            "model_version": handle.version,
+            "link": engine.link,
+            "bias": engine.bias,
+            "features": feature_registry.columns,
+            "predictions": to_nullable(probs),
+            "contributions": [row if ok else None for row, ok in zip(contributions.tolist(), valid.tolist())],
+        })
+
+@router.post("/sweep", response_model=SweepOutput, response_class=ORJSONResponse, summary="What-if sweep over one or two features")
+async def sweep_survival(data: SweepInput, current_user=Depends(admission.limit("sweep"))):
+    """
+    Predict how the survival probability responds as one or two features vary.
+
+    Every grid point is written into one preallocated matrix, with the base vector as an extra
+    last row, and scored in a single model call: a 200-point curve costs one request and one
+    model call rather than 200 of each.
+
+    **Parameters:**
+    - **data** (SweepInput): The base features, in any of the prediction input formats, and
+      the features to vary, each with explicit `values` or `start`, `stop` and `num`
+
+    **Returns:**
+    - **SweepOutput**: The base probability, the grids, and the response curve (one feature)
+      or surface indexed [first][second] (two features)
+
+    **Raises:**
+    - **400 Bad Request**: Invalid base features, unknown or repeated features, invalid grids,
+      or more than SWEEP_MAX_POINTS points
+    - **429 Too Many Requests**: The user's request rate limit was reached; see Retry-After
+    - **504 Gateway Timeout**: The sweep took longer than PREDICT_DEADLINE
+    """
+    started = time.perf_counter()
+    _check_features(data.features)
+
+    handle = registry.current()
+    async with admission.deadline("sweep", PREDICT_DEADLINE):
+        surface, base_prob, grids = await inference_executor.run(run_sweep, data.features, data.vary, handle)
+    audit_log.record(
+        current_user.username, "sweep", handle.version, feature_key(data.features, handle.version), started,
+        rows=surface.size, probability=base_prob,
+    )
+    return ORJSONResponse({
+        "model_version": handle.version,
+        "base_survival_probability": base_prob,
+        "features": [axis.feature for axis in data.vary],
+        "grid": [grid.tolist() for grid in grids],
+        "survival_probability": surface.tolist(),
+    })
+
+@router.post("/batch_predict/stream", response_class=StreamingResponse)
+async def batch_predict_stream(request: Request, file: UploadFile = File(...),
+                               current_user=Depends(admission.limit("batch_predict_stream"))):
+    """
+    Predict survival probabilities for a large CSV file, streaming results as NDJSON.
+
+    The header is checked against the required columns before any data row is read. Rows are
+    then parsed and scored in chunks, and each chunk's results are sent while parsing continues,
+    so memory use depends on the chunk size and not on the file size. For clients that accept
+    gzip, each chunk is compressed as it is produced.
+
+    Parameters:
+    - file (UploadFile): The uploaded CSV file containing the input data.
+
+    Returns:
+    - StreamingResponse: One JSON object per line, `{"row": i, "survival_probability": p}`,
+      with `null` for rows with missing or non-numeric features. The `X-Model-Version` header
+      names the model version used for every row.
+
+    Raises:
+    - HTTPException: If the file is not CSV or if required columns are missing; 429 with
+      Retry-After if the user's request rate is over the limit. Streams are not counted against
+      the batch row cap, since they hold only one chunk of rows at a time.
+    """
+    started = time.perf_counter()
+    if file.content_type != "text/csv" and not (file.filename or "").lower().endswith(".csv"):
+        return JSONResponse(status_code=400, content={"error": "Formato no soportado, usa CSV"})
+
+    try:
+        header = await inference_executor.run(read_csv_header, file.file)
+    except ValueError:
+        logger.exception("Error al leer la cabecera del archivo")
+        return JSONResponse(status_code=400, content={"error": "Error al leer el archivo, verifique el formato"})
+
+    missing_cols = feature_registry.missing(header)
+    if missing_cols:
+        return JSONResponse(status_code=400, content={"error": f"Faltan columnas: {missing_cols}"})
+
+    handle = registry.current()
+    stream = await inference_executor.run(detach_upload, file.file)
+    username = current_user.username
+    # Recorded once the last row is sent, with the number of rows streamed
+    on_complete = lambda rows: audit_log.record(username, "batch_predict_stream", handle.version, None, started, rows=rows)
+    chunks = stream_csv_predictions(stream, handle, on_complete=on_complete)
+    headers = {"X-Model-Version": handle.version, "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        inference_executor.iterate(chunks),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
 
 @router.get("/health")
 def health_check():
-    return {"status": "healthy prediction"}
\ No newline at end of file
+    return {"status": "healthy prediction"}
+
+@router.get(
+    "/models",
+    summary="Loaded model versions",
+    description=(
+        "Lists the model versions currently held in memory, newest first, with their load "
+        "times and which one is serving new requests."
+    )
+)
+def list_models(current_user=Depends(get_current_active_user)):
+    """
+    List the loaded model versions.
+
+    **Returns:**
+    - **dict**: Model registry state
+        - **active** (str): Version serving new requests
+        - **models_dir** (str | None): Directory watched for new model files, null when only
+          MODEL_PATH is served
+        - **watch_interval** (float): Seconds between directory polls (0 when disabled)
+        - **versions** (list): Loaded versions with path, engine, load time and active flag
+    """
+    return {
+        "active": registry.active.version if registry.active is not None else None,
+        "models_dir": str(registry.models_dir) if registry.models_dir is not None else None,
+        "watch_interval": registry.watch_interval,
+        "versions": registry.versions(),
+    }
+
+@router.get(
+    "/stats",
+    summary="Inference scheduler statistics",
+    description=(
+        "Returns micro-batching statistics for single predictions (batch-size and queue-wait "
+        "histograms), inference executor queue depth, prediction cache counters, prediction "
+        "audit log counters and admission control counters."
+    )
+)
+def scheduler_stats(current_user=Depends(get_current_active_user)):
+    """
+    Get inference scheduler statistics.
+
+    **Returns:**
+    - **dict**: Scheduler configuration and collected statistics
+        - **scheduler** (dict): Batch-size and queue-wait histograms and aggregates
+        - **executor** (dict): Inference executor queue depth and rejection counters
+        - **prediction_cache** (dict): Prediction cache size and hit, miss and eviction counters
+        - **explanation_cache** (dict): The same counters for the feature-contribution cache
+        - **audit** (dict): Prediction audit queue size and queued, written, dropped and failed counters
+        - **admission** (dict): Per-user rate limit settings, batch rows in flight and shed request counters
+    """
+    return {
+        "scheduler": {
+            "enabled": scheduler.enabled,
+            "max_batch_size": scheduler.max_batch_size,
+            "max_wait_us": scheduler.max_wait_us,
+            **scheduler.stats.snapshot(),
+        },
+        "executor": inference_executor.snapshot(),
+        "prediction_cache": prediction_cache.snapshot(),
+        "explanation_cache": explanation_cache.snapshot(),
+        "audit": audit_log.snapshot(),
+        "admission": admission.snapshot(),
+    }
\ No newline at end of file
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable
+from fastapi import Depends, HTTPException, Request, status
+from app.core.config import (
+    ADMISSION_ENABLED, RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, RATE_LIMIT_MAX_USERS,
+    BATCH_ROWS_IN_FLIGHT, BATCH_ROWS_RETRY_AFTER,
+)
+from app.core.metrics import metrics, CallbackMetric
+from app.core.security import get_current_active_user
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Not in the HTTP specification; the status nginx logs when the client closed the connection first
+CLIENT_CLOSED_REQUEST = 499
+
+class AdmissionController:
+    """
+    Per-user admission control for the prediction routes.
+
+    Each user has a token bucket refilled at `rate` requests per second and holding at most
+    `burst` tokens; a request without a token is rejected with 429 and a Retry-After header
+    saying when the next token arrives. Batch requests also reserve their rows while they are
+    scored, and a user may have at most `max_rows` rows in flight: a batch that would exceed
+    it gets 429 too. A batch larger than the cap is still admitted when the user has nothing
+    else in flight, so the cap limits concurrency rather than file size.
+
+    Every rejection, deadline and abandoned request is counted by route and reason. State is
+    kept per worker process, so with SERVE_WORKERS workers a user's effective limits are up
+    to that many times higher.
+
+    Parameters:
+    - enabled (bool): Whether the rate limit and the row cap are enforced.
+    - rate (float): Tokens added to each bucket per second.
+    - burst (int): Bucket capacity.
+    - max_users (int): Number of buckets kept; the least recently used are forgotten.
+    - max_rows (int): Batch rows each user may have in flight; 0 disables the cap.
+    - rows_retry_after (int): Seconds suggested in Retry-After when the row cap is reached.
+    """
+    def __init__(self, enabled: bool, rate: float, burst: int, max_users: int, max_rows: int, rows_retry_after: int):
+        self.enabled = enabled
+        self.rate = max(rate, 1e-9)
+        self.burst = max(1, burst)
+        self.max_users = max(1, max_users)
+        self.max_rows = max(0, max_rows)
+        self.rows_retry_after = rows_retry_after
+        self.admitted = 0
+        self.shed: dict[tuple[str, str], int] = {}
+        # username -> [tokens, last refill time]
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count_shed(self, route: str, reason: str):
+        with self._lock:
+            self.shed[route, reason] = self.shed.get((route, reason), 0) + 1
+
+    def _take_token(self, username: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(username)
+            if bucket is None:
+                bucket = self._buckets[username] = [float(self.burst), now]
+                if len(self._buckets) > self.max_users:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(username)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.admitted += 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def check_rate(self, username: str, route: str):
+        """
+        Take one token from the user's bucket.
+
+        Parameters:
+        - username (str): The authenticated user.
+        - route (str): Route name, for the shed counters.
+
+        Raises:
+        - HTTPException: 429 with Retry-After if the user's bucket is empty.
+        """
+        if not self.enabled:
+            return
+        wait = self._take_token(username)
+        if wait > 0:
+            self._count_shed(route, "rate_limit")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiadas solicitudes, intente de nuevo más tarde",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def limit(self, route: str):
+        """
+        Build a dependency that authenticates the user and applies their rate limit.
+
+        Use it in place of `get_current_active_user` on prediction routes.
+
+        Parameters:
+        - route (str): Route name, for the shed counters.
+
+        Returns:
+        - Callable: FastAPI dependency returning the current active user.
+        """
+        async def dependency(current_user=Depends(get_current_active_user)):
+            self.check_rate(current_user.username, route)
+            return current_user
+
+        return dependency
+
+    def reserve_rows(self, username: str, rows: int, route: str):
+        """
+        Reserve `rows` batch rows for the user until `release_rows` is called.
+
+        Parameters:
+        - username (str): The authenticated user.
+        - rows (int): Number of rows about to be scored.
+        - route (str): Route name, for the shed counters.
+
+        Raises:
+        - HTTPException: 429 with Retry-After if the rows would exceed the user's cap.
+        """
+        if not self.enabled or not self.max_rows:
+            return
+        with self._lock:
+            in_flight = self._rows.get(username, 0)
+            rejected = in_flight > 0 and in_flight + rows > self.max_rows
+            if not rejected:
+                self._rows[username] = in_flight + rows
+        if rejected:
+            self._count_shed(route, "rows_in_flight")
+            logger.warning(f"{username} has {in_flight} batch rows in flight, rejecting {rows} more")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiadas filas en proceso, intente de nuevo cuando terminen las solicitudes anteriores",
+                headers={"Retry-After": str(self.rows_retry_after)},
+            )
+
+    def release_rows(self, username: str, rows: int):
+        """
+        Release rows reserved with `reserve_rows`.
+        """
+        if not self.enabled or not self.max_rows:
+            return
+        with self._lock:
+            remaining = self._rows.get(username, 0) - rows
+            if remaining > 0:
+                self._rows[username] = remaining
+            else:
+                self._rows.pop(username, None)
+
+    async def run_rows(self, username: str, rows: int, route: str, executor, fn: Callable, *args):
+        """
+        Score a batch on an executor while holding a reservation of its rows.
+
+        The rows are released when the call finishes in its thread, not when the request stops
+        waiting for it: a batch abandoned by a deadline keeps counting against the user's cap
+        until its thread is done, so repeated timeouts cannot exceed the cap.
+
+        Parameters:
+        - username (str): The authenticated user.
+        - rows (int): Number of rows being scored.
+        - route (str): Route name, for the shed counters.
+        - executor (BoundedExecutor): The executor to run the call on.
+        - fn (Callable): The scoring function.
+        - *args: Arguments passed to the function.
+
+        Returns:
+        - The function's return value.
+
+        Raises:
+        - HTTPException: 429 with Retry-After if the rows would exceed the user's cap; 503 with
+          Retry-After if the executor queue is full.
+        """
+        self.reserve_rows(username, rows, route)
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self.release_rows(username, rows)
+            raise
+        future.add_done_callback(lambda _: self.release_rows(username, rows))
+        return await asyncio.wrap_future(future)
+
+    @asynccontextmanager
+    async def deadline(self, route: str, seconds: float):
+        """
+        Abandon the block's work once `seconds` have passed.
+
+        Awaited executor calls that have not started yet are cancelled with it, so a request
+        whose client has most likely given up stops taking inference threads from others. Calls
+        already running cannot be interrupted; the block gets an event, set once the block is
+        left, that they check between chunks to stop early.
+
+        Parameters:
+        - route (str): Route name, for the shed counters.
+        - seconds (float): The deadline; 0 disables it.
+
+        Yields:
+        - threading.Event: Set when the block is left, by the deadline or otherwise.
+
+        Raises:
+        - HTTPException: 504 if the deadline passes.
+        """
+        cancel = threading.Event()
+        try:
+            async with asyncio.timeout(seconds or None):
+                yield cancel
+        except TimeoutError:
+            self._count_shed(route, "deadline")
+            logger.warning(f"{route} exceeded its {seconds}s deadline")
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Tiempo de espera agotado")
+        finally:
+            cancel.set()
+
+    async def check_connected(self, request: Request, route: str):
+        """
+        Stop a request whose client has already disconnected, before its work is scored.
+
+        Parameters:
+        - request (Request): The current request, with its body already read.
+        - route (str): Route name, for the shed counters.
+
+        Raises:
+        - HTTPException: 499 if the client has disconnected.
+        """
+        if await request.is_disconnected():
+            self._count_shed(route, "disconnected")
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="El cliente cerró la conexión")
+
+    def snapshot(self) -> dict:
+        """
+        Return the admission settings and counters as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "max_rows_in_flight": self.max_rows,
+                "users_tracked": len(self._buckets),
+                "rows_in_flight": sum(self._rows.values()),
+                "admitted": self.admitted,
+                "shed": {f"{route}:{reason}": count for (route, reason), count in self.shed.items()},
+            }
+
+admission = AdmissionController(
+    ADMISSION_ENABLED, RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, RATE_LIMIT_MAX_USERS,
+    BATCH_ROWS_IN_FLIGHT, BATCH_ROWS_RETRY_AFTER,
+)
+
+def _shed_counts():
+    with admission._lock:
+        return list(admission.shed.items())
+
+metrics.register(CallbackMetric(
+    "oncoai_admission_shed_total", "Prediction requests shed by admission control, by route and reason.", "counter",
+    ("route", "reason"), _shed_counts,
+))
+metrics.register(CallbackMetric(
+    "oncoai_admission_rows_in_flight", "Batch rows being scored, summed over users.", "gauge",
+    (), lambda: [((), admission.snapshot()["rows_in_flight"])],
+))
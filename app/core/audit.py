@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from app.core.config import AUDIT_ENABLED, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL
+from app.core.metrics import metrics, CallbackMetric
+from app.db.models import PredictionAudit
+from app.db.session import engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class AuditLog:
+    """
+    Write-behind log of predictions: who requested them, with which model and what result.
+
+    Requests only append a record to an in-memory queue, which costs one lock acquisition. A
+    background thread writes the queue to the prediction_audit table in one bulk insert when
+    `batch_size` records are waiting or `flush_interval` seconds have passed. The queue is
+    bounded: when it is full, because the database is slow or unavailable, new records are
+    dropped and counted rather than slowing requests down or growing memory. Records still
+    queued when the process is killed are lost; a clean shutdown writes them first.
+
+    Parameters:
+    - enabled (bool): Whether records are kept at all.
+    - max_queue (int): Maximum records waiting to be written.
+    - batch_size (int): Number of waiting records that triggers a write.
+    - flush_interval (float): Maximum seconds a record waits before it is written.
+    """
+    def __init__(self, enabled: bool, max_queue: int, batch_size: int, flush_interval: float):
+        self.enabled = enabled
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._queue: list[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    def record(self, username: str, endpoint: str, model_version: str, feature_hash: str | None,
+               started: float, rows: int | None = 1, probability: float | None = None):
+        """
+        Queue one audit record. Safe to call from any thread.
+
+        Parameters:
+        - username (str): The user who requested the prediction.
+        - endpoint (str): The endpoint that served it.
+        - model_version (str): The model version used.
+        - feature_hash (str | None): Digest of the features and model version.
+        - started (float): `time.perf_counter()` when the request started being handled.
+        - rows (int | None): Number of rows scored.
+        - probability (float | None): The predicted probability, for single predictions.
+        """
+        if not self.enabled:
+            return
+        entry = {
+            "created_at": datetime.utcnow(),
+            "username": username,
+            "endpoint": endpoint,
+            "model_version": model_version,
+            "feature_hash": feature_hash,
+            "rows": rows,
+            "survival_probability": probability,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        }
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(entry)
+            self.queued += 1
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Write all queued records in one bulk insert.
+
+        A failed insert is logged and its records are counted as failed, not retried, so a
+        database outage cannot pile up records in memory.
+
+        Returns:
+        - int: Number of records written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._queue = self._queue, []
+            if not batch:
+                return 0
+            try:
+                with engine.begin() as connection:
+                    connection.execute(PredictionAudit.__table__.insert(), batch)
+            except Exception:
+                logger.exception(f"Error writing {len(batch)} audit records")
+                with self._lock:
+                    self.failed += len(batch)
+                return 0
+            with self._lock:
+                self.written += len(batch)
+                self.flushes += 1
+            return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+    def start(self):
+        """
+        Start the background writer, if enabled and not already running.
+        """
+        if not self.enabled or (self._writer is not None and self._writer.is_alive()):
+            return
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """
+        Stop the background writer after writing the records still queued.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=10)
+            self._writer = None
+        self.flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "queue_size": len(self._queue),
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+            }
+
+audit_log = AuditLog(AUDIT_ENABLED, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+
+def _audit_counts():
+    snapshot = audit_log.snapshot()
+    return [((outcome,), snapshot[outcome]) for outcome in ("queued", "written", "dropped", "failed")]
+
+metrics.register(CallbackMetric(
+    "oncoai_audit_records_total", "Prediction audit records by outcome.", "counter",
+    ("outcome",), _audit_counts,
+))
+metrics.register(CallbackMetric(
+    "oncoai_audit_queue_size", "Prediction audit records waiting to be written.", "gauge",
+    (), lambda: [((), audit_log.snapshot()["queue_size"])],
+))
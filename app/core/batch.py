@@ -0,0 +1,267 @@
+import csv
+import io
+import logging
+import shutil
+import tempfile
+import threading
+from concurrent.futures import CancelledError
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator
+import numpy as np
+import orjson
+from app.core.config import BATCH_CHUNK_SIZE, STREAM_CHUNK_SIZE
+from app.core.model import model_predict_batch
+from app.core.registry import registry, ModelHandle
+from app.core.inputs import prepare_input
+from app.core.features import feature_registry
+from app.core.metrics import batch_predict_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# pandas is imported inside the functions that parse files: it adds a large share of the API's
+# import time and is only needed once a file is uploaded.
+
+def frame_to_matrix(df: "pd.DataFrame") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert the required columns of a DataFrame into a float matrix and a row validity mask.
+
+    Non-numeric cells are coerced to NaN column by column, so no Python-level loop over rows
+    is needed; columns pandas already parsed as numbers are copied into the matrix as they
+    are. A row is valid only if all of its 32 features are finite numbers.
+
+    Parameters:
+    - df (pd.DataFrame): Input data containing at least the required columns.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: The (n_rows, 32) float matrix and a boolean mask of valid rows.
+    """
+    import pandas as pd
+
+    features = df[feature_registry.columns]
+    text_columns = [name for name, dtype in features.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+    if text_columns:
+        features = features.assign(**{name: pd.to_numeric(features[name], errors="coerce") for name in text_columns})
+    matrix = features.to_numpy(dtype=np.float64)
+    valid = np.isfinite(matrix).all(axis=1)
+    return matrix, valid
+
+def score_matrix(matrix: np.ndarray, valid: np.ndarray, handle: ModelHandle | None = None, chunk_size: int = BATCH_CHUNK_SIZE,
+                 cancel: threading.Event | None = None) -> np.ndarray:
+    """
+    Score the valid rows of a feature matrix in fixed-size chunks.
+
+    Each chunk is a contiguous slice of the matrix, passed to the model without copying when
+    all of its rows are valid; the model converts it once into a reusable input buffer. Chunks
+    with invalid rows are converted first and their valid rows gathered from the buffer. A
+    chunk whose model call fails is logged and left as NaN, so one failure does not discard
+    the rest of the file.
+
+    Parameters:
+    - matrix (np.ndarray): Array of shape (n_rows, 32) with numerical features.
+    - valid (np.ndarray): Boolean mask of rows to score.
+    - handle (ModelHandle, optional): The model version to use. Defaults to the active model.
+    - chunk_size (int): Maximum number of rows per model call.
+    - cancel (threading.Event, optional): Checked before each chunk; once set, scoring stops,
+      since no one is waiting for the result anymore.
+
+    Returns:
+    - np.ndarray: Survival probabilities, NaN for rows that were masked out or failed.
+
+    Raises:
+    - CancelledError: If `cancel` is set before all chunks are scored.
+    """
+    handle = handle or registry.current()
+    probs = np.full(matrix.shape[0], np.nan)
+    for start in range(0, matrix.shape[0], chunk_size):
+        if cancel is not None and cancel.is_set():
+            logger.info(f"Scoring abandoned after {start} of {matrix.shape[0]} rows")
+            raise CancelledError()
+        chunk = matrix[start:start + chunk_size]
+        chunk_valid = valid[start:start + chunk_size]
+        try:
+            if chunk_valid.all():
+                probs[start:start + len(chunk)] = model_predict_batch(chunk, handle)
+            elif chunk_valid.any():
+                # Converted first, so the valid rows are gathered in the model's dtype, not float64
+                rows = prepare_input(chunk, handle.input_dtype)[chunk_valid]
+                probs[start + np.flatnonzero(chunk_valid)] = model_predict_batch(rows, handle)
+        except Exception as e:
+            logger.exception(f"Error al predecir la probabilidad de supervivencia: {str(e)}")
+    return probs
+
+def to_nullable(probs: np.ndarray) -> list:
+    """
+    Convert an array of probabilities into a list, mapping NaN to None.
+
+    Parameters:
+    - probs (np.ndarray): Survival probabilities, NaN for rows without a prediction.
+
+    Returns:
+    - list: Python floats, None where no prediction is available.
+    """
+    return [None if p != p else p for p in probs.tolist()]
+
+def score_batch(matrix: np.ndarray, valid: np.ndarray, handle: ModelHandle | None = None,
+                cancel: threading.Event | None = None) -> np.ndarray:
+    """
+    Score the valid rows of a feature matrix, logging how many rows are invalid.
+
+    Parameters:
+    - matrix (np.ndarray): Array of shape (n_rows, 32) with numerical features.
+    - valid (np.ndarray): Boolean mask of rows with all features finite.
+    - handle (ModelHandle, optional): The model version to use. Defaults to the active model.
+    - cancel (threading.Event, optional): Set to stop scoring between chunks.
+
+    Returns:
+    - np.ndarray: Survival probability per row, NaN for rows with missing or non-numeric features.
+
+    Raises:
+    - CancelledError: If `cancel` is set before all chunks are scored.
+    """
+    invalid = int(valid.size - valid.sum())
+    if invalid:
+        logger.warning(f"{invalid} filas con características faltantes o no numéricas")
+    return score_matrix(matrix, valid, handle, cancel=cancel)
+
+def read_upload(stream: BinaryIO, content_type: str) -> "pd.DataFrame":
+    """
+    Parse an uploaded CSV or Excel file into a DataFrame.
+
+    Parameters:
+    - stream (BinaryIO): The uploaded file stream.
+    - content_type (str): The content type the file was uploaded with.
+
+    Returns:
+    - pd.DataFrame: The parsed file.
+    """
+    import pandas as pd
+
+    if content_type == "text/csv":
+        return pd.read_csv(stream)
+    return pd.read_excel(stream)
+
+def read_csv_header(stream: BinaryIO) -> list[str]:
+    """
+    Read only the header line of a CSV stream and rewind it.
+
+    Parameters:
+    - stream (BinaryIO): Seekable binary stream positioned at the start of the file.
+
+    Returns:
+    - list[str]: Column names from the header line.
+
+    Raises:
+    - ValueError: If the header cannot be decoded.
+    """
+    line = stream.readline()
+    stream.seek(0)
+    try:
+        text = line.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Cabecera no válida: {e}")
+    return next(csv.reader(io.StringIO(text)), [])
+
+def iter_file_frames(path: str, content_type: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator["pd.DataFrame"]:
+    """
+    Read the required columns of a stored CSV or Excel file in chunks of rows.
+
+    CSV files are parsed incrementally. Excel files cannot be parsed incrementally, so they are
+    read whole and then split.
+
+    Parameters:
+    - path (str): Path to the stored file.
+    - content_type (str): Content type the file was uploaded with.
+    - chunk_size (int): Number of rows per chunk.
+
+    Yields:
+    - pd.DataFrame: Consecutive chunks of rows with the required columns.
+
+    Raises:
+    - ValueError: If required columns are missing.
+    - pd.errors.ParserError: If the file cannot be parsed.
+    """
+    import pandas as pd
+
+    if content_type == "text/csv":
+        with open(path, "rb") as stream:
+            missing_cols = feature_registry.missing(read_csv_header(stream))
+            if missing_cols:
+                raise ValueError(f"Faltan columnas: {missing_cols}")
+            yield from pd.read_csv(stream, usecols=feature_registry.columns, chunksize=chunk_size)
+        return
+
+    df = pd.read_excel(path)
+    missing_cols = feature_registry.missing(df.columns)
+    if missing_cols:
+        raise ValueError(f"Faltan columnas: {missing_cols}")
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def detach_upload(stream: BinaryIO) -> BinaryIO:
+    """
+    Copy an upload into a temporary file owned by the caller.
+
+    FastAPI closes uploaded files once the endpoint returns, before a streaming response body
+    is sent. The copy is made in fixed-size blocks, so memory use does not grow with file size.
+
+    Parameters:
+    - stream (BinaryIO): The uploaded file stream.
+
+    Returns:
+    - BinaryIO: A temporary file positioned at the start, deleted when closed.
+    """
+    stream.seek(0)
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(stream, spool)
+    spool.seek(0)
+    return spool
+
+def stream_csv_predictions(stream: BinaryIO, handle: ModelHandle | None = None, chunk_size: int = STREAM_CHUNK_SIZE,
+                           on_complete: Callable[[int], None] | None = None) -> Iterator[bytes]:
+    """
+    Parse, score and serialize a CSV stream chunk by chunk as NDJSON.
+
+    Only `chunk_size` rows are held in memory at a time, so peak memory depends on the chunk
+    size and not on the file size. If parsing fails part-way, a final `{"error": ...}` line is
+    emitted, since the response status has already been sent.
+
+    Parameters:
+    - stream (BinaryIO): Seekable binary CSV stream whose header was already validated. It is
+      closed once the stream is exhausted.
+    - handle (ModelHandle, optional): The model version to use for every chunk. Defaults to the
+      model active when scoring starts.
+    - chunk_size (int): Number of rows parsed and scored at a time.
+    - on_complete (Callable[[int], None], optional): Called with the number of rows scored once
+      the stream ends, fails or is abandoned by the client.
+
+    Yields:
+    - bytes: NDJSON lines `{"row":i,"survival_probability":p}` for one chunk, p null for rows
+      with missing or non-numeric features.
+    """
+    import pandas as pd
+
+    row = 0
+    try:
+        for chunk in pd.read_csv(stream, usecols=feature_registry.columns, chunksize=chunk_size):
+            matrix, valid = frame_to_matrix(chunk)
+            probs = score_matrix(matrix, valid, handle).tolist()
+            # orjson writes NaN as null
+            yield b"".join(
+                orjson.dumps({"row": i, "survival_probability": p}, option=orjson.OPT_APPEND_NEWLINE)
+                for i, p in enumerate(probs, start=row)
+            )
+            row += len(probs)
+    except (pd.errors.ParserError, ValueError, UnicodeDecodeError) as e:
+        logger.exception(f"Error al leer el archivo en la fila {row}: {str(e)}")
+        yield orjson.dumps(
+            {"error": f"Error al leer el archivo en la fila {row}, verifique el formato"},
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+    finally:
+        stream.close()
+        batch_predict_rows.observe(row, "batch_predict_stream")
+        if on_complete is not None:
+            on_complete(row)
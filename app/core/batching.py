@@ -0,0 +1,161 @@
+import asyncio
+import bisect
+import logging
+import time
+import numpy as np
+from app.core.config import MICROBATCH_ENABLED, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_US
+from app.core.model import model_predict_vectors
+from app.core.registry import ModelHandle
+from app.core.executor import inference_executor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_BUCKETS_US = (50, 100, 250, 500, 1000, 2000, 5000, 10000, 50000)
+
+class BatchStats:
+    """
+    Batch-size and queue-wait statistics collected by the inference scheduler.
+
+    Attributes:
+    - batches (int): Number of micro-batches scored.
+    - rows (int): Number of rows scored across all micro-batches.
+    - batch_size_counts (list[int]): Per-bucket counts of batch sizes (last bucket is +Inf).
+    - queue_wait_counts (list[int]): Per-bucket counts of queue waits in microseconds (last bucket is +Inf).
+    - queue_wait_sum_us (float): Total queue wait of all rows in microseconds.
+    - queue_wait_max_us (float): Largest queue wait observed in microseconds.
+    """
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_wait_counts = [0] * (len(QUEUE_WAIT_BUCKETS_US) + 1)
+        self.queue_wait_sum_us = 0.0
+        self.queue_wait_max_us = 0.0
+
+    def observe_batch(self, size: int, waits_us: list[float]):
+        self.batches += 1
+        self.rows += size
+        self.batch_size_counts[bisect.bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+        for wait in waits_us:
+            self.queue_wait_counts[bisect.bisect_left(QUEUE_WAIT_BUCKETS_US, wait)] += 1
+            self.queue_wait_sum_us += wait
+            if wait > self.queue_wait_max_us:
+                self.queue_wait_max_us = wait
+
+    def snapshot(self) -> dict:
+        """
+        Return the statistics as a JSON-serializable dictionary.
+        """
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "batch_size_buckets": _buckets(BATCH_SIZE_BUCKETS, self.batch_size_counts),
+            "queue_wait_us_buckets": _buckets(QUEUE_WAIT_BUCKETS_US, self.queue_wait_counts),
+            "mean_queue_wait_us": self.queue_wait_sum_us / self.rows if self.rows else 0.0,
+            "max_queue_wait_us": self.queue_wait_max_us,
+        }
+
+def _buckets(bounds: tuple, counts: list[int]) -> dict:
+    labels = [str(b) for b in bounds] + ["+Inf"]
+    return dict(zip(labels, counts))
+
+class MicroBatcher:
+    """
+    Inference scheduler that groups concurrent single-row predictions into one model call.
+
+    The first row to arrive opens a window of `max_wait_us` microseconds. The window closes
+    early once `max_batch_size` rows are pending. All pending rows are then stacked into one
+    matrix, scored with a single `predict_proba` call on the inference executor, and each
+    caller receives its own row. Rows are scored with the model version their request
+    started with, so a hot swap never mixes versions within a request.
+
+    Parameters:
+    - max_batch_size (int): Maximum number of rows in one batch.
+    - max_wait_us (int): Maximum time in microseconds the first row of a batch waits.
+    - enabled (bool): If False, every row is scored immediately on its own.
+    """
+    def __init__(self, max_batch_size: int, max_wait_us: int, enabled: bool = True):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_us = max(0, max_wait_us)
+        self.enabled = enabled
+        self.stats = BatchStats()
+        self._pending: list[tuple[np.ndarray, ModelHandle, asyncio.Future, float]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, features: list[float], handle: ModelHandle) -> float:
+        """
+        Queue one feature vector and wait for its survival probability.
+
+        Parameters:
+        - features (list[float]): List of 32 numerical features.
+        - handle (ModelHandle): The model version to score with.
+
+        Returns:
+        - float: Survival probability between 0 and 1.
+
+        Raises:
+        - ValueError: If the number of features is not 32.
+        - RuntimeError: If the model prediction fails.
+        - HTTPException: 503 with Retry-After if the inference queue is full.
+        """
+        row = np.asarray(features, dtype=np.float64)
+        if row.shape != (32,):
+            raise ValueError("El modelo requiere exactamente 32 características")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, handle, future, time.perf_counter()))
+
+        if not self.enabled or len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_us / 1_000_000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Keep a reference so the task is not garbage collected while it runs
+        task = asyncio.get_running_loop().create_task(self._score(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, batch: list[tuple[np.ndarray, ModelHandle, asyncio.Future, float]]):
+        started = time.perf_counter()
+        waits_us = [(started - queued_at) * 1_000_000 for _, _, _, queued_at in batch]
+        self.stats.observe_batch(len(batch), waits_us)
+
+        # Normally one group; two only while a model swap is in progress
+        groups: dict[int, list] = {}
+        for entry in batch:
+            groups.setdefault(id(entry[1]), []).append(entry)
+        await asyncio.gather(*(self._score_group(group) for group in groups.values()))
+
+    async def _score_group(self, group: list[tuple[np.ndarray, ModelHandle, asyncio.Future, float]]):
+        handle = group[0][1]
+        try:
+            # Stacked on the executor thread, into that thread's reusable input buffer
+            probs = await inference_executor.run(model_predict_vectors, [row for row, _, _, _ in group], handle)
+        except Exception as e:
+            for _, _, future, _ in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future, _), prob in zip(group, probs):
+            if not future.done():
+                future.set_result(float(prob))
+
+scheduler = MicroBatcher(MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_US, enabled=MICROBATCH_ENABLED)
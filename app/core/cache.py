@@ -0,0 +1,260 @@
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+import numpy as np
+from app.core.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from app.core.registry import registry
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Size-bounded, thread-safe LRU cache with optional per-entry expiry.
+
+    Parameters:
+    - maxsize (int): Maximum number of entries; 0 disables the cache.
+    - ttl (float | None): Default time-to-live in seconds; None or 0 keeps entries until evicted.
+
+    Attributes:
+    - hits (int): Lookups that returned a live entry.
+    - misses (int): Lookups that found no entry or an expired one.
+    - evictions (int): Entries removed to stay within `maxsize`.
+    - expirations (int): Entries dropped because their time-to-live passed.
+    - invalidations (int): Entries removed explicitly or by `clear`.
+    - generation (int): Bumped by every `invalidate` and `clear`. A caller that loads a value
+      outside the cache reads it first and passes it to `set`, which then skips the write if
+      an invalidation happened during the load.
+    """
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = max(0, maxsize)
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for `key`, or `default` if absent or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None):
+        """
+        Store `value` under `key`, evicting the least recently used entries if full.
+
+        Parameters:
+        - key (Hashable): The cache key.
+        - value (Any): The value to store.
+        - ttl (float | None): Time-to-live in seconds for this entry; defaults to the cache TTL.
+        - generation (int | None): The `generation` read before the value was loaded; if the
+          cache has been invalidated since, the value may be stale and is not stored.
+        """
+        if self.maxsize == 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """
+        Remove `key` from the cache if present.
+        """
+        with self._lock:
+            # Bumped even if absent, since the key may be being loaded
+            self.generation += 1
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def snapshot(self) -> dict:
+        """
+        Return the cache size and counters as a JSON-serializable dictionary.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+def feature_key(features, model_version: str) -> str:
+    """
+    Canonical cache key for a feature vector scored by a given model version.
+
+    Features are hashed as little-endian float64 with negative zero folded into zero, so the
+    same values give the same key however the client formatted them.
+
+    Parameters:
+    - features (Sequence[float] | np.ndarray): The 32 feature values.
+    - model_version (str): The version of the model producing the prediction.
+
+    Returns:
+    - str: Hex digest identifying the (features, model version) pair.
+    """
+    row = np.asarray(features, dtype="<f8") + 0.0
+    digest = hashlib.blake2b(row.tobytes(), digest_size=16)
+    digest.update(model_version.encode())
+    return digest.hexdigest()
+
+def feature_keys(matrix: np.ndarray, model_version: str) -> list[str]:
+    """
+    `feature_key` of every row of a matrix, canonicalized in one pass.
+
+    Parameters:
+    - matrix (np.ndarray): Array of shape (n_rows, 32).
+    - model_version (str): The version of the model producing the predictions.
+
+    Returns:
+    - list[str]: One key per row, equal to `feature_key` of that row.
+    """
+    rows = np.ascontiguousarray(matrix, dtype="<f8") + 0.0
+    width = rows.shape[1] * rows.itemsize
+    buffer = memoryview(rows.tobytes())
+    version = model_version.encode()
+    keys = []
+    for start in range(0, len(buffer), width):
+        digest = hashlib.blake2b(buffer[start:start + width], digest_size=16)
+        digest.update(version)
+        keys.append(digest.hexdigest())
+    return keys
+
+class PredictionCache:
+    """
+    In-process cache of survival predictions keyed by feature vector and model version.
+
+    Concurrent requests for the same key share one computation. The cache is cleared once when
+    a prediction for a newly activated model version is requested, so stale entries never
+    outlive a model. Requests still finishing with the previous version during a hot swap
+    neither clear it again nor store their results.
+
+    Parameters:
+    - maxsize (int): Maximum number of cached predictions; 0 disables caching.
+    - ttl (float | None): Time-to-live in seconds; None or 0 keeps entries until evicted.
+    """
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.cache = LRUCache(maxsize, ttl)
+        self.model_version: str | None = None
+        self.coalesced = 0
+        self.model_changes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _check_version(self, model_version: str):
+        # Only the active version moves the cache forward; keys carry the version anyway
+        active = registry.active
+        if active is not None and model_version != active.version:
+            return
+        if model_version != self.model_version:
+            if self.model_version is not None:
+                self.model_changes += 1
+                self.cache.clear()
+            self.model_version = model_version
+
+    async def get_or_compute(self, key: str, model_version: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, computing it once if absent.
+
+        Parameters:
+        - key (str): Cache key from `feature_key`.
+        - model_version (str): The version of the model producing the prediction.
+        - compute (Callable[[], Awaitable]): Coroutine factory producing the value on a miss.
+
+        Returns:
+        - The cached or freshly computed value.
+        """
+        self._check_version(model_version)
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        # Run as a task so a caller that disconnects does not cancel it for the others
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._complete, key, model_version))
+        return await asyncio.shield(task)
+
+    def get(self, key: str, model_version: str, default: Any = None) -> Any:
+        """
+        Return the cached value for `key`, or `default`. Safe to call from any thread.
+
+        For callers that look up many keys and compute the misses together.
+        """
+        self._check_version(model_version)
+        return self.cache.get(key, default)
+
+    def set(self, key: str, model_version: str, value: Any):
+        """
+        Store a value computed outside `get_or_compute`, unless a newer model version was seen.
+        """
+        if self.model_version == model_version:
+            self.cache.set(key, value)
+
+    def _complete(self, key: str, model_version: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.model_version == model_version:
+            self.cache.set(key, task.result())
+
+    def snapshot(self) -> dict:
+        """
+        Return the cache counters as a JSON-serializable dictionary.
+        """
+        return {
+            **self.cache.snapshot(),
+            "coalesced": self.coalesced,
+            "model_version": self.model_version,
+            "model_changes": self.model_changes,
+        }
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
@@ -1,6 +1,21 @@
+import math
 import os
 from pathlib import Path
 
+def _available_cpus() -> int:
+    # CPUs this process may run on: its affinity mask, further limited by a cgroup v2 CPU quota
+    # (docker --cpus, Kubernetes limits), which os.cpu_count() ignores
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+AVAILABLE_CPUS = _available_cpus()
+
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -11,11 +26,98 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Verified JWT cache
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# Password hashing executor
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "2"))
+
+# Authenticated user (principal) cache
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
 # Model
 MODEL_PATH = os.getenv("MODEL_PATH", str(BASE_DIR / "app" / "core" / "models" / "gradient_boosting_model.joblib"))
+MODELS_DIR = os.getenv("MODELS_DIR")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "3"))
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn")
+COMPILED_ENGINE_MAX_ROWS = int(os.getenv("COMPILED_ENGINE_MAX_ROWS", "256"))
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'test.db'}")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
+# Inference scheduler (micro-batching of single predictions)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "true").lower() == "true"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_US = int(os.getenv("MICROBATCH_MAX_WAIT_US", "2000"))
+
+# Prediction cache
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "0"))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "10000"))
+
+# What-if sweeps
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "10000"))
+
+# Inference executor
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, AVAILABLE_CPUS))))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+# Batch scoring
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "10000"))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "5000"))
+INPUT_BUFFER_MAX_ROWS = int(os.getenv("INPUT_BUFFER_MAX_ROWS", str(BATCH_CHUNK_SIZE)))
+
+# Batch result downloads
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "16384"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "1"))
+
+# Background batch-scoring jobs
+JOBS_DIR = os.getenv("JOBS_DIR", str(BASE_DIR / "jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RESULTS_MAX_PAGE = int(os.getenv("JOB_RESULTS_MAX_PAGE", "10000"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "30"))
+JOB_CLEANUP_INTERVAL = float(os.getenv("JOB_CLEANUP_INTERVAL", "3600"))
+
+# Prediction audit log
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_ADMINS = [name.strip() for name in os.getenv("AUDIT_ADMINS", "").split(",") if name.strip()]
+AUDIT_MAX_PAGE = int(os.getenv("AUDIT_MAX_PAGE", "1000"))
+
+# Per-user admission control
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "20"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "40"))
+RATE_LIMIT_MAX_USERS = int(os.getenv("RATE_LIMIT_MAX_USERS", "10000"))
+BATCH_ROWS_IN_FLIGHT = int(os.getenv("BATCH_ROWS_IN_FLIGHT", "200000"))
+BATCH_ROWS_RETRY_AFTER = int(os.getenv("BATCH_ROWS_RETRY_AFTER", "2"))
+PREDICT_DEADLINE = float(os.getenv("PREDICT_DEADLINE", "10"))
+BATCH_PREDICT_DEADLINE = float(os.getenv("BATCH_PREDICT_DEADLINE", "120"))
+
+# Metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Production server (python -m app.serve)
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(min(8, AVAILABLE_CPUS))))
+SERVE_KEEP_ALIVE = int(os.getenv("SERVE_KEEP_ALIVE", "5"))
+SERVE_MEMORY_REPORT_INTERVAL = float(os.getenv("SERVE_MEMORY_REPORT_INTERVAL", "300"))
 
 """
 Configuration settings for the OncoAI API.
@@ -24,9 +126,69 @@ This module contains the configuration settings for the OncoAI API, including se
 
 Attributes:
     BASE_DIR (Path): The base directory of the project.
+    AVAILABLE_CPUS (int): CPUs the process may use, from its CPU affinity and any cgroup v2 CPU quota.
     SECRET_KEY (str): The secret key used for encoding JWT tokens.
     ALGORITHM (str): The algorithm used for encoding JWT tokens.
     ACCESS_TOKEN_EXPIRE_MINUTES (int): The expiration time for access tokens in minutes.
-    MODEL_PATH (str): The path to the machine learning model file.
+    TOKEN_CACHE_SIZE (int): Maximum number of verified tokens cached until their expiry; 0 disables the cache.
+    PASSWORD_HASH_WORKERS (int): Number of threads hashing and verifying passwords.
+    PASSWORD_HASH_QUEUE_SIZE (int): Maximum password operations queued or running before logins get 503.
+    PASSWORD_HASH_RETRY_AFTER (int): Seconds suggested in the Retry-After header when the password queue is full.
+    PRINCIPAL_CACHE_SIZE (int): Maximum number of authenticated users cached; 0 disables the cache.
+    PRINCIPAL_CACHE_TTL (float): Seconds a cached user stays valid; bounds staleness across worker processes.
+    MODEL_PATH (str): The path to the machine learning model file; the only model served unless MODELS_DIR is set, or if it has no model files.
+    MODELS_DIR (str | None): Directory watched for model files, the newest *.joblib file being the active model. Unset by default, so no other file replaces MODEL_PATH.
+    MODEL_WATCH_INTERVAL (float): Seconds between checks of MODELS_DIR, or of MODEL_PATH when it is unset, for a new model; 0 disables hot swapping.
+    MODEL_REGISTRY_KEEP (int): Number of loaded model versions kept and listed, including the active one.
+    INFERENCE_ENGINE (str): "sklearn" (default) to always use predict_proba, "compiled" to score small batches with the array-backed tree evaluator.
+    COMPILED_ENGINE_MAX_ROWS (int): Largest batch scored by the compiled engine; larger batches use sklearn.
     DATABASE_URL (str): The URL for the database connection.
+    DB_POOL_SIZE (int): Database connections kept open in the pool; about the number of threads running handlers.
+    DB_MAX_OVERFLOW (int): Extra connections opened above DB_POOL_SIZE under bursts, closed when returned.
+    DB_POOL_TIMEOUT (float): Seconds a session waits for a free pooled connection before failing.
+    SQLITE_WAL (bool): Whether SQLite databases use write-ahead logging, so reads never wait for a write.
+    SQLITE_SYNCHRONOUS (str): SQLite synchronous pragma; NORMAL is durable against crashes of the process under WAL.
+    SQLITE_CACHE_SIZE_KB (int): SQLite page cache size per connection, in KiB.
+    SQLITE_MMAP_SIZE (int): Bytes of the SQLite database file read through memory mapping; 0 disables it.
+    SQLITE_BUSY_TIMEOUT_MS (int): Milliseconds a SQLite connection waits for a lock held by another writer.
+    MICROBATCH_ENABLED (bool): Whether single predictions are grouped into micro-batches.
+    MICROBATCH_MAX_SIZE (int): Maximum number of rows scored in one micro-batch.
+    MICROBATCH_MAX_WAIT_US (int): Maximum time in microseconds a request waits for its batch to fill.
+    PREDICTION_CACHE_SIZE (int): Maximum number of cached predictions; 0 disables the cache.
+    PREDICTION_CACHE_TTL (float): Time-to-live of cached predictions in seconds; 0 keeps them until evicted.
+    EXPLANATION_CACHE_SIZE (int): Maximum number of cached feature-contribution explanations; 0 disables the cache.
+    SWEEP_MAX_POINTS (int): Maximum number of grid points scored by one what-if sweep.
+    INFERENCE_WORKERS (int): Number of threads running model scoring and file parsing; defaults to the available CPUs, at most 4.
+    INFERENCE_QUEUE_SIZE (int): Maximum inference calls queued or running before requests get 503.
+    INFERENCE_RETRY_AFTER (int): Seconds suggested in the Retry-After header when the queue is full.
+    BATCH_CHUNK_SIZE (int): Maximum number of rows scored per model call in batch scoring.
+    STREAM_CHUNK_SIZE (int): Number of CSV rows parsed and scored at a time in streaming batch scoring.
+    INPUT_BUFFER_MAX_ROWS (int): Rows of the largest model input buffer kept and reused by each inference thread.
+    GZIP_MIN_SIZE (int): Smallest batch result body, in bytes, gzip-compressed for clients that accept it.
+    GZIP_LEVEL (int): zlib compression level (1-9) of gzip-compressed batch results and streams.
+    JOBS_DIR (str): Directory where uploaded job files and their results are stored.
+    JOB_WORKERS (int): Number of worker processes scoring background jobs.
+    JOB_RESULTS_MAX_PAGE (int): Maximum number of rows returned per page of job results.
+    JOB_RETENTION_DAYS (float): Days a completed or failed job and its files are kept after it finished; 0 keeps them forever.
+    JOB_CLEANUP_INTERVAL (float): Seconds between deletions of expired jobs.
+    AUDIT_ENABLED (bool): Whether predictions are recorded in the prediction audit log.
+    AUDIT_QUEUE_SIZE (int): Maximum audit records waiting to be written; further records are dropped and counted.
+    AUDIT_BATCH_SIZE (int): Number of queued audit records that triggers a write before the flush interval.
+    AUDIT_FLUSH_INTERVAL (float): Maximum seconds an audit record waits in memory before it is written.
+    AUDIT_ADMINS (list[str]): Usernames allowed to read every user's audit records; others read only their own.
+    AUDIT_MAX_PAGE (int): Maximum number of audit records returned per page.
+    ADMISSION_ENABLED (bool): Whether prediction routes enforce the per-user rate limit and batch row cap.
+    RATE_LIMIT_PER_SECOND (float): Prediction requests per second each user may sustain, per worker process.
+    RATE_LIMIT_BURST (int): Prediction requests a user may send at once after being idle.
+    RATE_LIMIT_MAX_USERS (int): Number of users whose rate limit state is kept; the least recently seen are forgotten.
+    BATCH_ROWS_IN_FLIGHT (int): Batch rows each user may have being scored at once, per worker process; 0 disables the cap.
+    BATCH_ROWS_RETRY_AFTER (int): Seconds suggested in the Retry-After header when a user's batch rows are over the cap.
+    PREDICT_DEADLINE (float): Seconds a single prediction may take before it is abandoned with 504; 0 disables it.
+    BATCH_PREDICT_DEADLINE (float): Seconds a batch prediction may take before it is abandoned with 504; 0 disables it.
+    METRICS_ENABLED (bool): Whether request latency is recorded and /metrics is served.
+    SERVE_HOST (str): Address the production server listens on.
+    SERVE_PORT (int): Port the production server listens on.
+    SERVE_WORKERS (int): Number of worker processes forked by the production server; defaults to the available CPUs, at most 8.
+    SERVE_KEEP_ALIVE (int): Seconds an idle HTTP keep-alive connection is held open.
+    SERVE_MEMORY_REPORT_INTERVAL (float): Seconds between per-worker memory reports; 0 reports only at startup.
 """
@@ -0,0 +1,259 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator
+from fastapi import HTTPException, status
+from app.core.config import INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, INFERENCE_RETRY_AFTER
+from app.core.metrics import metrics, CallbackMetric, executor_queue_wait_seconds
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# Every executor created, for the metrics endpoint
+_executors: list["BoundedExecutor"] = []
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool for blocking CPU-bound work, with a bounded queue.
+
+    Model scoring, pandas parsing and bcrypt release the GIL for most of their work, so a
+    thread pool keeps them off the asyncio event loop without copying state into other
+    processes. At most `max_pending` calls may be queued or running; further calls are
+    rejected with 503 and a Retry-After header instead of stalling the worker.
+
+    Parameters:
+    - name (str): Name used for thread names and log messages.
+    - workers (int): Number of threads.
+    - max_pending (int): Maximum number of calls queued or running at once.
+    - retry_after (int): Seconds suggested to clients in the Retry-After header.
+    """
+    def __init__(self, name: str, workers: int, max_pending: int, retry_after: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after = retry_after
+        self.pending = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.max_pending_seen = 0
+        self.queue_wait_sum = 0.0
+        self.queue_wait_max = 0.0
+        self.run_time_sum = 0.0
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        _executors.append(self)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so forked server workers each start their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def _admit(self):
+        # Checks capacity and counts the call as pending in one locked step, so concurrent
+        # callers cannot all pass the check before any of them is counted
+        with self._lock:
+            if self.pending < self.max_pending:
+                self._count()
+                return
+            self.rejected += 1
+            pending = self.pending
+        logger.warning(f"{self.name} queue full ({pending} pending), rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio saturado, intente de nuevo más tarde",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _enter(self):
+        # Counts a call without checking capacity, for the later items of an admitted stream
+        with self._lock:
+            self._count()
+
+    def _count(self):
+        self.pending += 1
+        self.submitted += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+
+    def _exit(self):
+        with self._lock:
+            self.pending -= 1
+
+    def _timed(self, fn: Callable, args: tuple, kwargs: dict) -> Callable:
+        queued_at = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            executor_queue_wait_seconds.observe(started - queued_at, self.name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.queue_wait_sum += started - queued_at
+                    self.queue_wait_max = max(self.queue_wait_max, started - queued_at)
+                    self.run_time_sum += finished - started
+
+        return call
+
+    def _submit(self, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        # The call has already been counted by _admit or _enter. It stays counted until it
+        # finishes in its thread, even if the request awaiting it has given up: a call that
+        # has started cannot be interrupted and still occupies a thread
+        try:
+            future = self._get_executor().submit(self._timed(fn, args, kwargs))
+        except BaseException:
+            self._exit()
+            raise
+        future.add_done_callback(lambda _: self._exit())
+        return future
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        # Cancelling the await cancels the call if it has not started yet
+        return await asyncio.wrap_future(self._submit(fn, args, kwargs))
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a blocking function on the pool and return its future.
+
+        The call counts against `max_pending` until it finishes, whether or not its result is
+        awaited. Cancelling the future only stops a call that has not started yet.
+
+        Parameters:
+        - fn (Callable): The function to run.
+        - *args, **kwargs: Arguments passed to the function.
+
+        Returns:
+        - Future: The call's future; await it with `asyncio.wrap_future`.
+
+        Raises:
+        - HTTPException: 503 with Retry-After if the queue is full.
+        """
+        self._admit()
+        return self._submit(fn, args, kwargs)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Run a blocking function on the pool from synchronous code and wait for its result.
+
+        Use this from sync route handlers, which already run in a worker thread; it caps how
+        many such calls execute at once, independently of the server's own thread pool.
+
+        Parameters:
+        - fn (Callable): The function to run.
+        - *args, **kwargs: Arguments passed to the function.
+
+        Returns:
+        - The function's return value.
+
+        Raises:
+        - HTTPException: 503 with Retry-After if the queue is full.
+        """
+        self._admit()
+        return self._submit(fn, args, kwargs).result()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run a blocking function on the pool and await its result.
+
+        Parameters:
+        - fn (Callable): The function to run.
+        - *args, **kwargs: Arguments passed to the function.
+
+        Returns:
+        - The function's return value.
+
+        Raises:
+        - HTTPException: 503 with Retry-After if the queue is full.
+        """
+        self._admit()
+        return await self._run(fn, *args, **kwargs)
+
+    def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """
+        Drive a blocking iterator on the pool, one item at a time.
+
+        Admission is checked once, when this method is called, so a full queue is reported
+        before a streamed response starts. Later items wait for a thread rather than being
+        rejected, since a streamed response cannot change its status.
+
+        Parameters:
+        - iterator (Iterator): The blocking iterator to consume.
+
+        Returns:
+        - AsyncIterator: The iterator's items, each produced on the pool.
+
+        Raises:
+        - HTTPException: 503 with Retry-After if the queue is full.
+        """
+        self._admit()
+        # The admitted slot is used by the first item; a stream dropped before it starts
+        # releases the slot when it is garbage collected
+        reserved = [True]
+        stream = self._iterate(iterator, reserved)
+        weakref.finalize(stream, self._release, reserved)
+        return stream
+
+    def _release(self, reserved: list):
+        if reserved:
+            reserved.clear()
+            self._exit()
+
+    async def _iterate(self, iterator: Iterator, reserved: list) -> AsyncIterator:
+        while True:
+            if reserved:
+                reserved.clear()
+            else:
+                self._enter()
+            item = await self._run(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    def snapshot(self) -> dict:
+        """
+        Return the executor state and counters as a JSON-serializable dictionary.
+        """
+        completed = self.submitted - self.pending
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "max_pending_seen": self.max_pending_seen,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "mean_queue_wait_ms": self.queue_wait_sum / completed * 1000 if completed else 0.0,
+            "max_queue_wait_ms": self.queue_wait_max * 1000,
+            "mean_run_time_ms": self.run_time_sum / completed * 1000 if completed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+metrics.register(CallbackMetric(
+    "oncoai_executor_pending", "Calls queued or running on each executor.", "gauge",
+    ("executor",), lambda: [((e.name,), e.pending) for e in _executors],
+))
+metrics.register(CallbackMetric(
+    "oncoai_executor_max_pending", "Queue capacity of each executor; calls beyond it get 503.", "gauge",
+    ("executor",), lambda: [((e.name,), e.max_pending) for e in _executors],
+))
+metrics.register(CallbackMetric(
+    "oncoai_executor_submitted_total", "Calls accepted by each executor.", "counter",
+    ("executor",), lambda: [((e.name,), e.submitted) for e in _executors],
+))
+metrics.register(CallbackMetric(
+    "oncoai_executor_rejected_total", "Calls rejected with 503 because the executor queue was full.", "counter",
+    ("executor",), lambda: [((e.name,), e.rejected) for e in _executors],
+))
+
+inference_executor = BoundedExecutor("inference", INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, INFERENCE_RETRY_AFTER)
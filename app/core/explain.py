@@ -0,0 +1,133 @@
+import logging
+import threading
+from concurrent.futures import CancelledError
+import numpy as np
+from fastapi import HTTPException, status
+from app.core.config import BATCH_CHUNK_SIZE, EXPLANATION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from app.core.cache import PredictionCache, feature_keys
+from app.core.executor import inference_executor
+from app.core.registry import ModelHandle
+from app.core.tree_engine import CompiledTreeEnsemble
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Keyed by `feature_key`, like the prediction cache; values are (probability, contributions)
+explanation_cache = PredictionCache(EXPLANATION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+def _compiled_explainer(handle: ModelHandle) -> CompiledTreeEnsemble:
+    # Blocking: compiles the model and checks parity on first use
+    engine = handle.explainer()
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="El modelo activo no admite explicaciones por característica",
+        )
+    return engine
+
+async def tree_explainer(handle: ModelHandle) -> CompiledTreeEnsemble:
+    """
+    Return the compiled ensemble that explains the handle's model.
+
+    The first explanation for a model version compiles it and checks parity against sklearn,
+    which takes long enough to stall other requests, so that runs on the inference executor.
+
+    Parameters:
+    - handle (ModelHandle): The model version to explain.
+
+    Returns:
+    - CompiledTreeEnsemble: The compiled ensemble.
+
+    Raises:
+    - HTTPException: 501 if the model is not a supported tree ensemble; 503 with Retry-After
+      if it must be compiled and the inference executor queue is full.
+    """
+    if handle.explainer_ready:
+        return _compiled_explainer(handle)
+    return await inference_executor.run(_compiled_explainer, handle)
+
+def explain_matrix(matrix: np.ndarray, handle: ModelHandle) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Explain every row of a matrix in one vectorized pass over the trees.
+
+    Parameters:
+    - matrix (np.ndarray): Array of shape (n_rows, 32) with finite values.
+    - handle (ModelHandle): The model version to explain.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: Survival probability per row, and the (n_rows, 32)
+      contributions in model column order.
+
+    Raises:
+    - HTTPException: 501 if the model is not a supported tree ensemble.
+    """
+    engine = _compiled_explainer(handle)
+    contributions = engine.contributions(matrix)
+    raw = engine.bias + contributions.sum(axis=1)
+    probs = 1.0 / (1.0 + np.exp(-raw)) if engine.link == "logit" else raw
+    return probs, contributions
+
+def explain_row(features: np.ndarray, handle: ModelHandle) -> tuple[float, np.ndarray]:
+    """
+    Explain one feature vector.
+
+    Parameters:
+    - features (np.ndarray): The 32 finite feature values.
+    - handle (ModelHandle): The model version to explain.
+
+    Returns:
+    - tuple[float, np.ndarray]: Survival probability and the 32 contributions.
+    """
+    probs, contributions = explain_matrix(features.reshape(1, -1), handle)
+    return float(probs[0]), contributions[0]
+
+def explain_rows(matrix: np.ndarray, valid: np.ndarray, handle: ModelHandle,
+                 cancel: threading.Event | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Explain the valid rows of a batch, reusing cached explanations.
+
+    Rows are looked up by their `feature_key`, so a row explained before, alone or in another
+    batch, costs one hash. The remaining rows are explained in vectorized chunks of
+    BATCH_CHUNK_SIZE rows and cached.
+
+    Parameters:
+    - matrix (np.ndarray): Array of shape (n_rows, 32).
+    - valid (np.ndarray): Boolean mask of rows whose features are all finite.
+    - handle (ModelHandle): The model version to explain.
+    - cancel (threading.Event, optional): Checked before each chunk; once set, explaining stops.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: Survival probability per row and (n_rows, 32)
+      contributions, NaN for invalid rows.
+
+    Raises:
+    - HTTPException: 501 if the model is not a supported tree ensemble.
+    - CancelledError: If `cancel` is set before all rows are explained.
+    """
+    _compiled_explainer(handle)
+    probs = np.full(len(matrix), np.nan)
+    contributions = np.full(matrix.shape, np.nan)
+    rows = np.flatnonzero(valid)
+    keys = feature_keys(matrix[rows], handle.version)
+
+    misses = []
+    for row, key in zip(rows, keys):
+        cached = explanation_cache.get(key, handle.version)
+        if cached is None:
+            misses.append(row)
+        else:
+            probs[row], contributions[row] = cached
+    missed_keys = dict(zip(rows, keys))
+    for start in range(0, len(misses), BATCH_CHUNK_SIZE):
+        if cancel is not None and cancel.is_set():
+            raise CancelledError()
+        chunk = misses[start:start + BATCH_CHUNK_SIZE]
+        computed_probs, computed = explain_matrix(matrix[chunk], handle)
+        probs[chunk] = computed_probs
+        contributions[chunk] = computed
+        for i, row in enumerate(chunk):
+            # Copied so a cached row does not keep the whole batch's array alive
+            explanation_cache.set(missed_keys[row], handle.version, (float(computed_probs[i]), computed[i].copy()))
+    if len(rows) < len(matrix):
+        logger.warning(f"{len(matrix) - len(rows)} filas con características faltantes o no numéricas")
+    return probs, contributions
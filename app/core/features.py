@@ -0,0 +1,174 @@
+import logging
+import operator
+from typing import Iterable, Sequence
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Model input features, in the order the bundled model was trained on. A model whose metadata
+# lists its feature names (`feature_names_in_`) overrides this order when it is loaded.
+DEFAULT_FEATURE_NAMES = (
+    'B2M_expression', 'B2M_scna', 'C1QB_expression', 'C1QB_scna',
+    'C1QC_expression', 'C1QC_scna', 'CASP1_expression', 'CASP1_scna',
+    'CD2_expression', 'CD2_scna', 'CD3E_expression', 'CD3E_scna',
+    'CD4_expression', 'CD4_scna', 'CD74_expression', 'CD74_scna',
+    'FCER1G_expression', 'FCER1G_scna', 'FCGR3A_expression', 'FCGR3A_scna',
+    'IL10_expression', 'IL10_scna', 'LCK_expression', 'LCK_scna',
+    'LCP2_expression', 'LCP2_scna', 'LYN_expression', 'LYN_scna',
+    'PTPRC_expression', 'PTPRC_scna', 'SERPING1_expression', 'SERPING1_scna',
+)
+
+def model_feature_names(estimator) -> tuple[str, ...]:
+    """
+    Read the input feature names, in column order, from a fitted estimator's metadata.
+
+    Parameters:
+    - estimator: A fitted sklearn estimator or pipeline.
+
+    Returns:
+    - tuple[str, ...]: `feature_names_in_` if the model was fitted on named columns, otherwise
+      the default names.
+
+    Raises:
+    - ValueError: If the model's features are not the 32 features served by the API.
+    """
+    names = getattr(estimator, "feature_names_in_", None)
+    if names is None:
+        n_features = getattr(estimator, "n_features_in_", len(DEFAULT_FEATURE_NAMES))
+        if n_features != len(DEFAULT_FEATURE_NAMES):
+            raise ValueError(f"El modelo espera {n_features} características, no {len(DEFAULT_FEATURE_NAMES)}")
+        return DEFAULT_FEATURE_NAMES
+
+    names = tuple(str(name) for name in names)
+    if sorted(names) != sorted(DEFAULT_FEATURE_NAMES):
+        unknown = sorted(set(names) - set(DEFAULT_FEATURE_NAMES))
+        missing = sorted(set(DEFAULT_FEATURE_NAMES) - set(names))
+        raise ValueError(f"Características del modelo no soportadas (desconocidas: {unknown}, faltan: {missing})")
+    return names
+
+class FeatureRegistry:
+    """
+    The model's input features: their names in model column order and a precomputed
+    name-to-column index.
+
+    Everything that maps named input to model columns goes through the shared
+    `feature_registry`: CSV, Excel, Parquet and Arrow columns, and named-feature JSON objects.
+    It starts with the default order and is bound to the first model loaded at startup; later
+    model versions must use the same order, so a hot swap never changes what a column means.
+
+    Parameters:
+    - names (Sequence[str]): Feature names in model column order.
+
+    Attributes:
+    - names (tuple[str, ...]): Feature names in model column order.
+    - columns (list[str]): The same names as a list, for pandas and pyarrow column selection.
+    - index (dict[str, int]): Column position of each feature name.
+    - size (int): Number of features.
+    - bound_to (str | None): Version of the model the order was read from, once bound.
+    """
+    def __init__(self, names: Sequence[str]):
+        self.bound_to: str | None = None
+        self._set_names(names)
+
+    def _set_names(self, names: Sequence[str]):
+        self.names = tuple(names)
+        self.columns = list(self.names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.size = len(self.names)
+        # Pulls all features out of a mapping in model order, in a single C-level call
+        self._getter = operator.itemgetter(*self.names)
+
+    def bind(self, estimator, version: str):
+        """
+        Take the feature order from the first model loaded, and check later models against it.
+
+        Parameters:
+        - estimator: The fitted estimator of the model being loaded.
+        - version (str): The model's version, for logging.
+
+        Raises:
+        - ValueError: If the model's features or their order differ from the bound order.
+        """
+        names = model_feature_names(estimator)
+        if self.bound_to is None:
+            if names != self.names:
+                logger.info(f"Feature order taken from model {version}")
+            self._set_names(names)
+            self.bound_to = version
+        elif names != self.names:
+            raise ValueError(f"El modelo {version} usa un orden de características distinto al del modelo {self.bound_to}")
+
+    def missing(self, columns: Iterable[str]) -> list[str]:
+        """
+        Return the features absent from the given column names.
+
+        Parameters:
+        - columns (Iterable[str]): Column names present in the input data.
+
+        Returns:
+        - list[str]: Missing feature names, in model order.
+        """
+        present = set(columns)
+        return [name for name in self.names if name not in present]
+
+    def vector(self, mapping: dict) -> np.ndarray:
+        """
+        Map a named-feature object into a float64 array in model order.
+
+        Parameters:
+        - mapping (dict): Feature values keyed by feature name.
+
+        Returns:
+        - np.ndarray: Array of `size` values in model column order.
+
+        Raises:
+        - ValueError: If features are missing, unknown or not numeric.
+        """
+        try:
+            values = self._getter(mapping)
+        except KeyError:
+            raise ValueError(f"Faltan características: {self.missing(mapping)}")
+        if len(mapping) != self.size:
+            raise ValueError(f"Características desconocidas: {[name for name in mapping if name not in self.index]}")
+        if any(type(v) is bool for v in values):
+            raise ValueError("Las características deben ser numéricas")
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Las características deben ser numéricas")
+
+    def records_to_matrix(self, records: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fill a preallocated matrix from a list of named-feature objects or positional rows.
+
+        Objects are matched by name and extra keys are ignored, as extra CSV columns are.
+        Positional rows must already be in model order. A record that is missing features or
+        holds non-numeric values, booleans included, is left as NaN, so it is predicted as null.
+
+        Parameters:
+        - records (list[dict | list]): One object or array per row.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: The (n_rows, size) float64 matrix and a boolean mask of
+          rows whose features are all finite.
+        """
+        matrix = np.full((len(records), self.size), np.nan)
+        getter = self._getter
+        for i, record in enumerate(records):
+            try:
+                if isinstance(record, dict):
+                    values = getter(record)
+                elif isinstance(record, list) and len(record) == self.size:
+                    values = record
+                else:
+                    continue
+                # Rejected as in `vector` rather than read as 0/1
+                if any(type(v) is bool for v in values):
+                    continue
+                matrix[i] = values
+            except (KeyError, TypeError, ValueError):
+                matrix[i] = np.nan
+        return matrix, np.isfinite(matrix).all(axis=1)
+
+feature_registry = FeatureRegistry(DEFAULT_FEATURE_NAMES)
@@ -0,0 +1,406 @@
+import csv
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator
+import numpy as np
+import orjson
+from fastapi import HTTPException, status
+from app.core.features import feature_registry
+from app.core.results import PROBABILITY_COLUMN, probability_texts
+
+# Upload formats accepted for batch scoring
+CSV, EXCEL, PARQUET, ARROW, NPY, JSON = "csv", "excel", "parquet", "arrow", "npy", "json"
+
+# Formats loaded straight into a float matrix without pandas: columnar and binary formats with
+# no per-cell text parsing, and JSON records mapped through the precomputed feature index
+MATRIX_FORMATS = (PARQUET, ARROW, NPY, JSON)
+
+FORMAT_CONTENT_TYPES = {
+    "text/csv": CSV,
+    "application/vnd.ms-excel": EXCEL,
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": EXCEL,
+    "application/vnd.apache.parquet": PARQUET,
+    "application/x-parquet": PARQUET,
+    "application/vnd.apache.arrow.file": ARROW,
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/x-npy": NPY,
+    "application/json": JSON,
+}
+
+# Used when the client sends a generic content type, as most do for the binary formats
+FORMAT_EXTENSIONS = {
+    ".parquet": PARQUET,
+    ".arrow": ARROW,
+    ".arrows": ARROW,
+    ".feather": ARROW,
+    ".npy": NPY,
+    ".json": JSON,
+}
+
+UNSUPPORTED_FORMAT = "Formato no soportado, usa CSV, Excel, Parquet, Arrow, .npy o JSON"
+
+def upload_format(content_type: str | None, filename: str | None) -> str | None:
+    """
+    Identify the format of an uploaded file.
+
+    Parameters:
+    - content_type (str | None): The content type the file was uploaded with.
+    - filename (str | None): The original file name.
+
+    Returns:
+    - str | None: One of CSV, EXCEL, PARQUET, ARROW, NPY or JSON, or None if unsupported.
+    """
+    fmt = FORMAT_CONTENT_TYPES.get(content_type)
+    if fmt is None and content_type in (None, "", "application/octet-stream"):
+        fmt = FORMAT_EXTENSIONS.get(Path(filename or "").suffix.lower())
+    return fmt
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato Parquet/Arrow no disponible en este servidor (requiere pyarrow)",
+        )
+    return pyarrow
+
+def _check_names(names: list[str]):
+    missing_cols = feature_registry.missing(names)
+    if missing_cols:
+        raise ValueError(f"Faltan columnas: {missing_cols}")
+
+def _check_npy(shape: tuple, dtype: np.dtype):
+    if len(shape) != 2 or shape[1] != feature_registry.size:
+        raise ValueError(f"La matriz .npy debe tener forma (filas, {feature_registry.size}), no {shape}")
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"La matriz .npy debe ser float32 o float64, no {dtype}")
+
+def _open_arrow(pa, source):
+    # Arrow IPC comes in a random-access file format and a streaming format
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pa.ipc.open_stream(source)
+
+def _record_batches(reader) -> Iterator:
+    # The file format is read by index; the streaming format is iterated
+    if hasattr(reader, "num_record_batches"):
+        return (reader.get_batch(i) for i in range(reader.num_record_batches))
+    return iter(reader)
+
+def read_records(data: bytes) -> list:
+    """
+    Parse a JSON batch: an array with one named-feature object or positional array per row.
+
+    Parameters:
+    - data (bytes): The JSON document.
+
+    Returns:
+    - list: The rows.
+
+    Raises:
+    - ValueError: If the document is not valid JSON or not an array.
+    """
+    try:
+        records = orjson.loads(data)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"JSON no válido: {e}")
+    if not isinstance(records, list):
+        raise ValueError("El JSON debe ser una lista de objetos con las características por nombre")
+    return records
+
+def table_to_matrix(table) -> np.ndarray:
+    """
+    Copy the required columns of an Arrow table or record batch into a float64 matrix.
+
+    Each column is copied once, straight into its slot of a preallocated C-contiguous
+    (n_rows, 32) array. Nulls become NaN.
+
+    Parameters:
+    - table (pyarrow.Table | pyarrow.RecordBatch): Data containing at least the required columns.
+
+    Returns:
+    - np.ndarray: The (n_rows, 32) float64 matrix, in model column order.
+
+    Raises:
+    - ValueError: If required columns are missing or not numeric.
+    """
+    import pyarrow as pa
+
+    _check_names(table.schema.names)
+    matrix = np.empty((table.num_rows, feature_registry.size), dtype=np.float64)
+    for j, name in enumerate(feature_registry.names):
+        column = table.column(name)
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise ValueError(f"La columna {name} no es numérica ({column.type})")
+        matrix[:, j] = column.to_numpy(zero_copy_only=False)
+    return matrix
+
+def read_matrix(stream: BinaryIO, fmt: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load an uploaded Parquet, Arrow IPC, .npy or JSON file into a float matrix.
+
+    Parquet and Arrow columns are matched by name, as for CSV files, and only the required
+    columns are read. A .npy file carries no names, so its 32 columns must already be in model
+    order; float32 matrices are kept as float32. JSON objects are matched by name, and JSON
+    arrays are taken in model order.
+
+    Parameters:
+    - stream (BinaryIO): Seekable stream of the uploaded file.
+    - fmt (str): PARQUET, ARROW, NPY or JSON.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: The C-contiguous (n_rows, 32) matrix and a boolean mask of
+      rows whose features are all finite.
+
+    Raises:
+    - ValueError: If the file is malformed or lacks required columns.
+    - HTTPException: 415 if Parquet or Arrow support is not installed.
+    """
+    stream.seek(0)
+    if fmt == JSON:
+        return feature_registry.records_to_matrix(read_records(stream.read()))
+    if fmt == NPY:
+        matrix = np.lib.format.read_array(stream, allow_pickle=False)
+        _check_npy(matrix.shape, matrix.dtype)
+        matrix = np.ascontiguousarray(matrix)
+    else:
+        pa = _pyarrow()
+        if fmt == PARQUET:
+            parquet = pa.parquet.ParquetFile(stream)
+            _check_names(parquet.schema_arrow.names)
+            table = parquet.read(columns=feature_registry.columns)
+        else:
+            table = _open_arrow(pa, stream).read_all()
+        matrix = table_to_matrix(table)
+    return matrix, np.isfinite(matrix).all(axis=1)
+
+def check_upload(stream: BinaryIO, fmt: str):
+    """
+    Validate the column names or shape of a Parquet, Arrow IPC or .npy upload from its header,
+    or that a JSON upload is an array.
+
+    Only the file metadata is read, so a large file can be rejected before it is stored. JSON
+    has no header and is parsed whole.
+
+    Parameters:
+    - stream (BinaryIO): Seekable stream of the uploaded file; rewound afterwards.
+    - fmt (str): PARQUET, ARROW, NPY or JSON.
+
+    Raises:
+    - ValueError: If the file is malformed or lacks required columns.
+    - HTTPException: 415 if Parquet or Arrow support is not installed.
+    """
+    stream.seek(0)
+    try:
+        if fmt == JSON:
+            read_records(stream.read())
+        elif fmt == NPY:
+            version = np.lib.format.read_magic(stream)
+            if version == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(stream)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(stream)
+            _check_npy(shape, dtype)
+        else:
+            pa = _pyarrow()
+            if fmt == PARQUET:
+                _check_names(pa.parquet.read_schema(stream).names)
+            else:
+                _check_names(_open_arrow(pa, stream).schema.names)
+    finally:
+        stream.seek(0)
+
+def count_rows(path: Path, fmt: str) -> int:
+    """
+    Number of data rows of a stored Parquet, Arrow IPC, .npy or JSON file, from its metadata.
+    """
+    if fmt == JSON:
+        return len(read_records(path.read_bytes()))
+    if fmt == NPY:
+        return int(np.load(path, mmap_mode="r", allow_pickle=False).shape[0])
+    pa = _pyarrow()
+    if fmt == PARQUET:
+        return pa.parquet.ParquetFile(path).metadata.num_rows
+    with pa.memory_map(str(path)) as source:
+        return sum(batch.num_rows for batch in _record_batches(_open_arrow(pa, source)))
+
+def iter_file_matrices(path: Path, fmt: str, chunk_size: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Read a stored Parquet, Arrow IPC, .npy or JSON file in chunks of rows.
+
+    .npy and Arrow files are memory-mapped and Parquet files are decoded one batch at a time, so
+    they are never loaded whole. JSON is parsed whole, then converted chunk by chunk.
+
+    Parameters:
+    - path (Path): Path to the stored file.
+    - fmt (str): PARQUET, ARROW, NPY or JSON.
+    - chunk_size (int): Number of rows per chunk.
+
+    Yields:
+    - tuple[np.ndarray, np.ndarray]: Consecutive (matrix, valid rows mask) chunks.
+
+    Raises:
+    - ValueError: If the file is malformed or lacks required columns.
+    """
+    if fmt == JSON:
+        records = read_records(path.read_bytes())
+        for start in range(0, len(records), chunk_size):
+            yield feature_registry.records_to_matrix(records[start:start + chunk_size])
+        return
+
+    if fmt == NPY:
+        mapped = np.load(path, mmap_mode="r", allow_pickle=False)
+        _check_npy(mapped.shape, mapped.dtype)
+        for start in range(0, mapped.shape[0], chunk_size):
+            matrix = np.ascontiguousarray(mapped[start:start + chunk_size])
+            yield matrix, np.isfinite(matrix).all(axis=1)
+        return
+
+    pa = _pyarrow()
+    if fmt == PARQUET:
+        parquet = pa.parquet.ParquetFile(path)
+        _check_names(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=feature_registry.columns):
+            matrix = table_to_matrix(batch)
+            yield matrix, np.isfinite(matrix).all(axis=1)
+        return
+
+    with pa.memory_map(str(path)) as source:
+        reader = _open_arrow(pa, source)
+        _check_names(reader.schema.names)
+        for batch in _record_batches(reader):
+            for start in range(0, batch.num_rows, chunk_size):
+                matrix = table_to_matrix(batch.slice(start, chunk_size))
+                yield matrix, np.isfinite(matrix).all(axis=1)
+
+# Content type and file extension of an upload returned with its predictions appended. Excel
+# files are always written as .xlsx and Arrow files in the IPC file format.
+ANNOTATED_TYPES = {
+    CSV: ("text/csv", ".csv"),
+    EXCEL: ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    PARQUET: ("application/vnd.apache.parquet", ".parquet"),
+    ARROW: ("application/vnd.apache.arrow.file", ".arrow"),
+    NPY: ("application/x-npy", ".npy"),
+    JSON: ("application/json", ".json"),
+}
+
+def _csv_records(text: str) -> Iterator[tuple[str, bool]]:
+    # Yields each record's raw text and whether it holds any value; blank and whitespace-only
+    # lines hold none, and pandas skips them when parsing. Without quote characters every line
+    # is one record, so the csv parser is only needed when quoted fields may span lines.
+    source = io.StringIO(text, newline="")
+    if '"' not in text:
+        for line in source:
+            yield line, bool(line.strip())
+        return
+
+    consumed = []
+
+    def lines():
+        for line in source:
+            consumed.append(line)
+            yield line
+
+    for record in csv.reader(lines()):
+        raw = "".join(consumed)
+        consumed.clear()
+        yield raw, bool(record) and not (len(record) == 1 and not record[0].strip())
+
+def _annotate_csv(data: bytes, probs: np.ndarray) -> bytes:
+    # Each record is copied as it was read, so values keep their original text and quoting
+    values = probability_texts(probs)
+    out = []
+    row = -1
+    for raw, has_values in _csv_records(data.decode("utf-8-sig")):
+        if not has_values:
+            out.append(raw)
+            continue
+        if row == len(values):
+            raise ValueError("El archivo no tiene tantas filas como se predijeron")
+        value = PROBABILITY_COLUMN if row < 0 else values[row]
+        row += 1
+        body = raw.rstrip("\r\n")
+        out.append(body + "," + value + (raw[len(body):] or "\n"))
+    if row != len(values):
+        raise ValueError("El archivo no tiene tantas filas como se predijeron")
+    return "".join(out).encode()
+
+def _annotate_arrow(pa, table, probs: np.ndarray):
+    column = pa.array(probs, mask=np.isnan(probs), type=pa.float64())
+    index = table.schema.get_field_index(PROBABILITY_COLUMN)
+    if index >= 0:
+        return table.set_column(index, PROBABILITY_COLUMN, column)
+    return table.append_column(PROBABILITY_COLUMN, column)
+
+def annotate_upload(stream: BinaryIO, fmt: str, probs: np.ndarray) -> bytes:
+    """
+    Return an uploaded file, in its own format, with a `survival_probability` column appended.
+
+    CSV records keep their original text. Excel, Parquet and Arrow files are rewritten with the
+    new column; a column already named `survival_probability` is replaced. JSON objects get a
+    `survival_probability` key and JSON arrays an extra last value; .npy matrices get a 33rd
+    column in their own dtype. Rows without a prediction get an empty cell, null or NaN.
+
+    Parameters:
+    - stream (BinaryIO): Seekable stream of the uploaded file.
+    - fmt (str): CSV, EXCEL, PARQUET, ARROW, NPY or JSON.
+    - probs (np.ndarray): Survival probability per row, NaN for rows without a prediction.
+
+    Returns:
+    - bytes: The annotated file, of the content type given by ANNOTATED_TYPES.
+
+    Raises:
+    - ValueError: If the file no longer parses into as many rows as were predicted.
+    - HTTPException: 415 if the libraries needed to write the format are not installed.
+    """
+    stream.seek(0)
+    if fmt == CSV:
+        return _annotate_csv(stream.read(), probs)
+
+    if fmt == JSON:
+        records = read_records(stream.read())
+        if len(records) != len(probs):
+            raise ValueError("El archivo no tiene tantas filas como se predijeron")
+        for i, p in enumerate(probs.tolist()):
+            value = None if p != p else p
+            if isinstance(records[i], dict):
+                records[i][PROBABILITY_COLUMN] = value
+            elif isinstance(records[i], list):
+                records[i].append(value)
+        return orjson.dumps(records)
+
+    out = io.BytesIO()
+    if fmt == NPY:
+        matrix = np.lib.format.read_array(stream, allow_pickle=False)
+        np.save(out, np.column_stack((matrix, probs.astype(matrix.dtype))), allow_pickle=False)
+        return out.getvalue()
+
+    if fmt == EXCEL:
+        import pandas as pd
+
+        df = pd.read_excel(stream)
+        df[PROBABILITY_COLUMN] = probs
+        try:
+            df.to_excel(out, index=False)
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Escritura de Excel no disponible en este servidor (requiere openpyxl)",
+            )
+        return out.getvalue()
+
+    pa = _pyarrow()
+    if fmt == PARQUET:
+        table = _annotate_arrow(pa, pa.parquet.read_table(stream), probs)
+        pa.parquet.write_table(table, out)
+    else:
+        table = _annotate_arrow(pa, _open_arrow(pa, stream).read_all(), probs)
+        with pa.ipc.new_file(out, table.schema) as writer:
+            writer.write_table(table)
+    return out.getvalue()
@@ -0,0 +1,118 @@
+import threading
+import numpy as np
+from app.core.config import INPUT_BUFFER_MAX_ROWS
+
+def model_input_dtype(estimator) -> np.dtype:
+    """
+    The dtype a model scores its input in.
+
+    sklearn decision trees, forests and gradient boosting compare float32 features against
+    their thresholds and convert any other input to C-contiguous float32 on every call, as the
+    compiled tree engine does. Other models keep float64.
+
+    Parameters:
+    - estimator: The fitted sklearn estimator.
+
+    Returns:
+    - np.dtype: float32 for sklearn tree models, float64 otherwise.
+    """
+    from sklearn.ensemble import (
+        GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier,
+    )
+    from sklearn.tree import DecisionTreeClassifier
+
+    tree_models = (GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)
+    return np.dtype(np.float32) if isinstance(estimator, tree_models) else np.dtype(np.float64)
+
+class InputBuffers:
+    """
+    Reusable model input matrices, one set per thread.
+
+    Scoring threads take a buffer, fill it with the rows to score and pass it to the model,
+    which reads it in place; the next call on the same thread overwrites it. Inputs are thus
+    converted to the model's dtype and layout once per call, without allocating. Buffers grow
+    in powers of two up to `max_rows` rows; larger inputs get a fresh array.
+
+    A buffer is valid only until the same thread takes another one of the same dtype, so it
+    must not be kept after the model call.
+
+    Parameters:
+    - max_rows (int): Rows of the largest buffer kept per thread and dtype.
+    """
+    def __init__(self, max_rows: int):
+        self.max_rows = max(1, max_rows)
+        self._local = threading.local()
+
+    def take(self, rows: int, n_features: int, dtype: np.dtype) -> np.ndarray:
+        """
+        Return a C-contiguous (rows, n_features) array of `dtype`, with undefined contents.
+
+        Parameters:
+        - rows (int): Number of rows.
+        - n_features (int): Number of columns.
+        - dtype (np.dtype): The element type.
+
+        Returns:
+        - np.ndarray: A view of this thread's buffer, or a new array above `max_rows` rows.
+        """
+        if rows > self.max_rows:
+            return np.empty((rows, n_features), dtype=dtype)
+        buffers = self._local.__dict__
+        key = (n_features, np.dtype(dtype))
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape[0] < rows:
+            capacity = min(1 << max(rows - 1, 0).bit_length(), self.max_rows)
+            buffer = buffers[key] = np.empty((capacity, n_features), dtype=dtype)
+        return buffer[:rows]
+
+input_buffers = InputBuffers(INPUT_BUFFER_MAX_ROWS)
+
+def prepare_input(X: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Return a 2-D matrix as C-contiguous `dtype`, converting it into a reusable buffer if needed.
+
+    Parameters:
+    - X (np.ndarray): Array of shape (n_rows, n_features).
+    - dtype (np.dtype): The model's input dtype.
+
+    Returns:
+    - np.ndarray: `X` itself if it already has the dtype and layout, otherwise a thread buffer.
+    """
+    if X.dtype == dtype and X.flags.c_contiguous:
+        return X
+    out = input_buffers.take(X.shape[0], X.shape[1], dtype)
+    np.copyto(out, X, casting="same_kind")
+    return out
+
+def stack_rows(rows: list[np.ndarray], dtype: np.dtype) -> np.ndarray:
+    """
+    Stack feature vectors straight into a reusable model input buffer.
+
+    Parameters:
+    - rows (list[np.ndarray]): Feature vectors of equal length.
+    - dtype (np.dtype): The model's input dtype.
+
+    Returns:
+    - np.ndarray: Array of shape (len(rows), n_features), a thread buffer when small enough.
+    """
+    out = input_buffers.take(len(rows), rows[0].shape[0], dtype)
+    np.stack(rows, out=out, casting="same_kind")
+    return out
+
+def row_input(features, dtype: np.dtype) -> np.ndarray:
+    """
+    Write one feature vector, given as a sequence or array, into a (1, n) model input buffer.
+
+    Parameters:
+    - features (Sequence[float] | np.ndarray): The feature values.
+    - dtype (np.dtype): The model's input dtype.
+
+    Returns:
+    - np.ndarray: Array of shape (1, len(features)).
+
+    Raises:
+    - TypeError, ValueError: If the values are not numeric.
+    """
+    out = input_buffers.take(1, len(features), dtype)
+    out[0] = features
+    return out
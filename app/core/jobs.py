@@ -0,0 +1,292 @@
+import logging
+import multiprocessing
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO
+import numpy as np
+from app.core.config import JOBS_DIR, JOB_WORKERS, STREAM_CHUNK_SIZE, JOB_RETENTION_DAYS, JOB_CLEANUP_INTERVAL
+from app.db.session import SessionLocal
+from app.db import crud
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Results are stored as little-endian float64, NaN for rows without a prediction
+RESULT_DTYPE = np.dtype("<f8")
+
+_pool: ProcessPoolExecutor | None = None
+_cleanup_stop = threading.Event()
+_cleanup_thread: threading.Thread | None = None
+
+def job_dir(job_id: str) -> Path:
+    """
+    Return the directory holding a job's input file and results.
+    """
+    return Path(JOBS_DIR) / job_id
+
+def input_path(job_id: str) -> Path:
+    return job_dir(job_id) / "input"
+
+def results_path(job_id: str) -> Path:
+    return job_dir(job_id) / "results.f8"
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+def store_upload(job_id: str, stream: BinaryIO):
+    """
+    Copy an uploaded file into the job's directory in fixed-size blocks.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+    - stream (BinaryIO): The uploaded file stream.
+    """
+    job_dir(job_id).mkdir(parents=True, exist_ok=True)
+    stream.seek(0)
+    with open(input_path(job_id), "wb") as out:
+        shutil.copyfileobj(stream, out)
+
+def count_data_rows(path: Path, fmt: str) -> int | None:
+    """
+    Count the data rows of a stored file without parsing it.
+
+    CSV files are scanned for newlines; Parquet, Arrow IPC and .npy files record their row
+    count in their metadata, and JSON files are parsed. Returns None for Excel files, whose row count is only known after
+    parsing.
+    """
+    from app.core.formats import CSV, MATRIX_FORMATS, count_rows
+
+    if fmt in MATRIX_FORMATS:
+        return count_rows(path, fmt)
+    if fmt != CSV:
+        return None
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as stream:
+        while block := stream.read(1 << 20):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+def read_results(job_id: str, offset: int, limit: int) -> np.ndarray:
+    """
+    Read a page of stored results without loading the whole results file.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+    - offset (int): Index of the first row to read.
+    - limit (int): Maximum number of rows to read.
+
+    Returns:
+    - np.ndarray: Survival probabilities, NaN for rows without a prediction.
+    """
+    path = results_path(job_id)
+    if limit <= 0 or not path.exists():
+        return np.empty(0, dtype=RESULT_DTYPE)
+    return np.fromfile(path, dtype=RESULT_DTYPE, count=limit, offset=offset * RESULT_DTYPE.itemsize)
+
+def run_job(job_id: str):
+    """
+    Score a stored job file chunk by chunk, appending results and recording progress.
+
+    Runs inside a worker process. Results are appended to the results file as each chunk is
+    scored, so completed rows can be fetched while the job is still running. A job restarted
+    after a crash starts over from the first row. Every chunk is scored with the model version
+    that was active when the job was submitted, loaded from its file once per worker; jobs
+    recorded without a version use the newest model file and record it. A completed job is
+    written to the audit log with its owner, model version and row count.
+
+    Parameters:
+    - job_id (str): The identifier of the job to run.
+    """
+    # Imported here so the scoring stack is only loaded in worker processes
+    from app.core.batch import iter_file_frames, frame_to_matrix, score_matrix
+    from app.core.formats import upload_format, iter_file_matrices, MATRIX_FORMATS
+    from app.core.registry import registry
+    from app.core.audit import audit_log
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        job = crud.get_job(db, job_id)
+    except Exception:
+        db.close()
+        raise
+
+    try:
+        path = input_path(job_id)
+        fmt = upload_format(job.content_type, job.filename)
+        crud.update_job(
+            db, job_id,
+            status="running",
+            started_at=datetime.utcnow(),
+            processed_rows=0,
+            total_rows=count_data_rows(path, fmt),
+            error=None,
+        )
+        if job.model_version is None:
+            handle = registry.ensure_loaded()
+            crud.update_job(db, job_id, model_version=handle.version, model_path=handle.path)
+        else:
+            handle = registry.get_version(job.model_version, job.model_path)
+        processed = 0
+        with open(results_path(job_id), "wb") as out:
+            if fmt in MATRIX_FORMATS:
+                chunks = iter_file_matrices(path, fmt, STREAM_CHUNK_SIZE)
+            else:
+                chunks = (frame_to_matrix(chunk) for chunk in iter_file_frames(str(path), job.content_type))
+            for matrix, valid in chunks:
+                score_matrix(matrix, valid, handle).astype(RESULT_DTYPE, copy=False).tofile(out)
+                out.flush()
+                processed += len(matrix)
+                crud.update_job(db, job_id, processed_rows=processed)
+
+        crud.update_job(
+            db, job_id,
+            status="completed",
+            total_rows=processed,
+            finished_at=datetime.utcnow(),
+        )
+        logger.info(f"Job {job_id} completed: {processed} rows with model {handle.version}")
+        # Worker processes have no background audit writer, so the record is written right away
+        audit_log.record(job.owner, "jobs", handle.version, None, started, rows=processed)
+        audit_log.flush()
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed: {e}")
+        db.rollback()
+        crud.update_job(db, job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+    finally:
+        db.close()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned workers start from a clean interpreter instead of inheriting the
+        # event loop, threads and open connections of the API process
+        _pool = ProcessPoolExecutor(
+            max_workers=JOB_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+def submit_job(job_id: str):
+    """
+    Queue a job for scoring in the worker process pool.
+
+    Parameters:
+    - job_id (str): The identifier of the job.
+    """
+    def log_worker_error(future):
+        global _pool
+        if future.cancelled() or future.exception() is None:
+            return
+        logger.error(f"Job {job_id} worker error: {future.exception()}")
+        if isinstance(future.exception(), BrokenProcessPool):
+            # A worker died; the pool cannot accept work anymore, so start a fresh one next time
+            _pool = None
+            db = SessionLocal()
+            try:
+                crud.update_job(db, job_id, status="failed", error="El proceso de trabajo terminó inesperadamente", finished_at=datetime.utcnow())
+            finally:
+                db.close()
+
+    _get_pool().submit(run_job, job_id).add_done_callback(log_worker_error)
+
+def resume_unfinished_jobs() -> int:
+    """
+    Requeue jobs that were queued or running when the service last stopped.
+
+    Returns:
+    - int: Number of jobs requeued.
+    """
+    db = SessionLocal()
+    try:
+        requeued = 0
+        for job in crud.get_unfinished_jobs(db):
+            if not input_path(job.id).exists():
+                crud.update_job(db, job.id, status="failed", error="Archivo de entrada no encontrado", finished_at=datetime.utcnow())
+                continue
+            crud.update_job(db, job.id, status="queued")
+            submit_job(job.id)
+            requeued += 1
+        return requeued
+    finally:
+        db.close()
+
+def delete_job(db, job_id: str):
+    """
+    Delete a job's record, its stored upload and its results.
+
+    Parameters:
+    - db (Session): The database session.
+    - job_id (str): The identifier of the job.
+    """
+    crud.delete_job(db, job_id)
+    shutil.rmtree(job_dir(job_id), ignore_errors=True)
+
+def delete_expired_jobs(now: datetime | None = None) -> int:
+    """
+    Delete completed and failed jobs that finished more than JOB_RETENTION_DAYS ago.
+
+    Parameters:
+    - now (datetime, optional): The current time (UTC).
+
+    Returns:
+    - int: Number of jobs deleted.
+    """
+    if JOB_RETENTION_DAYS <= 0:
+        return 0
+    before = (now or datetime.utcnow()) - timedelta(days=JOB_RETENTION_DAYS)
+    db = SessionLocal()
+    try:
+        expired = [job.id for job in crud.get_finished_jobs_before(db, before)]
+        for job_id in expired:
+            delete_job(db, job_id)
+        if expired:
+            logger.info(f"Deleted {len(expired)} jobs finished before {before:%Y-%m-%d %H:%M}")
+        return len(expired)
+    finally:
+        db.close()
+
+def _cleanup():
+    while True:
+        try:
+            delete_expired_jobs()
+        except Exception:
+            logger.exception("Job cleanup error")
+        if _cleanup_stop.wait(JOB_CLEANUP_INTERVAL):
+            return
+
+def start_cleanup():
+    """
+    Start the background thread deleting expired jobs, if retention is enabled and it is not
+    already running. It deletes expired jobs right away, then every JOB_CLEANUP_INTERVAL seconds.
+    """
+    global _cleanup_thread
+    if JOB_RETENTION_DAYS <= 0 or (_cleanup_thread is not None and _cleanup_thread.is_alive()):
+        return
+    _cleanup_stop.clear()
+    _cleanup_thread = threading.Thread(target=_cleanup, name="job-cleanup", daemon=True)
+    _cleanup_thread.start()
+
+def shutdown():
+    """
+    Stop the cleanup thread, and the worker pool without waiting for running jobs; they are
+    resumed on the next start.
+    """
+    global _pool, _cleanup_thread
+    _cleanup_stop.set()
+    if _cleanup_thread is not None:
+        _cleanup_thread.join(timeout=5)
+        _cleanup_thread = None
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
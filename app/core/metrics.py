@@ -0,0 +1,195 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0)
+# Histogram bucket upper bounds, in rows
+ROW_BUCKETS = (1, 8, 64, 256, 1000, 10000, 100000, 1000000)
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets, one series per label combination.
+
+    Observing costs one bisect and one lock acquisition, cheap enough for every request.
+
+    Parameters:
+    - name (str): Metric name.
+    - help (str): Description shown in the exposition.
+    - buckets (tuple): Increasing bucket upper bounds; +Inf is added implicitly.
+    - labelnames (tuple[str]): Label names; `observe` takes the values in the same order.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # labels -> [count per bucket ..., count in +Inf, sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """
+        Observe the duration of a `with` block in seconds.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = []
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class CallbackMetric:
+    """
+    Gauge or counter read from existing state when metrics are scraped.
+
+    Parameters:
+    - name (str): Metric name.
+    - help (str): Description shown in the exposition.
+    - kind (str): "gauge" or "counter".
+    - labelnames (tuple[str]): Label names.
+    - read (Callable): Returns (label values, value) pairs.
+    """
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple, read: Callable[[], Iterable[tuple[tuple, float]]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.read = read
+
+    def collect(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in self.read()]
+
+class MetricsRegistry:
+    """
+    The metrics exposed by /metrics, rendered in the Prometheus text format (version 0.0.4).
+
+    Metrics are kept per process: with several server workers, each scrape reports the
+    worker that answered it.
+    """
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: tuple, labelnames: tuple = ()) -> Histogram:
+        return self.register(Histogram(name, help, buckets, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+http_request_seconds = metrics.histogram(
+    "oncoai_http_request_duration_seconds", "HTTP request latency by route template, until the last body byte is sent.",
+    LATENCY_BUCKETS, ("method", "route", "status"),
+)
+model_predict_seconds = metrics.histogram(
+    "oncoai_model_predict_seconds", "Time spent in model scoring calls.",
+    LATENCY_BUCKETS, ("function",),
+)
+model_predict_rows = metrics.histogram(
+    "oncoai_model_predict_rows", "Rows per model scoring call.",
+    ROW_BUCKETS, ("function",),
+)
+batch_predict_rows = metrics.histogram(
+    "oncoai_batch_predict_rows", "Rows per file scored by the batch prediction endpoints.",
+    ROW_BUCKETS, ("endpoint",),
+)
+db_session_seconds = metrics.histogram(
+    "oncoai_db_session_seconds", "Lifetime of request database sessions opened by get_db.",
+    LATENCY_BUCKETS,
+)
+password_hash_seconds = metrics.histogram(
+    "oncoai_password_hash_seconds", "Time spent in bcrypt password verification and hashing.",
+    BCRYPT_BUCKETS, ("operation",),
+)
+executor_queue_wait_seconds = metrics.histogram(
+    "oncoai_executor_queue_wait_seconds", "Time calls wait for an executor thread.",
+    LATENCY_BUCKETS, ("executor",),
+)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing request latency per route template.
+
+    Labelling by route template rather than raw path keeps the number of series bounded;
+    requests that match no route share the "unmatched" label. Streamed responses are timed
+    until their last chunk is sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code),
+            )
@@ -1,44 +1,19 @@
-import joblib
 import numpy as np
 import logging
-from pathlib import Path
-from app.core.config import MODEL_PATH
+from app.core.registry import registry, ModelHandle
+from app.core.inputs import row_input, stack_rows
+from app.core.metrics import model_predict_seconds, model_predict_rows
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Load model with error handling
-try:
-    model_path = Path(MODEL_PATH)
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
-
-    model = joblib.load(MODEL_PATH)
-    logger.info(f"Model loaded successfully from {MODEL_PATH}")
-
-except FileNotFoundError as e:
-    logger.error(f"Model loading failed: {e}")
-    model = None
-    # Create a dummy model for development/testing
-    from sklearn.ensemble import RandomForestClassifier
-    import numpy as np
-    model = RandomForestClassifier(n_estimators=10, random_state=42)
-    # Train on dummy data
-    X_dummy = np.random.rand(100, 32)
-    y_dummy = np.random.randint(0, 2, 100)
-    model.fit(X_dummy, y_dummy)
-    logger.warning("Using dummy model for development - replace with actual trained model")
-
-except Exception as e:
-    logger.error(f"Error loading model: {e}")
-    raise
-
-def model_predict(features: list[float]) -> float:
+def model_predict(features: list[float] | np.ndarray, handle: ModelHandle | None = None) -> float:
     """
     Predict survival probability for given features.
 
     Parameters:
-    - features (list[float]): List of 32 numerical features.
+    - features (list[float] | np.ndarray): List or array of 32 numerical features.
+    - handle (ModelHandle, optional): The model version to use. Defaults to the active model.
 
     Returns:
     - float: Survival probability between 0 and 1.
@@ -47,16 +22,68 @@ def model_predict(features: list[float]) -> float:
     - ValueError: If the number of features is not 32 or if the features are not numeric.
     - RuntimeError: If the model prediction fails.
     """
-    if len(features) != 32:
+    if getattr(features, "ndim", 1) != 1 or len(features) != 32:
         raise ValueError("El modelo requiere exactamente 32 características")
 
-    if not all(isinstance(f, (int, float)) for f in features):
+    handle = handle or registry.current()
+    try:
+        # Written straight into a reused buffer in the model's dtype, with no float64 copy first
+        input_array = row_input(features, handle.input_dtype)
+    except (TypeError, ValueError):
         raise ValueError("Todas las características deben ser numéricas")
-
     try:
-        input_array = np.array(features).reshape(1, -1)
-        prob = model.predict_proba(input_array)[:, 1][0]
+        model_predict_rows.observe(1, "model_predict")
+        with model_predict_seconds.time("model_predict"):
+            prob = handle.predict_positive(input_array)[0]
         return float(prob)
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         raise RuntimeError(f"Error en la predicción: {e}")
+
+def model_predict_batch(features: np.ndarray, handle: ModelHandle | None = None) -> np.ndarray:
+    """
+    Predict survival probabilities for a matrix of feature rows in a single model call.
+
+    Parameters:
+    - features (np.ndarray): Array of shape (n_rows, 32) with numerical features.
+    - handle (ModelHandle, optional): The model version to use. Defaults to the active model.
+
+    Returns:
+    - np.ndarray: Survival probabilities, one per row.
+
+    Raises:
+    - ValueError: If the array does not have 32 columns.
+    - RuntimeError: If the model prediction fails.
+    """
+    if features.ndim != 2 or features.shape[1] != 32:
+        raise ValueError("El modelo requiere exactamente 32 características")
+
+    handle = handle or registry.current()
+    model_predict_rows.observe(features.shape[0], "model_predict_batch")
+    try:
+        with model_predict_seconds.time("model_predict_batch"):
+            return handle.predict_positive(features)
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {e}")
+        raise RuntimeError(f"Error en la predicción: {e}")
+
+def model_predict_vectors(rows: list[np.ndarray], handle: ModelHandle | None = None) -> np.ndarray:
+    """
+    Predict survival probabilities for separate feature vectors in a single model call.
+
+    The vectors are stacked straight into a reusable input buffer in the model's dtype, so
+    no intermediate float64 matrix is built.
+
+    Parameters:
+    - rows (list[np.ndarray]): Feature vectors of 32 values each.
+    - handle (ModelHandle, optional): The model version to use. Defaults to the active model.
+
+    Returns:
+    - np.ndarray: Survival probabilities, one per vector.
+
+    Raises:
+    - ValueError: If a vector does not have 32 values.
+    - RuntimeError: If the model prediction fails.
+    """
+    handle = handle or registry.current()
+    return model_predict_batch(stack_rows(rows, handle.input_dtype), handle)
@@ -0,0 +1,331 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from app.core.config import (
+    MODEL_PATH, MODELS_DIR, MODEL_WATCH_INTERVAL, MODEL_REGISTRY_KEEP,
+    INFERENCE_ENGINE, COMPILED_ENGINE_MAX_ROWS,
+)
+from app.core.tree_engine import compile_model
+from app.core.inputs import model_input_dtype, prepare_input
+from app.core.features import feature_registry
+from app.core.metrics import metrics, CallbackMetric
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ModelHandle:
+    """
+    One loaded, warmed-up model version.
+
+    Requests take a handle when they start and score with it until they finish, so a model
+    swapped in meanwhile never changes a request's result half-way.
+
+    Attributes:
+    - version (str): Version identifier, the file stem plus a content digest.
+    - path (str | None): The model file, None for the development dummy model.
+    - estimator: The fitted sklearn estimator.
+    - engine (CompiledTreeEnsemble | None): Compiled evaluator for small batches, if available.
+    - input_dtype (np.dtype): The dtype the model scores in; inputs are converted to it once.
+    - loaded_at (datetime): When the version finished loading (UTC).
+    - load_seconds (float): Time taken to load, compile and warm up.
+    - file_signature (tuple | None): (size, mtime) of the file when it was loaded.
+    """
+    def __init__(self, version: str, path: str | None, estimator, file_signature: tuple | None = None):
+        started = time.perf_counter()
+        self.version = version
+        self.path = path
+        self.estimator = estimator
+        self.file_signature = file_signature
+        self.input_dtype = model_input_dtype(estimator)
+        self.engine = compile_model(estimator) if INFERENCE_ENGINE == "compiled" else None
+        self._explainer = self.engine
+        self._explainer_ready = self.engine is not None
+        self._explainer_lock = threading.Lock()
+        self._warm_up()
+        self.loaded_at = datetime.utcnow()
+        self.load_seconds = time.perf_counter() - started
+
+    def predict_positive(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict the positive-class (survival) probability for each row.
+
+        The input is converted to the model's dtype and C-contiguous layout here, into a reusable
+        buffer, so neither engine makes its own copy. Inputs already in that form are used as is.
+
+        Parameters:
+        - features (np.ndarray): Array of shape (n_rows, 32).
+
+        Returns:
+        - np.ndarray: Survival probabilities, one per row.
+        """
+        features = prepare_input(features, self.input_dtype)
+        # The compiled engine wins on small batches; sklearn's Cython loops win on large ones
+        if self.engine is not None and features.shape[0] <= COMPILED_ENGINE_MAX_ROWS:
+            return self.engine.predict_positive(features)
+        return self.estimator.predict_proba(features)[:, 1]
+
+    def explainer(self):
+        """
+        The compiled ensemble that computes feature contributions.
+
+        This is the compiled inference engine when it is enabled; otherwise the model is
+        compiled, and checked against sklearn, on the first explanation.
+
+        Returns:
+        - CompiledTreeEnsemble | None: None if the model is not a supported tree ensemble.
+        """
+        with self._explainer_lock:
+            if not self._explainer_ready:
+                self._explainer = compile_model(self.estimator)
+                self._explainer_ready = True
+            return self._explainer
+
+    @property
+    def explainer_ready(self) -> bool:
+        """
+        Whether `explainer` returns without compiling the model.
+        """
+        return self._explainer_ready
+
+    def _warm_up(self):
+        # Touch both scoring paths once so the first real request pays no lazy setup
+        n_features = getattr(self.estimator, "n_features_in_", 32)
+        for rows in (1, COMPILED_ENGINE_MAX_ROWS + 1):
+            self.predict_positive(np.zeros((rows, n_features)))
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "engine": "compiled" if self.engine is not None else "sklearn",
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+def _file_signature(path: Path) -> tuple:
+    stat = path.stat()
+    return (stat.st_size, stat.st_mtime_ns)
+
+def load_model_file(path: Path) -> ModelHandle:
+    """
+    Load, compile and warm up a joblib model file.
+
+    Parameters:
+    - path (Path): The model file.
+
+    Returns:
+    - ModelHandle: The loaded version.
+    """
+    import joblib
+
+    signature = _file_signature(path)
+    with open(path, "rb") as f:
+        version = f"{path.stem}-{hashlib.file_digest(f, 'sha256').hexdigest()[:12]}"
+    estimator = joblib.load(path)
+    return ModelHandle(version, str(path), estimator, signature)
+
+def dummy_model() -> ModelHandle:
+    """
+    Train a small random forest on seeded random data, for development without a model file.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    # Seeded, so every process (API workers and job workers) trains the same model
+    rng = np.random.default_rng(42)
+    estimator = RandomForestClassifier(n_estimators=10, random_state=42)
+    X_dummy = rng.random((100, 32))
+    y_dummy = rng.integers(0, 2, 100)
+    estimator.fit(X_dummy, y_dummy)
+    logger.warning("Using dummy model for development - replace with actual trained model")
+    return ModelHandle("dummy", None, estimator)
+
+class ModelRegistry:
+    """
+    Holds the loaded model versions and hot-swaps the active one.
+
+    The newest `*.joblib` file in `models_dir` (by modification time) is the active model; without
+    a `models_dir`, the fallback file is. With a positive `watch_interval`, a background thread
+    polls for a newer file, or a changed fallback file, loads and warms it up off the request
+    path, then swaps it in with a single reference assignment.
+
+    Parameters:
+    - models_dir (str | None): Directory watched for model files; None serves the fallback only.
+    - fallback_path (str): Model file used if there is no directory or it has no model files.
+    - watch_interval (float): Seconds between directory polls; 0 disables watching.
+    - keep (int): Number of loaded versions kept for listing, including the active one.
+    """
+    def __init__(self, models_dir: str | None, fallback_path: str, watch_interval: float, keep: int):
+        self.models_dir = Path(models_dir) if models_dir else None
+        self.fallback_path = Path(fallback_path)
+        self.watch_interval = watch_interval
+        self.keep = max(1, keep)
+        self.active: ModelHandle | None = None
+        self._versions: OrderedDict[str, ModelHandle] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    def _newest_file(self) -> Path | None:
+        candidates = []
+        if self.models_dir is not None and self.models_dir.is_dir():
+            candidates = sorted(self.models_dir.glob("*.joblib"), key=lambda p: p.stat().st_mtime)
+        if candidates:
+            return candidates[-1]
+        return self.fallback_path if self.fallback_path.exists() else None
+
+    def _remember(self, handle: ModelHandle, activate: bool):
+        with self._lock:
+            self._versions[handle.version] = handle
+            self._versions.move_to_end(handle.version)
+            if activate:
+                self.active = handle
+            while len(self._versions) > self.keep:
+                oldest = next(iter(self._versions))
+                if self._versions[oldest] is self.active:
+                    self._versions.move_to_end(oldest)
+                    oldest = next(iter(self._versions))
+                del self._versions[oldest]
+
+    def _activate(self, handle: ModelHandle):
+        self._remember(handle, activate=True)
+        logger.info(f"Model {handle.version} active (loaded in {handle.load_seconds:.2f}s)")
+
+    def ensure_loaded(self) -> ModelHandle:
+        """
+        Load the initial model if none is active yet, and bind the feature order to it.
+
+        Returns:
+        - ModelHandle: The active model.
+
+        Raises:
+        - ValueError: If the model's features are not the ones served by the API.
+        """
+        with self._load_lock:
+            if self.active is None:
+                path = self._newest_file()
+                if path is None:
+                    where = f"in {self.models_dir} or " if self.models_dir is not None else ""
+                    logger.error(f"Model loading failed: no model file {where}at {self.fallback_path}")
+                    handle = dummy_model()
+                else:
+                    handle = load_model_file(path)
+                # The first model fixes the feature order for the life of the process
+                feature_registry.bind(handle.estimator, handle.version)
+                self._activate(handle)
+        return self.active
+
+    def get_version(self, version: str, path: str | None) -> ModelHandle:
+        """
+        Return a given model version, loading it from its file if it is not held already.
+
+        Job workers use this to score with the version a job was submitted with, whatever
+        version is active; loaded versions are kept like activated ones, so a worker loads
+        each version once.
+
+        Parameters:
+        - version (str): The version to return.
+        - path (str | None): Its model file, None for the development dummy model.
+
+        Returns:
+        - ModelHandle: The requested version.
+
+        Raises:
+        - ValueError: If the file no longer holds that version, or its features differ from
+          the bound order.
+        """
+        with self._lock:
+            handle = self._versions.get(version)
+        if handle is not None:
+            return handle
+        with self._load_lock:
+            with self._lock:
+                handle = self._versions.get(version)
+            if handle is None:
+                handle = dummy_model() if path is None else load_model_file(Path(path))
+                if handle.version != version:
+                    raise ValueError(f"El modelo {version} ya no está disponible en {path}")
+                feature_registry.bind(handle.estimator, handle.version)
+                self._remember(handle, activate=False)
+        return handle
+
+    def current(self) -> ModelHandle:
+        """
+        Return the active model, loading it first if startup has not done so.
+
+        Returns:
+        - ModelHandle: The active model.
+        """
+        return self.active or self.ensure_loaded()
+
+    def refresh(self) -> bool:
+        """
+        Load and activate the newest model file if it differs from the active one.
+
+        Returns:
+        - bool: True if a new version was activated.
+        """
+        with self._load_lock:
+            path = self._newest_file()
+            if path is None:
+                return False
+            active = self.active
+            if active is not None and active.path == str(path) and active.file_signature == _file_signature(path):
+                return False
+            try:
+                handle = load_model_file(path)
+                feature_registry.bind(handle.estimator, handle.version)
+            except Exception as e:
+                logger.error(f"Error loading model from {path}, keeping current version: {e}")
+                return False
+            if active is not None and handle.version == active.version:
+                # Same content, e.g. the file was touched; remember the new signature only
+                active.path = handle.path
+                active.file_signature = handle.file_signature
+                return False
+            self._activate(handle)
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Model watcher error")
+
+    def start_watching(self):
+        """
+        Start the background directory watcher, if enabled and not already running.
+        """
+        if self.watch_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def versions(self) -> list[dict]:
+        """
+        Describe the loaded versions, newest first.
+        """
+        with self._lock:
+            handles = list(reversed(self._versions.values()))
+            active = self.active
+        return [{**handle.describe(), "active": handle is active} for handle in handles]
+
+registry = ModelRegistry(MODELS_DIR, MODEL_PATH, MODEL_WATCH_INTERVAL, MODEL_REGISTRY_KEEP)
+
+metrics.register(CallbackMetric(
+    "oncoai_model_info", "The active model version.", "gauge",
+    ("version",), lambda: [((registry.active.version,), 1)] if registry.active is not None else [],
+))
@@ -0,0 +1,206 @@
+import gzip
+import io
+import zlib
+from typing import Iterator
+import numpy as np
+import orjson
+from fastapi.responses import Response
+from app.core.config import GZIP_MIN_SIZE, GZIP_LEVEL
+
+# Batch result representations, selected by the Accept header
+ROWS_JSON = "application/json"
+COLUMNS_JSON = "application/vnd.oncoai.columns+json"
+RESULTS_CSV = "text/csv"
+RESULTS_NPY = "application/x-npy"
+
+# In order of preference when a wildcard matches several
+RESULT_MEDIA_TYPES = (ROWS_JSON, COLUMNS_JSON, RESULTS_CSV, RESULTS_NPY)
+
+# Name of the column added to annotated uploads and CSV results
+PROBABILITY_COLUMN = "survival_probability"
+
+def _media_ranges(header: str | None) -> Iterator[tuple[str, float]]:
+    # Yields each media range of an Accept or Accept-Encoding header with its quality
+    for part in (header or "").split(","):
+        media, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media = media.strip().lower()
+        if media:
+            yield media, quality
+
+def negotiate_result_type(accept: str | None) -> str:
+    """
+    Choose how to represent batch results from the request's Accept header.
+
+    The most specific range wins among those with the highest quality. Clients that send no
+    Accept header, only wildcards or no supported type get the row-per-object JSON
+    `batch_predict` has always returned.
+
+    Parameters:
+    - accept (str | None): The Accept header.
+
+    Returns:
+    - str: ROWS_JSON, COLUMNS_JSON, RESULTS_CSV or RESULTS_NPY.
+    """
+    best, best_rank = ROWS_JSON, (0.0, -1)
+    for media, quality in _media_ranges(accept):
+        if quality <= 0:
+            continue
+        if media in RESULT_MEDIA_TYPES:
+            match, specificity = media, 2
+        elif media.endswith("/*"):
+            prefix = media[:-1]
+            match = next((t for t in RESULT_MEDIA_TYPES if t.startswith(prefix) or prefix == "*/"), None)
+            specificity = 0 if prefix == "*/" else 1
+        else:
+            continue
+        if match is not None and (quality, specificity) > best_rank:
+            best, best_rank = match, (quality, specificity)
+    return best
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """
+    Return whether the client accepts gzip-encoded responses.
+
+    Parameters:
+    - accept_encoding (str | None): The Accept-Encoding header.
+
+    Returns:
+    - bool: True if gzip, or a wildcard, is listed with a non-zero quality.
+    """
+    return any(coding in ("gzip", "*") and quality > 0 for coding, quality in _media_ranges(accept_encoding))
+
+def _rows_json(probs: np.ndarray, model_version: str) -> bytes:
+    results = [
+        {"row": i, "survival_probability": None if p != p else p} for i, p in enumerate(probs.tolist())
+    ]
+    return orjson.dumps({"predictions": results, "model_version": model_version})
+
+def _columns_json(probs: np.ndarray, model_version: str) -> bytes:
+    # orjson writes the float64 array natively, with NaN as null
+    return orjson.dumps(
+        {"model_version": model_version, "survival_probability": probs},
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+def probability_texts(probs: np.ndarray) -> list[str]:
+    """
+    Format probabilities as text for CSV, the shortest that reads back as the same float.
+
+    Parameters:
+    - probs (np.ndarray): Survival probabilities, NaN for rows without a prediction.
+
+    Returns:
+    - list[str]: One string per probability, empty where there is no prediction.
+    """
+    if probs.size == 0:
+        return []
+    # orjson formats the whole array in one call, writing NaN as null
+    return orjson.dumps(probs, option=orjson.OPT_SERIALIZE_NUMPY)[1:-1].replace(b"null", b"").decode().split(",")
+
+def _results_csv(probs: np.ndarray, model_version: str) -> bytes:
+    lines = [f"{i},{text}\n" for i, text in enumerate(probability_texts(probs))]
+    return (f"row,{PROBABILITY_COLUMN}\n" + "".join(lines)).encode()
+
+def _results_npy(probs: np.ndarray, model_version: str) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, probs.astype(np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+_ENCODERS = {
+    ROWS_JSON: _rows_json,
+    COLUMNS_JSON: _columns_json,
+    RESULTS_CSV: _results_csv,
+    RESULTS_NPY: _results_npy,
+}
+
+def compress_body(body: bytes, compress: bool) -> tuple[bytes, bool]:
+    """
+    Gzip a response body if the client accepts it and the body is large enough to benefit.
+
+    Parameters:
+    - body (bytes): The encoded response body.
+    - compress (bool): Whether the client accepts gzip.
+
+    Returns:
+    - tuple[bytes, bool]: The body to send and whether it is gzip-encoded.
+    """
+    if compress and len(body) >= GZIP_MIN_SIZE:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), True
+    return body, False
+
+def encode_results(probs: np.ndarray, media_type: str, model_version: str, compress: bool = False) -> tuple[bytes, bool]:
+    """
+    Encode batch survival probabilities in the negotiated representation.
+
+    - ROWS_JSON: `{"predictions": [{"row": i, "survival_probability": p}, ...], "model_version": v}`
+    - COLUMNS_JSON: `{"model_version": v, "survival_probability": [p, ...]}`, rows by position
+    - RESULTS_CSV: a `row,survival_probability` header and one line per row
+    - RESULTS_NPY: a float32 .npy vector with one value per row
+
+    Rows without a prediction are null in JSON, empty in CSV and NaN in .npy. Encoding and
+    compression are CPU-bound, so this is meant to run on the inference executor.
+
+    Parameters:
+    - probs (np.ndarray): Survival probability per row, NaN for rows without a prediction.
+    - media_type (str): One of RESULT_MEDIA_TYPES.
+    - model_version (str): Version of the model that produced the probabilities.
+    - compress (bool): Whether the client accepts gzip.
+
+    Returns:
+    - tuple[bytes, bool]: The body and whether it is gzip-encoded.
+    """
+    return compress_body(_ENCODERS[media_type](probs, model_version), compress)
+
+def result_response(body: bytes, compressed: bool, media_type: str, model_version: str, filename: str | None = None) -> Response:
+    """
+    Wrap an encoded batch result in a response.
+
+    Parameters:
+    - body (bytes): The encoded, possibly compressed, body.
+    - compressed (bool): Whether the body is gzip-encoded.
+    - media_type (str): The body's content type.
+    - model_version (str): Version of the model that produced the results.
+    - filename (str, optional): Offered as the download's file name.
+
+    Returns:
+    - Response: The response, with `X-Model-Version` and `Vary` headers.
+    """
+    headers = {"X-Model-Version": model_version, "Vary": "Accept, Accept-Encoding"}
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(body, media_type=media_type, headers=headers)
+
+def gzip_chunks(chunks: Iterator[str | bytes]) -> Iterator[bytes]:
+    """
+    Gzip a streamed response as it is produced.
+
+    Each chunk is flushed as soon as it is compressed, so the client can decompress every
+    chunk's rows when they arrive rather than when the stream ends.
+
+    Parameters:
+    - chunks (Iterator[str | bytes]): The uncompressed body, piece by piece. It is closed when
+      this iterator is exhausted or closed.
+
+    Yields:
+    - bytes: Consecutive pieces of one gzip stream.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
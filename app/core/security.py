@@ -1,18 +1,77 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, TOKEN_CACHE_SIZE
+from app.core.cache import LRUCache
 from app.db.crud import get_user_by_username
+from app.db.models import User as UserModel
 from app.schemas.auth import TokenData, User
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import SessionLocal
 from app.core.utils import verify_password
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+# Authenticated users by username, so protected calls usually skip the database
+principal_cache = LRUCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Claims of already-verified tokens by token digest, each kept until its "exp" claim
+token_cache = LRUCache(TOKEN_CACHE_SIZE)
+
+@event.listens_for(UserModel, "after_insert")
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    """
+    Drop cached principals when a user row is created, changed or deleted.
+
+    Both the current and any previous username are invalidated, so renames are covered too.
+    They are invalidated again once the change is committed, since a principal loaded between
+    the flush and the commit still reads the previous row.
+    """
+    usernames = [target.username, *inspect(target).attrs.username.history.deleted]
+    for username in usernames:
+        principal_cache.invalidate(username)
+    session = object_session(target)
+    if session is not None:
+        event.listen(
+            session, "after_commit",
+            lambda session: [principal_cache.invalidate(username) for username in usernames],
+            once=True,
+        )
+
+def load_principal(username: str) -> User:
+    """
+    Load a user from the database as a detached principal.
+
+    Parameters:
+    - username (str): The username of the user to load.
+
+    Returns:
+    - User: The user's public attributes, safe to share across requests.
+
+    Raises:
+    - HTTPException: If the user is not found.
+    """
+    db = SessionLocal()
+    try:
+        user = get_user_by_username(db, username=username)
+        return User(
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=bool(user.is_active),
+        )
+    finally:
+        db.close()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Create a JWT access token.
@@ -30,13 +89,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def decode_token(token: str) -> dict:
+    """
+    Verify a JWT and return its claims, reusing earlier verifications of the same token.
+
+    Tokens are cached by SHA-256 digest, never in clear, and only until their "exp" claim,
+    so a cached token is never accepted after it would have failed verification.
+
+    Parameters:
+    - token (str): The JWT token to verify.
+
+    Returns:
+    - dict: The decoded claims.
+
+    Raises:
+    - JWTError: If the signature or claims are invalid.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = float(exp) - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Validate the token and return the current user.
 
+    Token verification and the user are served from their caches when possible; on a
+    principal miss the user is loaded from the database in a worker thread, so the event
+    loop never waits on a query.
+
     Parameters:
     - token (str): The JWT token to validate.
-    - db (Session): The database session.
 
     Returns:
     - User: The current user.
@@ -50,7 +141,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -58,9 +149,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
 
-    user = get_user_by_username(db, username=token_data.username)
+    user = principal_cache.get(token_data.username)
     if user is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+        # A user changed while it was being loaded is not cached, since the load may be stale
+        generation = principal_cache.generation
+        user = await run_in_threadpool(load_principal, token_data.username)
+        principal_cache.set(token_data.username, user, generation=generation)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -0,0 +1,100 @@
+import logging
+import numpy as np
+from fastapi import HTTPException
+from app.core.config import SWEEP_MAX_POINTS
+from app.core.features import feature_registry
+from app.core.model import model_predict_batch
+from app.core.registry import ModelHandle
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def axis_grid(axis) -> np.ndarray:
+    """
+    Build the values tried for one varied feature.
+
+    Parameters:
+    - axis (SweepAxis): The feature and either its values or start, stop and num.
+
+    Returns:
+    - np.ndarray: The grid values as float64.
+
+    Raises:
+    - HTTPException: 400 if the feature is unknown or the grid is empty, not finite or
+      specified both ways.
+    """
+    if axis.feature not in feature_registry.index:
+        raise HTTPException(status_code=400, detail=f"Característica desconocida: {axis.feature}")
+    linear = (axis.start, axis.stop, axis.num)
+    if axis.values is not None:
+        if any(value is not None for value in linear):
+            raise HTTPException(status_code=400, detail=f"Use values o start/stop/num para {axis.feature}, no ambos")
+        grid = np.asarray(axis.values, dtype=np.float64)
+    elif all(value is not None for value in linear):
+        # Checked before allocating, so a huge num cannot exhaust memory
+        if axis.num > SWEEP_MAX_POINTS:
+            raise HTTPException(status_code=400, detail=f"El barrido tiene {axis.num} puntos; el máximo es {SWEEP_MAX_POINTS}")
+        grid = np.linspace(axis.start, axis.stop, max(axis.num, 0))
+    else:
+        raise HTTPException(status_code=400, detail=f"Indique values o start, stop y num para {axis.feature}")
+    if grid.size == 0:
+        raise HTTPException(status_code=400, detail=f"La rejilla de {axis.feature} está vacía")
+    if not np.isfinite(grid).all():
+        raise HTTPException(status_code=400, detail=f"Los valores de {axis.feature} deben ser números finitos")
+    return grid
+
+def sweep_matrix(base: np.ndarray, columns: list[int], grids: list[np.ndarray], dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Build every grid point of a sweep as rows of one matrix, in a single allocation.
+
+    The base vector is broadcast into all rows, then each varied column is written through a
+    (n1, n2, 32) view of the same buffer, so no per-point vectors are created. The last row
+    is left as the unmodified base vector.
+
+    Parameters:
+    - base (np.ndarray): The 32 base features.
+    - columns (list[int]): Model column of each varied feature.
+    - grids (list[np.ndarray]): Values of each varied feature, in the same order.
+    - dtype (np.dtype): Element type, the model's input dtype so it is scored without conversion.
+
+    Returns:
+    - np.ndarray: Array of shape (n_points + 1, 32), grid points in row-major order first.
+    """
+    shape = tuple(len(grid) for grid in grids)
+    n_points = int(np.prod(shape))
+    matrix = np.empty((n_points + 1, base.shape[0]), dtype=dtype)
+    matrix[:] = base
+    points = matrix[:n_points].reshape(*shape, base.shape[0])
+    for axis, (column, grid) in enumerate(zip(columns, grids)):
+        # Shape the grid along its own axis so it broadcasts across the others
+        points[..., column] = grid.reshape([-1 if i == axis else 1 for i in range(len(grids))])
+    return matrix
+
+def run_sweep(base: np.ndarray, axes: list, handle: ModelHandle) -> tuple[np.ndarray, float, list[np.ndarray]]:
+    """
+    Score a what-if sweep over one or two features in a single model call.
+
+    Parameters:
+    - base (np.ndarray): The 32 finite base features.
+    - axes (list[SweepAxis]): One or two features to vary.
+    - handle (ModelHandle): The model version to score with.
+
+    Returns:
+    - tuple[np.ndarray, float, list[np.ndarray]]: The response curve (n1,) or surface (n1, n2),
+      the base probability, and the grids.
+
+    Raises:
+    - HTTPException: 400 if the axes are invalid or the sweep has more than SWEEP_MAX_POINTS points.
+    """
+    if not 1 <= len(axes) <= 2:
+        raise HTTPException(status_code=400, detail="Se pueden variar una o dos características")
+    if len(axes) == 2 and axes[0].feature == axes[1].feature:
+        raise HTTPException(status_code=400, detail="Las dos características variadas deben ser distintas")
+    grids = [axis_grid(axis) for axis in axes]
+    n_points = int(np.prod([len(grid) for grid in grids]))
+    if n_points > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"El barrido tiene {n_points} puntos; el máximo es {SWEEP_MAX_POINTS}")
+
+    columns = [feature_registry.index[axis.feature] for axis in axes]
+    probs = model_predict_batch(sweep_matrix(base, columns, grids, handle.input_dtype), handle)
+    return probs[:-1].reshape([len(grid) for grid in grids]), float(probs[-1]), grids
@@ -0,0 +1,261 @@
+import logging
+import numpy as np
+from app.core.inputs import prepare_input
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Rows traversed at once; bounds the (rows x trees) node-index matrix
+ROW_BLOCK = 4096
+
+class CompiledTreeEnsemble:
+    """
+    Array-backed evaluator for fitted sklearn tree ensembles.
+
+    All trees are flattened into shared node arrays (feature, threshold, left, right, value)
+    with global node indices. Leaves point to themselves, so every row can descend all trees
+    at once for `max_depth` vectorized steps without per-tree Python loops or sklearn's input
+    validation and dispatch.
+
+    Supported models are binary `GradientBoostingClassifier` (log-loss, constant init) and
+    binary `RandomForestClassifier` / `ExtraTreesClassifier`.
+
+    Parameters:
+    - model: The fitted sklearn estimator.
+
+    Raises:
+    - ValueError: If the model type or configuration is not supported.
+    """
+    def __init__(self, model):
+        from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier
+
+        if len(getattr(model, "classes_", [])) != 2:
+            raise ValueError("Only binary classifiers are supported")
+
+        if isinstance(model, GradientBoostingClassifier):
+            trees = [stage[0].tree_ for stage in model.estimators_]
+            self.kind = "gradient_boosting"
+            self.link = "logit"
+            self.base_score = _gradient_boosting_init(model)
+            self.scale = model.learning_rate
+            node_values = [tree.value[:, 0, 0] for tree in trees]
+        elif isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            self.kind = "forest"
+            self.link = "identity"
+            self.base_score = 0.0
+            self.scale = 1.0 / len(trees)
+            # Normalize class weights to the positive-class fraction at each node
+            node_values = [tree.value[:, 0, 1] / tree.value[:, 0, :].sum(axis=1) for tree in trees]
+        else:
+            raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+        self.n_features = model.n_features_in_
+        self.n_trees = len(trees)
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        self.roots = offsets.astype(np.intp)
+        self.feature = np.concatenate([tree.feature for tree in trees]).astype(np.intp)
+        self.threshold = np.concatenate([tree.threshold for tree in trees]).astype(np.float64)
+        # Every node's value, not only the leaves', so paths can be attributed to their splits
+        self.value = np.concatenate(node_values).astype(np.float64)
+        left = np.concatenate([tree.children_left + off for tree, off in zip(trees, offsets)])
+        right = np.concatenate([tree.children_right + off for tree, off in zip(trees, offsets)])
+
+        # Leaves (children == -1) loop back to themselves and read feature 0 harmlessly
+        leaf = np.concatenate([tree.children_left == -1 for tree in trees])
+        self_index = np.arange(leaf.size)
+        self.left = np.where(leaf, self_index, left).astype(np.intp)
+        self.right = np.where(leaf, self_index, right).astype(np.intp)
+        self.feature[leaf] = 0
+        # sklearn sends NaN down the branch recorded at fit time (the larger child when
+        # training had no missing values); leaves never read it
+        self.nan_left = np.concatenate([tree.missing_go_to_left for tree in trees]).astype(bool) & ~leaf
+        # Interleaved (left, right) pairs so a child is found with one gather
+        self.children = np.stack((self.left, self.right), axis=1).ravel()
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the leaf reached in every tree by every row.
+
+        Parameters:
+        - X (np.ndarray): Array of shape (n_rows, n_features), compared as float32 like sklearn.
+
+        Returns:
+        - np.ndarray: Global leaf indices of shape (n_rows, n_trees).
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_start = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        has_nan = bool(np.isnan(flat).any())
+        for _ in range(self.max_depth):
+            go_right = self._go_right(flat[row_start + self.feature[nodes]], nodes, has_nan)
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def _go_right(self, values: np.ndarray, nodes: np.ndarray, has_nan: bool) -> np.ndarray:
+        # "not <=" sends NaN right; rows with NaN then follow each node's missing-value branch
+        go_right = ~(values <= self.threshold[nodes])
+        if has_nan:
+            go_right &= ~(np.isnan(values) & self.nan_left[nodes])
+        return go_right
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict the positive-class probability for each row.
+
+        Parameters:
+        - X (np.ndarray): Array of shape (n_rows, n_features).
+
+        Returns:
+        - np.ndarray: Positive-class probabilities, one per row.
+        """
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features")
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_BLOCK):
+            block = X[start:start + ROW_BLOCK]
+            score = self.value[self.leaves(block)].sum(axis=1) * self.scale + self.base_score
+            out[start:start + ROW_BLOCK] = score
+        if self.kind == "gradient_boosting":
+            # Log-loss link: raw log-odds to probability
+            out = 1.0 / (1.0 + np.exp(-out))
+        return out
+
+    @property
+    def bias(self) -> float:
+        """
+        The score of a row before any split: the root values, in the same space as the
+        contributions (log-odds for gradient boosting, probability for forests).
+        """
+        return float(self.base_score + self.value[self.roots].sum() * self.scale)
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Exact per-feature contributions to each row's score, by walking its tree paths.
+
+        Each split on a row's path moves the score from the parent node's value to the child's;
+        the difference is credited to the split feature and summed over all trees (Saabas'
+        method). The bias plus a row's contributions equals its raw score exactly: log-odds for
+        gradient boosting, probability for forests. All rows descend all trees together, as in
+        `leaves`, and each depth step adds its credits with one `np.bincount`.
+
+        Parameters:
+        - X (np.ndarray): Array of shape (n_rows, n_features).
+
+        Returns:
+        - np.ndarray: Contributions of shape (n_rows, n_features).
+        """
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features")
+        out = np.empty((X.shape[0], self.n_features), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_BLOCK):
+            block = prepare_input(X[start:start + ROW_BLOCK], np.float32)
+            rows = block.shape[0]
+            flat = block.ravel()
+            row_start = (np.arange(rows, dtype=np.intp) * self.n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (rows, self.n_trees))
+            credit = np.zeros(rows * self.n_features)
+            has_nan = bool(np.isnan(flat).any())
+            for _ in range(self.max_depth):
+                feature = self.feature[nodes]
+                go_right = self._go_right(flat[row_start + feature], nodes, has_nan)
+                children = self.children[2 * nodes + go_right]
+                # Leaves step to themselves, so they add a zero credit to feature 0
+                credit += np.bincount(
+                    (row_start + feature).ravel(),
+                    weights=(self.value[children] - self.value[nodes]).ravel(),
+                    minlength=credit.size,
+                )
+                nodes = children
+            out[start:start + rows] = credit.reshape(rows, self.n_features) * self.scale
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        sklearn-compatible probabilities of shape (n_rows, 2).
+        """
+        positive = self.predict_positive(X)
+        return np.column_stack((1.0 - positive, positive))
+
+def _gradient_boosting_init(model) -> float:
+    from sklearn.dummy import DummyClassifier
+
+    loss = getattr(model, "loss", "log_loss")
+    if loss not in ("log_loss", "deviance"):
+        raise ValueError(f"Unsupported gradient boosting loss: {loss}")
+    if model.init_ == "zero":
+        return 0.0
+    if not isinstance(model.init_, DummyClassifier):
+        raise ValueError("Only constant init estimators are supported")
+    # The prior does not depend on X, so any row gives the constant raw score
+    return float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+
+def parity_sample(engine: CompiledTreeEnsemble, n_rows: int = 512, seed: int = 0) -> np.ndarray:
+    """
+    Build rows that exercise both branches of the trees' split thresholds.
+
+    Each feature is sampled uniformly across the range of thresholds used for it, widened
+    slightly so rows also fall beyond the outermost splits.
+
+    Parameters:
+    - engine (CompiledTreeEnsemble): The compiled ensemble.
+    - n_rows (int): Number of rows to generate.
+    - seed (int): Random seed.
+
+    Returns:
+    - np.ndarray: Array of shape (n_rows, n_features).
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, engine.n_features))
+    internal = engine.left != np.arange(engine.left.size)
+    for f in range(engine.n_features):
+        thresholds = engine.threshold[internal & (engine.feature == f)]
+        if thresholds.size:
+            low, high = thresholds.min(), thresholds.max()
+            margin = max(high - low, 1.0) * 0.1
+            X[:, f] = rng.uniform(low - margin, high + margin, n_rows)
+    return X
+
+def max_parity_error(model, engine: CompiledTreeEnsemble, X: np.ndarray) -> float:
+    """
+    Largest absolute difference between sklearn and compiled positive-class probabilities.
+
+    Parameters:
+    - model: The fitted sklearn estimator.
+    - engine (CompiledTreeEnsemble): The compiled ensemble.
+    - X (np.ndarray): Rows to compare on.
+
+    Returns:
+    - float: The maximum absolute difference.
+    """
+    expected = model.predict_proba(X)[:, 1]
+    return float(np.max(np.abs(engine.predict_positive(X) - expected)))
+
+def compile_model(model, tolerance: float = 1e-9):
+    """
+    Compile a model into a `CompiledTreeEnsemble`, verified against sklearn.
+
+    Parameters:
+    - model: The fitted sklearn estimator.
+    - tolerance (float): Maximum allowed probability difference from sklearn.
+
+    Returns:
+    - CompiledTreeEnsemble | None: The compiled engine, or None if the model is not supported
+      or its output does not match sklearn within `tolerance`.
+    """
+    try:
+        engine = CompiledTreeEnsemble(model)
+        error = max_parity_error(model, engine, parity_sample(engine))
+    except Exception as e:
+        logger.warning(f"Compiled inference engine unavailable, using sklearn: {e}")
+        return None
+    if error > tolerance:
+        logger.warning(f"Compiled inference engine differs from sklearn by {error:.3g}, using sklearn")
+        return None
+    logger.info(f"Compiled inference engine ready: {engine.n_trees} trees, max depth {engine.max_depth}")
+    return engine
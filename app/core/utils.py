@@ -1,28 +1,84 @@
 from passlib.context import CryptContext
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_RETRY_AFTER
+from app.core.executor import BoundedExecutor
+from app.core.metrics import password_hash_seconds
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow; it gets its own small pool so a login storm cannot take
+# threads or CPU away from inference
+password_executor = BoundedExecutor("password", PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_RETRY_AFTER)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    with password_hash_seconds.time("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
+
+def _hash(password: str) -> str:
+    with password_hash_seconds.time("hash"):
+        return pwd_context.hash(password)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash.
 
+    Runs on the password executor; use from synchronous code.
+
     Parameters:
     - plain_password (str): The plain text password to verify.
     - hashed_password (str): The hashed password to compare against.
 
     Returns:
     - bool: True if the password matches the hash, False otherwise.
+
+    Raises:
+    - HTTPException: 503 with Retry-After if the password executor queue is full.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_executor.call(_verify, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
     Generate a password hash.
 
+    Runs on the password executor; use from synchronous code.
+
+    Parameters:
+    - password (str): The plain text password to hash.
+
+    Returns:
+    - str: The hashed password.
+
+    Raises:
+    - HTTPException: 503 with Retry-After if the password executor queue is full.
+    """
+    return password_executor.call(_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop.
+
+    Parameters:
+    - plain_password (str): The plain text password to verify.
+    - hashed_password (str): The hashed password to compare against.
+
+    Returns:
+    - bool: True if the password matches the hash, False otherwise.
+
+    Raises:
+    - HTTPException: 503 with Retry-After if the password executor queue is full.
+    """
+    return await password_executor.run(_verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Generate a password hash without blocking the event loop.
+
     Parameters:
     - password (str): The plain text password to hash.
 
     Returns:
     - str: The hashed password.
+
+    Raises:
+    - HTTPException: 503 with Retry-After if the password executor queue is full.
     """
-    return pwd_context.hash(password)
+    return await password_executor.run(_hash, password)
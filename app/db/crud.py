@@ -1,7 +1,8 @@
+from datetime import datetime
 from sqlalchemy.orm import Session
-from app.db.models import User
+from app.db.models import User, BatchJob, PredictionAudit
 from fastapi import HTTPException, status
-from app.core.utils import verify_password, pwd_context
+from app.core.utils import get_password_hash
 
 def get_user_by_username(db: Session, username: str):
     """
@@ -38,7 +39,7 @@ def create_user(db: Session, username: str, full_name: str = None, password: str
     """
     # Check if the password is already hashed
     if password and not password.startswith('$2b$'):
-        hashed_password = pwd_context.hash(password)
+        hashed_password = get_password_hash(password)
     else:
         hashed_password = password
     user = User(username=username, full_name=full_name, hashed_password=hashed_password, email=email)
@@ -46,3 +47,162 @@ def create_user(db: Session, username: str, full_name: str = None, password: str
     db.commit()
     db.refresh(user)
     return user
+
+def create_job(db: Session, job_id: str, owner: str, filename: str, content_type: str,
+               model_version: str = None, model_path: str = None):
+    """
+    Create a new queued batch-scoring job.
+
+    Parameters:
+    - db (Session): The database session.
+    - job_id (str): The identifier of the job.
+    - owner (str): The username of the user submitting the job.
+    - filename (str): The original name of the uploaded file.
+    - content_type (str): The content type of the uploaded file.
+    - model_version (str, optional): The model version to score the job with.
+    - model_path (str, optional): The file of that model version.
+
+    Returns:
+    - BatchJob: The newly created job.
+    """
+    job = BatchJob(
+        id=job_id, owner=owner, filename=filename, content_type=content_type, status="queued",
+        model_version=model_version, model_path=model_path,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_job(db: Session, job_id: str, owner: str = None):
+    """
+    Retrieve a batch-scoring job by its identifier.
+
+    Parameters:
+    - db (Session): The database session.
+    - job_id (str): The identifier of the job.
+    - owner (str, optional): If given, only a job submitted by this username is returned.
+
+    Returns:
+    - BatchJob: The job if found.
+
+    Raises:
+    - HTTPException: If the job is not found.
+    """
+    query = db.query(BatchJob).filter(BatchJob.id == job_id)
+    if owner is not None:
+        query = query.filter(BatchJob.owner == owner)
+    job = query.first()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return job
+
+def get_jobs_by_owner(db: Session, owner: str, skip: int = 0, limit: int = 50):
+    """
+    List the batch-scoring jobs submitted by a user, newest first.
+
+    Parameters:
+    - db (Session): The database session.
+    - owner (str): The username of the user.
+    - skip (int): Number of jobs to skip.
+    - limit (int): Maximum number of jobs to return.
+
+    Returns:
+    - list[BatchJob]: The user's jobs.
+    """
+    return (
+        db.query(BatchJob)
+        .filter(BatchJob.owner == owner)
+        .order_by(BatchJob.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+def get_unfinished_jobs(db: Session):
+    """
+    List jobs that are queued or were running when the service stopped.
+
+    Parameters:
+    - db (Session): The database session.
+
+    Returns:
+    - list[BatchJob]: Jobs whose status is "queued" or "running", oldest first.
+    """
+    return (
+        db.query(BatchJob)
+        .filter(BatchJob.status.in_(["queued", "running"]))
+        .order_by(BatchJob.created_at)
+        .all()
+    )
+
+def get_finished_jobs_before(db: Session, before: datetime):
+    """
+    List completed or failed jobs that finished before a given time.
+
+    Parameters:
+    - db (Session): The database session.
+    - before (datetime): Jobs that finished at or after this time are not listed.
+
+    Returns:
+    - list[BatchJob]: The matching jobs, oldest first.
+    """
+    return (
+        db.query(BatchJob)
+        .filter(BatchJob.status.in_(["completed", "failed"]), BatchJob.finished_at < before)
+        .order_by(BatchJob.finished_at)
+        .all()
+    )
+
+def delete_job(db: Session, job_id: str):
+    """
+    Delete a batch-scoring job's record.
+
+    Parameters:
+    - db (Session): The database session.
+    - job_id (str): The identifier of the job.
+    """
+    db.query(BatchJob).filter(BatchJob.id == job_id).delete()
+    db.commit()
+
+def update_job(db: Session, job_id: str, **fields):
+    """
+    Update fields of a batch-scoring job.
+
+    Parameters:
+    - db (Session): The database session.
+    - job_id (str): The identifier of the job.
+    - **fields: Column values to set.
+
+    Returns:
+    - BatchJob: The updated job.
+    """
+    job = get_job(db, job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.commit()
+    return job
+
+def get_audit_entries(db: Session, username: str = None, since: datetime = None, until: datetime = None, skip: int = 0, limit: int = 100):
+    """
+    List prediction audit records, newest first.
+
+    Parameters:
+    - db (Session): The database session.
+    - username (str, optional): Only records of this user.
+    - since (datetime, optional): Only records created at or after this time (UTC).
+    - until (datetime, optional): Only records created before this time (UTC).
+    - skip (int): Number of records to skip.
+    - limit (int): Maximum number of records to return.
+
+    Returns:
+    - list[PredictionAudit]: The matching records.
+    """
+    query = db.query(PredictionAudit)
+    if username is not None:
+        query = query.filter(PredictionAudit.username == username)
+    if since is not None:
+        query = query.filter(PredictionAudit.created_at >= since)
+    if until is not None:
+        query = query.filter(PredictionAudit.created_at < until)
+    return query.order_by(PredictionAudit.id.desc()).offset(skip).limit(limit).all()
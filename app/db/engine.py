@@ -0,0 +1,111 @@
+import logging
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+from app.core.config import (
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    SQLITE_WAL, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE, SQLITE_BUSY_TIMEOUT_MS,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+def sqlite_pragmas() -> list[str]:
+    """
+    The pragmas run on every new SQLite connection, from the SQLITE_* settings.
+
+    Returns:
+    - list[str]: PRAGMA statements.
+
+    Raises:
+    - ValueError: If SQLITE_SYNCHRONOUS is not a valid mode.
+    """
+    if SQLITE_SYNCHRONOUS not in SYNCHRONOUS_MODES:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(SYNCHRONOUS_MODES)}, not {SQLITE_SYNCHRONOUS}")
+    pragmas = [
+        f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}",
+        # A negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if SQLITE_WAL:
+        # Persistent in the database file; repeating it on an already-WAL database is a no-op
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Create the SQLAlchemy engine, tuned for FastAPI handlers running on many threads.
+
+    SQLite connections may be used from any thread and get the SQLITE_* pragmas as soon as
+    they are opened: WAL, so logins read while a registration writes; a busy timeout, so
+    concurrent writers queue instead of failing; and the synchronous, cache and mmap settings.
+    File databases keep a pool of DB_POOL_SIZE connections, so a session never pays for
+    opening a connection and re-running the pragmas. In-memory databases share one connection,
+    since each connection would otherwise see its own empty database.
+
+    Parameters:
+    - url (str): The database URL.
+
+    Returns:
+    - Engine: The configured engine.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(
+            url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT, pool_pre_ping=True,
+        )
+
+    database = make_url(url).database
+    if database in (None, "", ":memory:"):
+        return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    pragmas = sqlite_pragmas()
+    engine = create_engine(
+        url,
+        # The busy_timeout pragma governs lock waits; the driver's own timeout is kept in step
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+def create_schema(engine: Engine, metadata):
+    """
+    Create missing tables, then any nullable columns and indexes missing from existing tables.
+
+    `create_all` skips tables that already exist, so columns and indexes added to a model later
+    would never reach a database created before them. Only nullable columns are added, since
+    existing rows have no value for them.
+
+    Parameters:
+    - engine (Engine): The database engine.
+    - metadata (MetaData): The declarative metadata holding the tables.
+    """
+    metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                logger.info(f"Adding column {table.name}.{column.name}")
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
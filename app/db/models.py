@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, Boolean
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Float, Index
 from app.db.session import Base
 
 class User(Base):
@@ -18,8 +19,77 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
-    email = Column(String, nullable=True)
+    email = Column(String, index=True, nullable=True)
     hashed_password = Column(String, nullable=True)
     full_name = Column(String, nullable=True)
     picture = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+
+
+class BatchJob(Base):
+    """
+    BatchJob model representing the batch_jobs table in the database.
+
+    Attributes:
+    - id (str): The job identifier (UUID4 hex).
+    - owner (str): The username of the user who submitted the job.
+    - filename (str): The original name of the uploaded file.
+    - content_type (str): The content type of the uploaded file.
+    - status (str): One of "queued", "running", "completed" or "failed".
+    - total_rows (int): The number of data rows in the file, once known.
+    - processed_rows (int): The number of rows scored so far.
+    - error (str): The error message if the job failed.
+    - model_version (str): The model version active when the job was submitted, used for every row.
+    - model_path (str): The file of that model version, None for the development dummy model.
+    - created_at (datetime): When the job was submitted.
+    - started_at (datetime): When a worker started scoring the job.
+    - finished_at (datetime): When the job completed or failed.
+    """
+    __tablename__ = "batch_jobs"
+    __table_args__ = (
+        # Serves "a user's jobs, newest first" without sorting
+        Index("ix_batch_jobs_owner_created_at", "owner", "created_at"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    owner = Column(String, index=True, nullable=False)
+    filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=False)
+    status = Column(String, index=True, nullable=False, default="queued")
+    total_rows = Column(Integer, nullable=True)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    model_version = Column(String, nullable=True)
+    model_path = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class PredictionAudit(Base):
+    """
+    PredictionAudit model representing the prediction_audit table in the database.
+
+    Rows are written in bulk by the audit log in app.core.audit, shortly after each request.
+
+    Attributes:
+    - id (int): The primary key, increasing in write order.
+    - created_at (datetime): When the prediction was requested (UTC).
+    - username (str): The user who requested the prediction.
+    - endpoint (str): "predict", "batch_predict" or "batch_predict_stream".
+    - model_version (str): The model version that produced the prediction.
+    - feature_hash (str): Digest of the features and model version, as used by the prediction cache.
+    - rows (int): Number of rows scored; 1 for single predictions.
+    - survival_probability (float): The predicted probability, for single predictions.
+    - latency_ms (float): Time taken to answer, in milliseconds.
+    """
+    __tablename__ = "prediction_audit"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, index=True, nullable=False)
+    username = Column(String, index=True, nullable=False)
+    endpoint = Column(String, nullable=False)
+    model_version = Column(String, nullable=False)
+    feature_hash = Column(String, nullable=True)
+    rows = Column(Integer, nullable=True)
+    survival_probability = Column(Float, nullable=True)
+    latency_ms = Column(Float, nullable=False)
@@ -1,12 +1,25 @@
-from sqlalchemy import create_engine
+import time
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import DATABASE_URL
+from app.core.metrics import metrics, db_session_seconds, CallbackMetric
+from app.db.engine import create_db_engine
 
 # Use the DATABASE_URL from config
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def _pool_connections():
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [(("checked_out",), pool.checkedout()), (("idle",), pool.checkedin())]
+
+metrics.register(CallbackMetric(
+    "oncoai_db_pool_connections", "Pooled database connections in use and idle.", "gauge",
+    ("state",), _pool_connections,
+))
+
 def get_db():
     """
     Create a new database session and close it after the request is finished.
@@ -17,8 +30,10 @@ def get_db():
     Usage:
     - Use this function as a dependency in FastAPI route handlers to get a database session.
     """
+    started = time.perf_counter()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        db_session_seconds.observe(time.perf_counter() - started)
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import logging
 import os
 from dotenv import load_dotenv
@@ -10,15 +12,20 @@ from contextlib import asynccontextmanager
 # Load environment variables from .env file
 load_dotenv()
 
-from app.api import survival
+from app.api import survival, jobs, audit
 from app.api.auth import router as auth_router
 from app.schemas.auth import Token
 from app.db.session import engine, Base, get_db
-from app.core.config import DATABASE_URL
-from app.core.model import model
+from app.db.engine import create_schema
+from app.core.config import DATABASE_URL, METRICS_ENABLED
+from app.core.registry import registry
 from app.core.security import create_access_token
 from app.db.crud import get_user_by_username
-from app.core.utils import verify_password
+from app.core.utils import verify_password_async, password_executor
+from app.core.jobs import resume_unfinished_jobs, start_cleanup as start_job_cleanup, shutdown as shutdown_jobs
+from app.core.executor import inference_executor
+from app.core.audit import audit_log
+from app.core.metrics import metrics, MetricsMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,12 +41,34 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("OncoAI API starting up...")
     logger.info(f"Database URL: {DATABASE_URL}")
-    logger.info(f"Model loaded: {model is not None}")
+    # Loaded here rather than at import, so importing the app (tests, tooling, --reload) stays cheap
+    try:
+        handle = await run_in_threadpool(registry.ensure_loaded)
+    except Exception as e:
+        logger.error(f"Error loading model: {e}")
+        raise
+    logger.info(f"Model loaded: {handle.version} ({handle.load_seconds:.2f}s)")
+    registry.start_watching()
+    audit_log.start()
+    # With several server workers only the first one started resumes jobs, so none is scored
+    # twice; worker 0 deletes expired jobs, including after it is restarted
+    if getattr(app.state, "resume_jobs", True):
+        resumed = resume_unfinished_jobs()
+        if resumed:
+            logger.info(f"Resumed {resumed} unfinished batch jobs")
+    if getattr(app.state, "clean_jobs", True):
+        start_job_cleanup()
 
     yield
 
     # Shutdown
     logger.info("OncoAI API shutting down...")
+    registry.stop_watching()
+    shutdown_jobs()
+    inference_executor.shutdown()
+    # After the executor, so records of the last requests are written too
+    audit_log.stop()
+    password_executor.shutdown()
 
 app = FastAPI(
     title="OncoAI Survival Prediction API",
@@ -53,9 +82,9 @@ from app.core.config import SECRET_KEY
 if not SECRET_KEY or SECRET_KEY == "dev-secret-key-change-in-production":
     logger.warning("Using development SECRET_KEY. This should be changed in production.")
 
-# Create database tables if they don't exist
+# Create database tables and indexes if they don't exist
 try:
-    Base.metadata.create_all(bind=engine)
+    create_schema(engine, Base.metadata)
     logger.info("Database tables created/verified successfully")
 except Exception as e:
     logger.error(f"Database initialization failed: {e}")
@@ -84,8 +113,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it wraps every other middleware and times the whole request
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(survival.router, prefix="/api", tags=["Predicción"])
+app.include_router(jobs.router, prefix="/api", tags=["Predicción"])
+app.include_router(audit.router, prefix="/api", tags=["Auditoría"])
 app.include_router(auth_router, prefix="/auth", tags=["Autenticación"])
 
 @app.get(
@@ -143,7 +178,8 @@ async def root():
                     "example": {
                         "status": "healthy",
                         "database": "connected",
-                        "model_loaded": True
+                        "model_loaded": True,
+                        "model_version": "lgg_model-3f2a9c1b7d4e"
                     }
                 }
             }
@@ -176,13 +212,26 @@ async def health_check():
         - **status** (str): Overall health status ("healthy" or "unhealthy")
         - **database** (str): Database connection status ("connected" or "disconnected")
         - **model_loaded** (bool): Whether the ML model is loaded and ready
+        - **model_version** (str): Version of the active model
     """
     return {
         "status": "healthy",
         "database": "connected" if DATABASE_URL else "disconnected",
-        "model_loaded": model is not None
+        "model_loaded": registry.active is not None,
+        "model_version": registry.active.version if registry.active is not None else None
     }
 
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def prometheus_metrics():
+        """
+        Expose in-process metrics in the Prometheus text format.
+
+        Covers request latency per route, model scoring time and rows, batch file sizes,
+        executor queue depth and wait, request database session time and bcrypt time.
+        """
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/token", response_model=Token, tags=["Autenticación"])
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
@@ -198,7 +247,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     - HTTPException: If the username or password is incorrect.
     """
     try:
-        user = get_user_by_username(db, form_data.username)
+        user = await run_in_threadpool(get_user_by_username, db, form_data.username)
     except HTTPException:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -206,7 +255,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
@@ -0,0 +1,44 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class AuditEntry(BaseModel):
+    """
+    Schema for one prediction audit record.
+
+    Attributes:
+    - id (int): The record identifier, increasing in write order.
+    - created_at (datetime): When the prediction was requested (UTC).
+    - username (str): The user who requested the prediction.
+    - endpoint (str): "predict", "batch_predict", "batch_predict_stream", "explain", "explain_batch", "sweep" or "jobs".
+    - model_version (str): The model version that produced the prediction.
+    - feature_hash (Optional[str]): Digest of the features and model version.
+    - rows (Optional[int]): Number of rows scored.
+    - survival_probability (Optional[float]): The predicted probability, for single predictions.
+    - latency_ms (float): Time taken to answer, in milliseconds.
+    """
+    id: int
+    created_at: datetime
+    username: str
+    endpoint: str
+    model_version: str
+    feature_hash: Optional[str] = None
+    rows: Optional[int] = None
+    survival_probability: Optional[float] = None
+    latency_ms: float
+
+    class Config:
+        from_attributes = True
+
+class AuditPage(BaseModel):
+    """
+    Schema for a page of prediction audit records.
+
+    Attributes:
+    - offset (int): Number of records skipped.
+    - limit (int): Maximum number of records requested.
+    - entries (List[AuditEntry]): The records in this page, newest first.
+    """
+    offset: int
+    limit: int
+    entries: List[AuditEntry]
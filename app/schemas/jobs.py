@@ -0,0 +1,65 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class JobStatus(BaseModel):
+    """
+    Schema for the status of a batch-scoring job.
+
+    Attributes:
+    - job_id (str): The identifier of the job.
+    - status (str): One of "queued", "running", "completed" or "failed".
+    - filename (Optional[str]): The original name of the uploaded file.
+    - total_rows (Optional[int]): The number of data rows, once known.
+    - processed_rows (int): The number of rows scored so far.
+    - progress (Optional[float]): Fraction of rows scored (0.0 to 1.0), once the total is known.
+    - error (Optional[str]): The error message if the job failed.
+    - model_version (Optional[str]): The model version every row is scored with.
+    - created_at (datetime): When the job was submitted.
+    - started_at (Optional[datetime]): When scoring started.
+    - finished_at (Optional[datetime]): When the job completed or failed.
+    """
+    job_id: str
+    status: str
+    filename: Optional[str] = None
+    total_rows: Optional[int] = None
+    processed_rows: int = 0
+    progress: Optional[float] = None
+    error: Optional[str] = None
+    model_version: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobPrediction(BaseModel):
+    """
+    Schema for one row of job results.
+
+    Attributes:
+    - row (int): The zero-based row index in the uploaded file.
+    - survival_probability (Optional[float]): The predicted probability, None for invalid rows.
+    """
+    row: int
+    survival_probability: Optional[float] = None
+
+class JobResults(BaseModel):
+    """
+    Schema for a page of job results.
+
+    Attributes:
+    - job_id (str): The identifier of the job.
+    - status (str): The status of the job when the page was read.
+    - offset (int): Index of the first row in this page.
+    - limit (int): Number of rows in this page: the requested limit, capped at the rows
+      scored after `offset`.
+    - available_rows (int): Number of rows scored so far.
+    - model_version (Optional[str]): The model version that scored the rows.
+    - predictions (List[JobPrediction]): The rows in this page.
+    """
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    available_rows: int
+    model_version: Optional[str] = None
+    predictions: List[JobPrediction]
@@ -1,14 +1,91 @@
-from pydantic import BaseModel
-from typing import List
+import base64
+import binascii
+from pydantic import BaseModel, PlainSerializer, PlainValidator, WithJsonSchema
+from typing import Annotated, Dict, List, Optional
+import numpy as np
+from app.core.features import feature_registry, DEFAULT_FEATURE_NAMES
+
+N_FEATURES = len(DEFAULT_FEATURE_NAMES)
+
+def parse_features(value) -> np.ndarray:
+    """
+    Validate a feature vector straight into a float64 NumPy array, in one pass.
+
+    Accepts a JSON array of numbers in model order, an object of values keyed by feature name,
+    or a base64 string of packed little-endian float32 values (4 bytes per feature), which is
+    about a third of the size of the JSON array. The model compares features in float32, so
+    packing them as float32 loses no accuracy.
+
+    Parameters:
+    - value (list | dict | str | np.ndarray): The raw `features` value.
+
+    Returns:
+    - np.ndarray: One-dimensional float64 array. NaN and infinite values are kept for the
+      endpoint to reject, since validation errors echo the input and NaN is not valid JSON.
+
+    Raises:
+    - ValueError: If the value is not a flat list of numbers, an object with exactly the model's
+      features, or valid base64 float32 data. Booleans are not numbers here.
+    """
+    if isinstance(value, dict):
+        # Mapped into model order through the precomputed feature index
+        return feature_registry.vector(value)
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except binascii.Error:
+            raise ValueError("Cadena base64 no válida")
+        if len(raw) % 4:
+            raise ValueError("La cadena base64 debe contener valores float32 de 4 bytes")
+        features = np.frombuffer(raw, dtype="<f4").astype(np.float64)
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        # NumPy would read true/false as 1.0/0.0
+        if isinstance(value, np.ndarray) and value.dtype == np.bool_ or any(type(v) is bool for v in value):
+            raise ValueError("Las características deben ser numéricas")
+        try:
+            features = np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Las características deben ser numéricas")
+    else:
+        raise ValueError("Las características deben ser una lista de números, un objeto por nombre o una cadena base64")
+
+    if features.ndim != 1:
+        raise ValueError("Las características deben ser una lista de números")
+    return features
+
+# A feature vector validated into a NumPy array; serialized back to a list of floats
+FeatureVector = Annotated[
+    np.ndarray,
+    PlainValidator(parse_features),
+    PlainSerializer(lambda features: features.tolist(), return_type=List[float]),
+    WithJsonSchema({
+        "anyOf": [
+            {"type": "array", "items": {"type": "number"}, "minItems": N_FEATURES, "maxItems": N_FEATURES},
+            {
+                "type": "object",
+                "properties": {name: {"type": "number"} for name in DEFAULT_FEATURE_NAMES},
+                "required": list(DEFAULT_FEATURE_NAMES),
+                "additionalProperties": False,
+            },
+            {
+                "type": "string",
+                "format": "base64",
+                "description": f"{N_FEATURES} little-endian float32 values, base64-encoded",
+            },
+        ]
+    }),
+]
 
 class SurvivalInput(BaseModel):
     """
     Schema for survival prediction input.
 
     Attributes:
-    - features (List[float]): A list of 32 numerical features for the prediction.
+    - features (FeatureVector): The 32 numerical features for the prediction, as a list of
+      numbers in model order, an object keyed by feature name (e.g. `{"B2M_expression": 0.4, ...}`)
+      or a base64 string of packed little-endian float32 values.
     """
-    features: List[float]
+    features: FeatureVector
 
     class Config:
         from_attributes = True
@@ -19,8 +96,102 @@ class SurvivalOutput(BaseModel):
 
     Attributes:
     - survival_probability (float): The predicted survival probability.
+    - model_version (Optional[str]): The version of the model that produced the prediction.
     """
     survival_probability: float
+    model_version: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+class ExplanationOutput(BaseModel):
+    """
+    Schema for a survival prediction with its per-feature contributions.
+
+    The bias plus the sum of the contributions is the model's raw score: log-odds when `link`
+    is "logit", so the probability is its sigmoid; the probability itself when `link` is
+    "identity".
+
+    Attributes:
+    - survival_probability (float): The predicted survival probability.
+    - model_version (str): The version of the model that produced the prediction.
+    - link (str): "logit" or "identity", how raw scores map to probabilities.
+    - bias (float): The raw score before any feature is considered.
+    - contributions (Dict[str, float]): Each feature's contribution to the raw score, keyed by
+      feature name in model order.
+    """
+    survival_probability: float
+    model_version: str
+    link: str
+    bias: float
+    contributions: Dict[str, float]
+
+class BatchExplanationOutput(BaseModel):
+    """
+    Schema for batch survival predictions with their per-feature contributions.
+
+    Attributes:
+    - model_version (str): The version of the model that produced the predictions.
+    - link (str): "logit" or "identity", how raw scores map to probabilities.
+    - bias (float): The raw score before any feature is considered.
+    - features (List[str]): Feature names, in the order of each row's contributions.
+    - predictions (List[Optional[float]]): Survival probability per row, null for rows with
+      missing or non-numeric features.
+    - contributions (List[Optional[List[float]]]): Contributions per row, aligned with
+      `features`, null for rows with missing or non-numeric features.
+    """
+    model_version: str
+    link: str
+    bias: float
+    features: List[str]
+    predictions: List[Optional[float]]
+    contributions: List[Optional[List[float]]]
+
+class SweepAxis(BaseModel):
+    """
+    Schema for one feature varied by a what-if sweep.
+
+    Give either explicit `values`, or `start`, `stop` and `num` for `num` evenly spaced values
+    from `start` to `stop` inclusive.
+
+    Attributes:
+    - feature (str): The feature name, e.g. "CD74_expression".
+    - values (Optional[List[float]]): The values to try.
+    - start (Optional[float]): First value of an evenly spaced grid.
+    - stop (Optional[float]): Last value of an evenly spaced grid.
+    - num (Optional[int]): Number of values in an evenly spaced grid.
+    """
+    feature: str
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    num: Optional[int] = None
+
+class SweepInput(BaseModel):
+    """
+    Schema for a what-if sweep: a base feature vector and one or two features to vary.
+
+    Attributes:
+    - features (FeatureVector): The base 32 features, in any of the prediction input formats.
+    - vary (List[SweepAxis]): One feature for a response curve, two for a response surface.
+    """
+    features: FeatureVector
+    vary: List[SweepAxis]
+
+class SweepOutput(BaseModel):
+    """
+    Schema for the result of a what-if sweep.
+
+    Attributes:
+    - model_version (str): The version of the model that scored the sweep.
+    - base_survival_probability (float): The survival probability of the unmodified features.
+    - features (List[str]): The varied features, in request order.
+    - grid (List[List[float]]): The values tried for each varied feature.
+    - survival_probability (List[float] | List[List[float]]): The response curve, one value per
+      grid value, or for two features the response surface, indexed [first][second].
+    """
+    model_version: str
+    base_survival_probability: float
+    features: List[str]
+    grid: List[List[float]]
+    survival_probability: List[float] | List[List[float]]
@@ -0,0 +1,252 @@
+"""
+Production server: load the model once in a parent process, then fork the workers.
+
+Usage:
+    python -m app.serve [--workers N] [--host HOST] [--port PORT]
+
+The parent imports the app, creates the database tables, loads and warms up the model and
+imports pandas. It then binds the listening socket and forks the workers. Each worker runs
+uvicorn with the httptools parser on the shared socket. Workers inherit the model's arrays
+copy-on-write. `gc.freeze()` keeps the garbage collector from writing to those pages, so the
+model is held in memory once and not once per worker. A version hot-swapped in later is
+loaded by each worker separately, so it takes one copy per worker.
+
+The parent restarts workers that die and reports the resident memory of each worker. On
+SIGTERM or SIGINT it stops the workers gracefully. Defaults come from app/core/config.py.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import uvicorn
+
+from app.core.config import SERVE_HOST, SERVE_PORT, SERVE_WORKERS, SERVE_KEEP_ALIVE, SERVE_MEMORY_REPORT_INTERVAL
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds workers get to finish in-flight requests on shutdown before they are killed
+SHUTDOWN_TIMEOUT = 30
+# Exit status of a worker whose startup (lifespan) failed; the server stops instead of restarting it
+WORKER_STARTUP_FAILED = 3
+
+def process_memory(pid: int) -> dict | None:
+    """
+    Memory use of a process in MiB, read from /proc/<pid>/smaps_rollup (Linux only).
+
+    Parameters:
+    - pid (int): The process id.
+
+    Returns:
+    - dict | None: `rss`, `pss`, `shared` and `private` in MiB, or None if unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "shared": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """
+    Bind the listening socket shared by all workers.
+    """
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def http_implementation() -> str:
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        logger.warning("httptools is not installed, falling back to the h11 HTTP parser")
+        return "h11"
+
+def preload():
+    """
+    Import the app and load everything workers should share before forking.
+
+    Returns:
+    - FastAPI: The application.
+    """
+    started = time.perf_counter()
+    from app.main import app
+    from app.core.registry import registry
+
+    handle = registry.ensure_loaded()
+    import pandas  # noqa: F401  (parsed uploads; imported lazily otherwise)
+
+    # Objects created so far are never collected, so the collector never writes to their pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded app and model {handle.version} in {time.perf_counter() - started:.2f}s")
+    return app
+
+class Supervisor:
+    """
+    Forks the workers, restarts the ones that die and stops them on shutdown.
+
+    Parameters:
+    - app (FastAPI): The preloaded application.
+    - sock (socket.socket): The bound listening socket.
+    - workers (int): Number of worker processes.
+    - keep_alive (int): Seconds an idle keep-alive connection is held open.
+    - report_interval (float): Seconds between memory reports; 0 reports only at startup.
+    """
+    def __init__(self, app, sock: socket.socket, workers: int, keep_alive: int, report_interval: float):
+        self.app = app
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.keep_alive = keep_alive
+        self.report_interval = report_interval
+        self.http = http_implementation()
+        self.children: dict[int, int] = {}
+        self.stopping = False
+        self.exit_code = 0
+
+    def spawn(self, index: int, resume_jobs: bool):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            return
+
+        # Worker process
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            from app.db.session import engine
+
+            # Never reuse database connections opened by the parent
+            engine.dispose(close=False)
+            self.app.state.resume_jobs = resume_jobs
+            # Worker 0 deletes expired jobs, also after a restart
+            self.app.state.clean_jobs = index == 0
+            config = uvicorn.Config(
+                self.app,
+                http=self.http,
+                lifespan="on",
+                timeout_keep_alive=self.keep_alive,
+                timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+            )
+            server = uvicorn.Server(config)
+            server.run(sockets=[self.sock])
+            code = 0 if server.started else WORKER_STARTUP_FAILED
+        except BaseException:
+            logger.exception(f"Worker {index} crashed")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def handle_signal(self, signum, frame):
+        self.stopping = True
+
+    def reap(self):
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            if code == WORKER_STARTUP_FAILED:
+                logger.error(f"Worker {index} (pid {pid}) failed to start; stopping the server")
+                self.stopping = True
+                self.exit_code = 1
+                continue
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {code}; restarting it")
+            time.sleep(1)
+            self.spawn(index, resume_jobs=False)
+
+    def report_memory(self):
+        parent = process_memory(os.getpid())
+        if parent is None:
+            logger.info("Per-worker memory report is only available on Linux")
+            return
+        logger.info(f"Memory: parent pid {os.getpid()} rss {parent['rss']:.1f} MiB")
+        for pid, index in sorted(self.children.items(), key=lambda item: item[1]):
+            usage = process_memory(pid)
+            if usage is not None:
+                logger.info(
+                    f"Memory: worker {index} pid {pid} rss {usage['rss']:.1f} MiB "
+                    f"(shared {usage['shared']:.1f}, private {usage['private']:.1f}, pss {usage['pss']:.1f})"
+                )
+
+    def run(self) -> int:
+        """
+        Fork the workers and supervise them until a shutdown signal arrives.
+
+        Returns:
+        - int: The process exit status.
+        """
+        signal.signal(signal.SIGINT, self.handle_signal)
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        host, port = self.sock.getsockname()[:2]
+        logger.info(f"Starting {self.workers} workers on http://{host}:{port} ({self.http} parser)")
+        for index in range(self.workers):
+            self.spawn(index, resume_jobs=index == 0)
+
+        # First report once the workers have started serving
+        next_report = time.monotonic() + 5
+        while not self.stopping:
+            self.reap()
+            if next_report is not None and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + self.report_interval if self.report_interval > 0 else None
+            time.sleep(0.5)
+
+        self.shutdown()
+        return self.exit_code
+
+    def shutdown(self):
+        logger.info("Stopping workers...")
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT + 5
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            logger.warning(f"Worker pid {pid} did not stop in time; killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.sock.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=SERVE_HOST, help=f"Listen address (default: {SERVE_HOST})")
+    parser.add_argument("--port", type=int, default=SERVE_PORT, help=f"Listen port (default: {SERVE_PORT})")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help=f"Worker processes (default: {SERVE_WORKERS})")
+    args = parser.parse_args(argv)
+
+    app = preload()
+    sock = bind_socket(args.host, args.port)
+    supervisor = Supervisor(app, sock, args.workers, SERVE_KEEP_ALIVE, SERVE_MEMORY_REPORT_INTERVAL)
+    return supervisor.run()
+
+if __name__ == "__main__":
+    sys.exit(main())
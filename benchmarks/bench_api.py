@@ -0,0 +1,243 @@
+"""
+Benchmark suite for the prediction and authentication hot paths, run in process.
+
+Usage:
+    python -m benchmarks.bench_api [--scenarios NAMES] [--requests N] [--concurrency C]
+                                   [--output FILE] [--compare BASELINE] [--threshold FRACTION]
+
+Drives the real ASGI app through httpx's ASGI transport, so no network or server process is
+involved, and reports throughput and p50/p95/p99 latency per scenario:
+
+- predict:               POST /api/lgg_survival/ with a fresh feature vector per request
+- batch_predict_<rows>:  POST /api/lgg_survival/batch_predict with a CSV of <rows> rows
+- sweep_200:             POST /api/lgg_survival/sweep, a 200-point curve over one feature
+- login:                 POST /token (bcrypt verification)
+- authenticated:         GET /api/lgg_survival/models, the cost of token authentication alone
+
+The prediction cache is disabled unless --with-cache is given, so repeated runs measure the
+model. --output writes the results as JSON. --compare reads a previous --output file and
+exits with status 1 if any scenario's p50 or p95 grew, or its throughput fell, by more than
+--threshold (default 0.15); save a baseline before upgrading sklearn, pydantic or FastAPI and
+compare after.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+BATCH_SIZES = (100, 1000, 10000)
+SCENARIOS = ("predict", *(f"batch_predict_{rows}" for rows in BATCH_SIZES), "sweep_200", "login", "authenticated")
+# Relative cost of each scenario; requests per scenario are --requests divided by this
+SCENARIO_WEIGHT = {"batch_predict_1000": 5, "batch_predict_10000": 20, "sweep_200": 2, "login": 10}
+WARMUP_REQUESTS = 5
+
+def latency_summary(samples: list[float], errors: int, elapsed: float) -> dict:
+    ms = np.array(samples) * 1000
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+def csv_body(rows: int, seed: int) -> bytes:
+    from app.core.features import feature_registry
+
+    values = np.random.default_rng(seed).random((rows, feature_registry.size))
+    lines = [",".join(feature_registry.names)] + [",".join(f"{v:.6f}" for v in row) for row in values]
+    return "\n".join(lines).encode()
+
+async def run_scenario(send, requests: int, concurrency: int) -> dict:
+    """
+    Issue `requests` calls of `send` from `concurrency` concurrent clients.
+
+    Parameters:
+    - send (Callable[[int], Awaitable[httpx.Response]]): Issues request number i.
+    - requests (int): Number of measured requests.
+    - concurrency (int): Number of concurrent clients.
+
+    Returns:
+    - dict: Throughput and latency percentiles.
+    """
+    for i in range(WARMUP_REQUESTS):
+        await send(-1 - i)
+
+    samples: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await send(i)
+            samples.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latency_summary(samples, errors, time.perf_counter() - started)
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            credentials = {"username": "bench", "password": "benchpass"}
+            await client.post("/auth/register", json={**credentials, "full_name": "Bench"})
+            response = await client.post("/token", data=credentials)
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            features = np.random.default_rng(0).random((args.requests + WARMUP_REQUESTS, 32))
+            files = {rows: csv_body(rows, rows) for rows in BATCH_SIZES}
+
+            senders = {
+                "predict": lambda i: client.post(
+                    "/api/lgg_survival/", json={"features": features[i].tolist()}, headers=headers
+                ),
+                "sweep_200": lambda i: client.post(
+                    "/api/lgg_survival/sweep",
+                    json={
+                        "features": features[i].tolist(),
+                        "vary": [{"feature": "CD74_expression", "start": 0.0, "stop": 1.0, "num": 200}],
+                    },
+                    headers=headers,
+                ),
+                "login": lambda i: client.post("/token", data=credentials),
+                "authenticated": lambda i: client.get("/api/lgg_survival/models", headers=headers),
+            }
+            for rows in BATCH_SIZES:
+                senders[f"batch_predict_{rows}"] = lambda i, body=files[rows]: client.post(
+                    "/api/lgg_survival/batch_predict", files={"file": ("bench.csv", body, "text/csv")}, headers=headers
+                )
+
+            for name in args.scenarios:
+                requests = max(args.requests // SCENARIO_WEIGHT.get(name, 1), 10)
+                results[name] = await run_scenario(senders[name], requests, args.concurrency)
+                print_result(name, results[name])
+    return results
+
+def print_result(name: str, result: dict):
+    print(
+        f"{name:<22}{result['throughput_rps']:>10.1f} req/s   p50 {result['p50_ms']:8.2f} ms   "
+        f"p95 {result['p95_ms']:8.2f} ms   p99 {result['p99_ms']:8.2f} ms   "
+        f"n={result['requests']}" + (f"   errors={result['errors']}" if result["errors"] else "")
+    )
+
+def environment() -> dict:
+    versions = {}
+    for package in ("fastapi", "starlette", "pydantic", "sklearn", "numpy", "pandas", "sqlalchemy"):
+        try:
+            versions[package] = __import__(package).__version__
+        except (ImportError, AttributeError):
+            versions[package] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "versions": versions,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    List the scenarios that regressed against a baseline by more than `threshold`.
+
+    Parameters:
+    - results (dict): Scenario results from this run.
+    - baseline (dict): Scenario results from the baseline run.
+    - threshold (float): Allowed relative change, e.g. 0.15 for 15%.
+
+    Returns:
+    - list[str]: One message per regression.
+    """
+    regressions = []
+    print(f"\n{'scenario':<22}{'p50':>10}{'p95':>10}{'req/s':>10}   (change vs baseline)")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<22}{'new':>10}")
+            continue
+        changes = {
+            "p50": result["p50_ms"] / base["p50_ms"] - 1,
+            "p95": result["p95_ms"] / base["p95_ms"] - 1,
+            "req/s": result["throughput_rps"] / base["throughput_rps"] - 1,
+        }
+        print(f"{name:<22}" + "".join(f"{change:>+10.1%}" for change in changes.values()))
+        for metric, change in changes.items():
+            worse = -change if metric == "req/s" else change
+            if worse > threshold:
+                regressions.append(f"{name}: {metric} {change:+.1%} (threshold {threshold:.0%})")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests (baseline {base['errors']})")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests for the cheapest scenarios")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per scenario")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the prediction cache enabled")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON file from a previous --output")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # An isolated database and job directory; set before the app and its config are imported
+    workdir = tempfile.mkdtemp(prefix="oncoai-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+    os.environ.setdefault("JOBS_DIR", f"{workdir}/jobs")
+    os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+    # One user drives every scenario, far above any per-user rate limit
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    if not args.with_cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+    results = asyncio.run(run(args))
+    report = {
+        "environment": environment(),
+        "settings": {"requests": args.requests, "concurrency": args.concurrency, "with_cache": args.with_cache},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != report["settings"]:
+            print(f"\nWarning: baseline settings {baseline.get('settings')} differ from this run's {report['settings']}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Encoding time and size of batch results in each representation, plain and gzip-compressed.
+
+Usage:
+    python -m benchmarks.bench_batch_results [--rows N] [--repeat N]
+
+Encodes N survival probabilities (1% missing) the way `batch_predict` returns them:
+
+- legacy:   the former path, a list of row objects built from to_nullable and serialized
+            by ORJSONResponse on the event loop
+- rows:     the same document through app.core.results (the default representation)
+- columns:  `application/vnd.oncoai.columns+json`, a single array of probabilities
+- csv:      `text/csv`, `row,survival_probability` lines
+- npy:      `application/x-npy`, a float32 vector
+- annotate: the uploaded CSV (32 features and an id column) with a probability column appended
+
+Each body is decoded again and checked against the probabilities; the run exits with status 1
+on a mismatch. Times are p50 over --repeat calls, measured without any HTTP transfer.
+"""
+import argparse
+import gzip
+import io
+import sys
+import numpy as np
+import orjson
+
+from benchmarks.bench_inference_engines import time_call
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the batch")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per case")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from app.core.batch import to_nullable
+    from app.core.features import feature_registry
+    from app.core.formats import annotate_upload, CSV
+    from app.core.results import encode_results, ROWS_JSON, COLUMNS_JSON, RESULTS_CSV, RESULTS_NPY
+
+    rng = np.random.default_rng(0)
+    probs = rng.random(args.rows)
+    probs[rng.random(args.rows) < 0.01] = np.nan
+    version = "bench-000000000000"
+    frame = pd.DataFrame(rng.standard_normal((args.rows, feature_registry.size)), columns=feature_registry.columns)
+    frame.insert(0, "patient_id", [f"P{i:07d}" for i in range(args.rows)])
+    upload = frame.to_csv(index=False).encode()
+
+    def legacy() -> bytes:
+        results = [{"row": i, "survival_probability": p} for i, p in enumerate(to_nullable(probs))]
+        return orjson.dumps({"predictions": results, "model_version": version})
+
+    def decode_json_rows(body: bytes) -> np.ndarray:
+        return np.array([np.nan if r["survival_probability"] is None else r["survival_probability"] for r in orjson.loads(body)["predictions"]])
+
+    cases = [
+        ("legacy", legacy, decode_json_rows),
+        ("rows", lambda: encode_results(probs, ROWS_JSON, version)[0], decode_json_rows),
+        ("columns", lambda: encode_results(probs, COLUMNS_JSON, version)[0],
+         lambda body: np.array(orjson.loads(body)["survival_probability"], dtype=np.float64)),
+        ("csv", lambda: encode_results(probs, RESULTS_CSV, version)[0],
+         lambda body: pd.read_csv(io.BytesIO(body))["survival_probability"].to_numpy()),
+        ("npy", lambda: encode_results(probs, RESULTS_NPY, version)[0],
+         lambda body: np.load(io.BytesIO(body)).astype(np.float64)),
+        ("annotate", lambda: annotate_upload(io.BytesIO(upload), CSV, probs),
+         lambda body: pd.read_csv(io.BytesIO(body))["survival_probability"].to_numpy()),
+    ]
+
+    from app.core.config import GZIP_LEVEL
+
+    print(f"{args.rows} rows, gzip level {GZIP_LEVEL}")
+    print(f"{'case':<10}{'encode ms':>11}{'bytes':>12}{'gzip ms':>10}{'gzip bytes':>12}")
+    failed = False
+    for name, encode, decode in cases:
+        body = encode()
+        # .npy holds float32, so it matches to float32 precision
+        if not np.allclose(decode(body), probs, equal_nan=True, rtol=1e-6, atol=1e-7):
+            print(f"{name}: decoded values differ")
+            failed = True
+        encoded = time_call(encode, args.repeat)
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        gzipped = time_call(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), args.repeat)
+        print(
+            f"{name:<10}{encoded['p50_us'] / 1000:>11.1f}{len(body):>12}"
+            f"{gzipped['p50_us'] / 1000:>10.1f}{len(compressed):>12}"
+        )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Registration and login throughput against SQLite, with the default and the tuned engine.
+
+Usage:
+    python -m benchmarks.bench_db [--users N] [--threads T] [--operations N]
+
+Runs the database work of the /auth/register and /token handlers from T threads, the way
+FastAPI runs sync handlers and dependencies on its threadpool: registration checks the username
+and email then inserts, and login looks a user up by username. Password hashing is left out
+(users are inserted with a precomputed hash), so only the database is measured. Each engine
+gets a fresh database seeded with N users:
+
+- default:  the former engine, `check_same_thread=False` only, rollback journal, no email index
+- tuned:    app.db.engine.create_db_engine with WAL and pragmas, plus create_schema's indexes
+
+The mixed scenario runs logins and registrations at the same time on half the threads each.
+
+The audit scenario measures what recording one prediction costs the request, on the app's own
+engine: an insert and commit per prediction, against app.core.audit's write-behind queue.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# A bcrypt hash, so create_user stores it as is
+PASSWORD_HASH = "$2b$12$KIXQJ1Zx5yq0o4pV2C3b1eQm1Nn2c8mU3b2qz5G8z6y1cVbq0wGhe"
+
+def seed(engine, users: int):
+    from app.db.models import User
+
+    rows = [
+        {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": PASSWORD_HASH, "is_active": True}
+        for i in range(users)
+    ]
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), rows)
+
+def default_engine(url: str):
+    from sqlalchemy import create_engine, text
+    from app.db.session import Base
+    import app.db.models  # registers the tables on Base.metadata
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_users_email"))
+        connection.execute(text("DROP INDEX ix_batch_jobs_owner_created_at"))
+    return engine
+
+def tuned_engine(url: str):
+    from app.db.engine import create_db_engine, create_schema
+    from app.db.session import Base
+    import app.db.models  # registers the tables on Base.metadata
+
+    engine = create_db_engine(url)
+    create_schema(engine, Base.metadata)
+    return engine
+
+def register(Session, i: int, prefix: str):
+    from app.db.crud import create_user
+    from app.db.models import User
+
+    db = Session()
+    try:
+        username = f"{prefix}{i}"
+        email = f"{prefix}{i}@example.com"
+        if db.query(User).filter(User.username == username).first() is not None:
+            raise RuntimeError("duplicate username")
+        if db.query(User).filter(User.email == email).first() is not None:
+            raise RuntimeError("duplicate email")
+        create_user(db, username=username, password=PASSWORD_HASH, email=email)
+    finally:
+        db.close()
+
+def login(Session, i: int, users: int):
+    from app.db.crud import get_user_by_username
+
+    db = Session()
+    try:
+        get_user_by_username(db, f"user{(i * 7919) % users}")
+    finally:
+        db.close()
+
+def audit_inline(i: int):
+    from datetime import datetime
+    from app.db.models import PredictionAudit
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        connection.execute(PredictionAudit.__table__.insert(), {
+            "created_at": datetime.utcnow(), "username": f"user{i}", "endpoint": "predict",
+            "model_version": "bench", "feature_hash": None, "rows": 1,
+            "survival_probability": 0.5, "latency_ms": 0.0,
+        })
+
+def run_scenario(workers: dict, operations: int) -> dict:
+    """
+    Run each worker kind on its threads until `operations` calls of that kind are done.
+
+    Parameters:
+    - workers (dict): Kind -> (threads, Callable[[int], None]).
+    - operations (int): Calls per kind.
+
+    Returns:
+    - dict: Throughput, latency percentiles and errors per kind.
+    """
+    samples = {kind: [] for kind in workers}
+    errors = {kind: 0 for kind in workers}
+    counters = {kind: iter(range(operations)) for kind in workers}
+    finished = {kind: 0.0 for kind in workers}
+    lock = threading.Lock()
+
+    def loop(kind, op):
+        while True:
+            with lock:
+                i = next(counters[kind], None)
+            if i is None:
+                with lock:
+                    finished[kind] = max(finished[kind], time.perf_counter())
+                return
+            start = time.perf_counter()
+            try:
+                op(i)
+            except Exception:
+                errors[kind] += 1
+                continue
+            samples[kind].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(sum(threads for threads, _ in workers.values())) as pool:
+        futures = [pool.submit(loop, kind, op) for kind, (threads, op) in workers.items() for _ in range(threads)]
+        for future in futures:
+            future.result()
+
+    results = {}
+    for kind, values in samples.items():
+        ms = np.array(values or [0.0]) * 1000
+        results[kind] = {
+            # Each kind's rate is over the time until its own last call finished
+            "ops_per_s": len(values) / (finished[kind] - started),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "errors": errors[kind],
+        }
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20000, help="Users seeded before measuring")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent threads")
+    parser.add_argument("--operations", type=int, default=1000, help="Operations per scenario and kind")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="oncoai-bench-db-")
+    # Keep the app's own engine away from the development database
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/app.db")
+    from sqlalchemy.orm import sessionmaker
+
+    half = max(args.threads // 2, 1)
+    for name, make_engine in (("default", default_engine), ("tuned", tuned_engine)):
+        engine = make_engine(f"sqlite:///{workdir}/{name}.db")
+        seed(engine, args.users)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        scenarios = {
+            "register": {"register": (args.threads, lambda i: register(Session, i, "reg"))},
+            "login": {"login": (args.threads, lambda i: login(Session, i, args.users))},
+            "mixed": {
+                "login": (half, lambda i: login(Session, i, args.users)),
+                "register": (half, lambda i: register(Session, i, "mix")),
+            },
+        }
+        for scenario, workers in scenarios.items():
+            for kind, result in run_scenario(workers, args.operations).items():
+                label = f"{name} {scenario}" + (f" ({kind})" if len(workers) > 1 else "")
+                print(
+                    f"{label:<28}{result['ops_per_s']:>9.0f} ops/s   p50 {result['p50_ms']:7.2f} ms   "
+                    f"p99 {result['p99_ms']:8.2f} ms" + (f"   errors={result['errors']}" if result["errors"] else "")
+                )
+        engine.dispose()
+
+    from app.core.audit import AuditLog
+    from app.db.session import engine, Base
+    from app.db.engine import create_schema
+
+    create_schema(engine, Base.metadata)
+    audit = AuditLog(True, max_queue=args.operations * 2, batch_size=500, flush_interval=1.0)
+    audit.start()
+    scenarios = {
+        "inline": audit_inline,
+        "write-behind": lambda i: audit.record(f"user{i}", "predict", "bench", None, time.perf_counter(), probability=0.5),
+    }
+    for name, op in scenarios.items():
+        result = run_scenario({name: (args.threads, op)}, args.operations)[name]
+        print(
+            f"{'audit ' + name:<28}{result['ops_per_s']:>9.0f} ops/s   p50 {result['p50_ms']:7.2f} ms   "
+            f"p99 {result['p99_ms']:8.2f} ms" + (f"   errors={result['errors']}" if result["errors"] else "")
+        )
+    audit.stop()
+    print(f"write-behind records written: {audit.written}, dropped: {audit.dropped}, failed: {audit.failed}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Latency and parity benchmark for the sklearn and compiled inference engines.
+
+Usage:
+    python -m benchmarks.bench_inference_engines [--model PATH] [--repeat N]
+
+Without --model, a synthetic 100-tree GradientBoostingClassifier on 32 features is fitted,
+which matches the shape of the production model. Parity is checked on rows that cross both
+sides of every split threshold; the run exits with status 1 if the engines disagree.
+"""
+import argparse
+import sys
+import time
+import numpy as np
+
+from app.core.tree_engine import CompiledTreeEnsemble, parity_sample, max_parity_error
+
+def synthetic_model():
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((2000, 32))
+    y = (X[:, 0] + X[:, 3] * X[:, 5] + rng.standard_normal(2000) > 0).astype(int)
+    return GradientBoostingClassifier(n_estimators=100, random_state=0).fit(X, y)
+
+def time_call(fn, repeat: int) -> dict:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples = np.array(samples)
+    return {"p50_us": float(np.percentile(samples, 50)), "p99_us": float(np.percentile(samples, 99))}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", help="Path to a joblib model (default: synthetic gradient boosting)")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed calls per single-row case")
+    args = parser.parse_args(argv)
+
+    if args.model:
+        import joblib
+        model = joblib.load(args.model)
+    else:
+        model = synthetic_model()
+
+    engine = CompiledTreeEnsemble(model)
+    rng = np.random.default_rng(1)
+    sample = parity_sample(engine, n_rows=10000)
+    error = max(max_parity_error(model, engine, sample), max_parity_error(model, engine, rng.standard_normal((1000, 32))))
+    print(f"model: {type(model).__name__}, {engine.n_trees} trees, max depth {engine.max_depth}")
+    print(f"parity: max |compiled - sklearn| = {error:.3g}")
+
+    print(f"{'rows':>6}  {'engine':<9}{'p50 (us)':>12}{'p99 (us)':>12}")
+    for rows, repeat in ((1, args.repeat), (10000, max(args.repeat // 20, 5))):
+        X = sample[:rows]
+        for name, fn in (
+            ("sklearn", lambda: model.predict_proba(X)[:, 1]),
+            ("compiled", lambda: engine.predict_positive(X)),
+        ):
+            result = time_call(fn, repeat)
+            print(f"{rows:>6}  {name:<9}{result['p50_us']:>12.1f}{result['p99_us']:>12.1f}")
+
+    return 0 if error <= 1e-9 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Memory allocated and time taken to prepare model input, before and after the input layer.
+
+Usage:
+    python -m benchmarks.bench_input_alloc [--model PATH] [--repeat N]
+
+Without --model, the synthetic 100-tree GradientBoostingClassifier of bench_inference_engines
+is used. Each path is run as it was before app.core.inputs and as it is now:
+
+- single:       one 32-value list. Before: np.array to float64, reshape, then the engine's own
+                float32 copy. Now: model_predict writes the list into a reused float32 row.
+- microbatch:   64 float64 vectors. Before: np.stack to float64, then a float32 copy. Now:
+                model_predict_vectors stacks them into a reused float32 buffer.
+- batch_10000:  a 10000-row float64 matrix with a few invalid rows. Before: the valid rows were
+                gathered into a float64 copy, then sklearn copied them to float32. Now:
+                score_matrix converts the chunk into a reused float32 buffer and gathers
+                the valid rows from it; a chunk with no invalid rows is not copied again.
+
+Allocation is measured with tracemalloc, which sees NumPy's array buffers, as the peak bytes
+allocated during one warm call above what was allocated before it. Both paths record the
+same metrics and make the same model call, so the difference is the input preparation.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from benchmarks.bench_inference_engines import synthetic_model
+
+def legacy_predict_positive(handle, X: np.ndarray) -> np.ndarray:
+    # ModelHandle.predict_positive before the input layer: each engine made its own float32 copy
+    from app.core.config import COMPILED_ENGINE_MAX_ROWS
+
+    if handle.engine is not None and X.shape[0] <= COMPILED_ENGINE_MAX_ROWS:
+        return handle.engine.predict_positive(X)
+    return handle.estimator.predict_proba(X)[:, 1]
+
+def legacy_batch_call(handle, X: np.ndarray) -> np.ndarray:
+    # model_predict_batch before the input layer, metrics included so only the input path differs
+    from app.core.metrics import model_predict_seconds, model_predict_rows
+
+    model_predict_rows.observe(X.shape[0], "model_predict_batch")
+    with model_predict_seconds.time("model_predict_batch"):
+        return legacy_predict_positive(handle, X)
+
+def legacy_single(handle, features: list) -> float:
+    from app.core.metrics import model_predict_seconds, model_predict_rows
+
+    row = np.asarray(features, dtype=np.float64)
+    model_predict_rows.observe(1, "model_predict")
+    with model_predict_seconds.time("model_predict"):
+        return float(legacy_predict_positive(handle, row.reshape(1, -1))[0])
+
+def legacy_microbatch(handle, rows: list) -> np.ndarray:
+    return legacy_batch_call(handle, np.stack(rows))
+
+def legacy_batch(handle, matrix: np.ndarray, valid: np.ndarray, chunk_size: int = 10000) -> np.ndarray:
+    probs = np.full(matrix.shape[0], np.nan)
+    rows = np.flatnonzero(valid)
+    for start in range(0, rows.size, chunk_size):
+        idx = rows[start:start + chunk_size]
+        probs[idx] = legacy_batch_call(handle, matrix[idx])
+    return probs
+
+def peak_bytes(fn) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+def time_us(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return float(np.percentile(samples, 50))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", help="Path to a joblib model (default: synthetic gradient boosting)")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed calls per case (a tenth for batch_10000)")
+    args = parser.parse_args(argv)
+
+    if args.model:
+        import joblib
+        model = joblib.load(args.model)
+    else:
+        model = synthetic_model()
+
+    from app.core.registry import ModelHandle
+    from app.core.model import model_predict, model_predict_vectors
+    from app.core.batch import score_matrix
+
+    handle = ModelHandle("bench", None, model)
+    rng = np.random.default_rng(0)
+    features = rng.standard_normal(32).tolist()
+    vectors = list(rng.standard_normal((64, 32)))
+    matrix = rng.standard_normal((10000, 32))
+    valid = np.ones(len(matrix), dtype=bool)
+    valid[::1000] = False
+
+    cases = {
+        "single": (lambda: legacy_single(handle, features), lambda: model_predict(features, handle), args.repeat),
+        "microbatch": (lambda: legacy_microbatch(handle, vectors), lambda: model_predict_vectors(vectors, handle), args.repeat),
+        "batch_10000": (lambda: legacy_batch(handle, matrix, valid), lambda: score_matrix(matrix, valid, handle), max(args.repeat // 10, 5)),
+    }
+    print(f"model: {type(model).__name__}, input dtype {handle.input_dtype}")
+    print(f"{'case':<13}{'before KiB':>12}{'after KiB':>12}{'before us':>12}{'after us':>12}")
+    failed = False
+    for name, (before, after, repeat) in cases.items():
+        if not np.allclose(before(), after(), equal_nan=True):
+            print(f"{name}: results differ")
+            failed = True
+        print(
+            f"{name:<13}{peak_bytes(before) / 1024:>12.1f}{peak_bytes(after) / 1024:>12.1f}"
+            f"{time_us(before, repeat):>12.1f}{time_us(after, repeat):>12.1f}"
+        )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Prediction latency during a login storm, driven in process through the ASGI app.
+
+Usage:
+    python -m benchmarks.bench_login_storm [--logins N] [--predictions N] [--inline-bcrypt]
+
+Measures /api/lgg_survival/ latency with no other load, then while N clients log in through
+/token in a loop. --inline-bcrypt restores the old behaviour of verifying passwords on the
+event loop, for comparison.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+def percentiles(samples: list[float]) -> str:
+    ms = np.array(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):7.2f} ms   p99 {np.percentile(ms, 99):7.2f} ms   n={len(ms)}"
+
+async def run(args):
+    import httpx
+    from app.main import app
+    import app.main as main_module
+    from app.core.utils import pwd_context
+
+    if args.inline_bcrypt:
+        async def verify_inline(plain_password, hashed_password):
+            return pwd_context.verify(plain_password, hashed_password)
+        main_module.verify_password_async = verify_inline
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/auth/register", json={"username": "bench", "password": "benchpass", "full_name": "Bench"})
+            response = await client.post("/token", data={"username": "bench", "password": "benchpass"})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            rng = np.random.default_rng(0)
+
+            async def predict_loop(samples: list[float]):
+                for _ in range(args.predictions):
+                    body = {"features": rng.random(32).tolist()}
+                    start = time.perf_counter()
+                    await client.post("/api/lgg_survival/", json=body, headers=headers)
+                    samples.append(time.perf_counter() - start)
+
+            async def login_loop(stop: asyncio.Event, counter: list[int]):
+                while not stop.is_set():
+                    await client.post("/token", data={"username": "bench", "password": "benchpass"})
+                    counter[0] += 1
+
+            idle: list[float] = []
+            await predict_loop(idle)
+            print(f"idle          {percentiles(idle)}")
+
+            storm: list[float] = []
+            stop = asyncio.Event()
+            counter = [0]
+            logins = [asyncio.create_task(login_loop(stop, counter)) for _ in range(args.logins)]
+            await asyncio.sleep(0.05)
+            await predict_loop(storm)
+            stop.set()
+            await asyncio.gather(*logins, return_exceptions=True)
+            print(f"login storm   {percentiles(storm)}   ({counter[0]} logins from {args.logins} clients)")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent login clients")
+    parser.add_argument("--predictions", type=int, default=300, help="Sequential predictions per phase")
+    parser.add_argument("--inline-bcrypt", action="store_true", help="Verify passwords on the event loop (old behaviour)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    asyncio.run(run(args))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
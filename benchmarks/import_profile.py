@@ -0,0 +1,106 @@
+"""
+Import-time profile of the API, per module and per top-level package.
+
+Usage:
+    python -m benchmarks.import_profile [--module NAME] [--top N] [--budget-ms MS] [--json]
+
+Imports the module (default `app.main`) in a fresh interpreter with `python -X importtime` and
+summarizes where the time goes. This is the cost every worker pays at boot and on every
+`--reload`, before the lifespan loads the model. With --budget-ms the run exits with status 1
+if the import takes longer, so cold-start regressions can be caught in CI.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+def profile_imports(module: str) -> list[dict]:
+    """
+    Import `module` in a fresh interpreter and return one record per imported module.
+
+    Parameters:
+    - module (str): Dotted name of the module to import.
+
+    Returns:
+    - list[dict]: Records with `module`, `depth`, `self_us` and `cumulative_us`, in import order.
+
+    Raises:
+    - RuntimeError: If the import fails.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        records.append({
+            "module": stripped,
+            "depth": (len(name) - len(stripped) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return records
+
+def summarize(records: list[dict], module: str, top: int) -> dict:
+    """
+    Aggregate import records into a total, per-package totals and the slowest modules.
+    """
+    packages: dict[str, int] = defaultdict(int)
+    for record in records:
+        packages[record["module"].split(".")[0]] += record["self_us"]
+
+    target = next((r for r in records if r["module"] == module), None)
+    return {
+        "module": module,
+        "total_ms": (target["cumulative_us"] if target else sum(packages.values())) / 1000,
+        "modules_imported": len(records),
+        "packages_ms": {
+            name: us / 1000 for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_ms": {
+            r["module"]: r["self_us"] / 1000 for r in sorted(records, key=lambda r: -r["self_us"])[:top]
+        },
+        "first_party_ms": {
+            r["module"]: r["cumulative_us"] / 1000
+            for r in sorted(records, key=lambda r: -r["cumulative_us"])
+            if r["module"].split(".")[0] == "app"
+        },
+    }
+
+def print_table(title: str, rows: dict, total_ms: float):
+    print(f"\n{title}")
+    for name, ms in rows.items():
+        print(f"  {name:<48}{ms:>10.1f} ms{100 * ms / total_ms:>7.1f}%")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--budget-ms", type=float, help="Exit with status 1 if the import takes longer")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(profile_imports(args.module), args.module, args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"import {summary['module']}: {summary['total_ms']:.1f} ms, {summary['modules_imported']} modules")
+        print_table("By top-level package (self time)", summary["packages_ms"], summary["total_ms"])
+        print_table("Slowest modules (self time)", summary["slowest_modules_ms"], summary["total_ms"])
+        print_table("First-party modules (cumulative)", summary["first_party_ms"], summary["total_ms"])
+
+    if args.budget_ms is not None and summary["total_ms"] > args.budget_ms:
+        print(f"\nimport time {summary['total_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
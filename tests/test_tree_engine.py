@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier
+from sklearn.linear_model import LogisticRegression
+
+from app.core import tree_engine
+from app.core.tree_engine import CompiledTreeEnsemble, compile_model, parity_sample
+
+N_FEATURES = 32
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=400, n_features=N_FEATURES, n_informative=12, weights=[0.7], random_state=0)
+    return X, y
+
+MODELS = {
+    "gradient_boosting": lambda: GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+    "gradient_boosting_zero_init_subsample": lambda: GradientBoostingClassifier(
+        n_estimators=30, max_depth=4, init="zero", subsample=0.7, learning_rate=0.2, random_state=0,
+    ),
+    "random_forest_class_weight": lambda: RandomForestClassifier(
+        n_estimators=20, max_depth=8, class_weight="balanced", random_state=0,
+    ),
+    "extra_trees_class_weight": lambda: ExtraTreesClassifier(
+        n_estimators=20, class_weight={0: 1.0, 1: 3.0}, random_state=0,
+    ),
+}
+
+@pytest.fixture(scope="module", params=list(MODELS))
+def fitted(request, data):
+    X, y = data
+    model = MODELS[request.param]().fit(X, y)
+    return model, CompiledTreeEnsemble(model)
+
+def _rows(engine, data):
+    # Training rows plus rows spread over every split threshold
+    return np.vstack((data[0], parity_sample(engine, n_rows=256)))
+
+def _from_raw(engine, raw):
+    return 1.0 / (1.0 + np.exp(-raw)) if engine.link == "logit" else raw
+
+def test_predict_positive_matches_sklearn(fitted, data):
+    model, engine = fitted
+    X = _rows(engine, data)
+    np.testing.assert_allclose(engine.predict_positive(X), model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+
+def test_predict_positive_matches_sklearn_for_float32_input(fitted, data):
+    model, engine = fitted
+    X = _rows(engine, data).astype(np.float32)
+    np.testing.assert_allclose(engine.predict_positive(X), model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+
+def test_predict_proba_columns(fitted, data):
+    model, engine = fitted
+    X = data[0][:50]
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+def test_contributions_add_up_to_sklearn(fitted, data):
+    model, engine = fitted
+    X = _rows(engine, data)
+    contributions = engine.contributions(X)
+    assert contributions.shape == X.shape
+    raw = engine.bias + contributions.sum(axis=1)
+    np.testing.assert_allclose(_from_raw(engine, raw), model.predict_proba(X)[:, 1], rtol=0, atol=1e-9)
+
+def test_contributions_only_credit_split_features(fitted, data):
+    model, engine = fitted
+    used = np.zeros(N_FEATURES, dtype=bool)
+    internal = engine.left != np.arange(engine.left.size)
+    used[np.unique(engine.feature[internal])] = True
+    contributions = engine.contributions(_rows(engine, data))
+    assert np.all(contributions[:, ~used] == 0)
+
+def test_bias_is_score_of_root(fitted):
+    model, engine = fitted
+    if isinstance(model, GradientBoostingClassifier) and model.init == "zero":
+        assert engine.base_score == 0.0
+    root_values = engine.value[engine.roots]
+    assert engine.bias == pytest.approx(engine.base_score + root_values.sum() * engine.scale)
+
+def test_row_blocks_give_same_result(fitted, data, monkeypatch):
+    model, engine = fitted
+    X = data[0][:100]
+    expected = engine.predict_positive(X), engine.contributions(X)
+    monkeypatch.setattr(tree_engine, "ROW_BLOCK", 7)
+    np.testing.assert_array_equal(engine.predict_positive(X), expected[0])
+    np.testing.assert_allclose(engine.contributions(X), expected[1], rtol=0, atol=1e-12)
+
+def _sklearn_positive(model, X):
+    if isinstance(model, GradientBoostingClassifier):
+        # The classifier rejects NaN, but its stage trees accept it like the forests do
+        raw = model._raw_predict_init(X)[:, 0] + model.learning_rate * sum(
+            stage[0].predict(X) for stage in model.estimators_
+        )
+        return 1.0 / (1.0 + np.exp(-raw))
+    return model.predict_proba(X)[:, 1]
+
+def test_nan_follows_sklearn_missing_branch(fitted, data):
+    model, engine = fitted
+    X = data[0][:120].copy()
+    X[::3, 0] = np.nan
+    X[1::3, 5] = np.nan
+    X[2::7] = np.nan
+    X = X.astype(np.float32)
+    probs = engine.predict_positive(X)
+    assert np.isfinite(probs).all()
+    np.testing.assert_allclose(probs, _sklearn_positive(model, X), rtol=0, atol=1e-12)
+    raw = engine.bias + engine.contributions(X).sum(axis=1)
+    np.testing.assert_allclose(_from_raw(engine, raw), probs, rtol=0, atol=1e-9)
+
+def test_nan_free_block_unaffected_by_nan_in_other_block(fitted, data, monkeypatch):
+    model, engine = fitted
+    X = data[0][:40].copy()
+    expected = engine.predict_positive(X[:20])
+    X[25, 3] = np.nan
+    monkeypatch.setattr(tree_engine, "ROW_BLOCK", 20)
+    np.testing.assert_array_equal(engine.predict_positive(X)[:20], expected)
+
+def test_empty_input(fitted):
+    _, engine = fitted
+    X = np.empty((0, N_FEATURES))
+    assert engine.predict_positive(X).shape == (0,)
+    assert engine.contributions(X).shape == (0, N_FEATURES)
+
+@pytest.mark.parametrize("shape", [(N_FEATURES,), (5, N_FEATURES - 1), (5, N_FEATURES + 1), (2, 5, N_FEATURES)])
+def test_wrong_shape_is_rejected(fitted, shape):
+    _, engine = fitted
+    X = np.zeros(shape)
+    with pytest.raises(ValueError):
+        engine.predict_positive(X)
+    with pytest.raises(ValueError):
+        engine.contributions(X)
+
+def test_compile_model_verifies_parity(data):
+    X, y = data
+    model = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(X, y)
+    engine = compile_model(model)
+    assert isinstance(engine, CompiledTreeEnsemble)
+
+def test_compile_model_rejects_mismatch(data, monkeypatch):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    monkeypatch.setattr(tree_engine, "max_parity_error", lambda *args: 1e-3)
+    assert compile_model(model) is None
+
+@pytest.mark.parametrize("make_model", [
+    lambda: LogisticRegression(max_iter=500),
+    lambda: GradientBoostingClassifier(n_estimators=5, loss="exponential", random_state=0),
+])
+def test_unsupported_models_fall_back(data, make_model):
+    X, y = data
+    assert compile_model(make_model().fit(X, y)) is None
+
+def test_multiclass_falls_back(data):
+    X, _ = data
+    y = np.arange(len(X)) % 3
+    assert compile_model(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)) is None